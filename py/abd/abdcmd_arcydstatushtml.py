@@ -8,6 +8,7 @@
 #   getFromfilePrefixChars
 #   setupParser
 #   process
+#   render_log_page
 #   render_content
 #
 # -----------------------------------------------------------------------------
@@ -16,15 +17,23 @@
 
 from __future__ import absolute_import
 
-import json
 import os
 
-import phlsys_fs
+import phlsys_ringlog
 
+import abdt_arcydreporter
+import abdt_shareddictoutput
 import abdweb_arcydcontent
 import abdweb_htmlformatter
 import abdweb_page
 
+_LOG_NAMES = [
+    abdt_arcydreporter.ARCYD_LOG_SYSTEM_ERROR,
+    abdt_arcydreporter.ARCYD_LOG_USER_ACTION,
+]
+
+_LOG_PAGE_SIZE = 20
+
 
 def getFromfilePrefixChars():
     return None
@@ -55,21 +64,42 @@ def setupParser(parser):
              "detected.")
 
 
-def _read_json_file(filename):
-    result = None
-    with phlsys_fs.read_file_lock_context(filename) as f:
-        text = f.read()
-        if text:
-            result = json.loads(text)
-    return result
-
-
 def process(args):
     content = render_content(
         args.reset_file, args.pause_file, args.report_file, args.base_url)
     print content
 
 
+def render_log_page(report_file, log_name, page, base_url):
+    """Return html for a page of the older items of a log, or None.
+
+    :report_file: the string path of the arcyd report file
+    :log_name: the name of the log, e.g. ARCYD_LOG_SYSTEM_ERROR
+    :page: the index of the page, 0 is the newest
+    :base_url: the url that the log pages are relative to
+    :returns: the html string, or None if there is no such log
+
+    """
+    if log_name not in _LOG_NAMES:
+        return None
+
+    spill_path = abdt_arcydreporter.make_log_spill_path(
+        os.path.abspath(report_file), log_name)
+    items = phlsys_ringlog.read_spilled(
+        spill_path, page * _LOG_PAGE_SIZE, _LOG_PAGE_SIZE + 1)
+    is_last = len(items) <= _LOG_PAGE_SIZE
+    items = list(reversed(items[:_LOG_PAGE_SIZE]))
+
+    formatter = abdweb_htmlformatter.HtmlFormatter()
+    abdweb_arcydcontent.render_log_page(
+        base_url, log_name, page, items, is_last, formatter)
+    content = formatter.get_content()
+
+    formatter = abdweb_htmlformatter.HtmlFormatter()
+    abdweb_page.render(formatter, content)
+    return formatter.get_content()
+
+
 def render_content(reset_file, pause_file, report_file, base_url):
 
     is_reset_scheduled = False
@@ -80,7 +110,7 @@ def render_content(reset_file, pause_file, report_file, base_url):
         is_pause_scheduled = os.path.isfile(pause_file)
 
     formatter = abdweb_htmlformatter.HtmlFormatter()
-    report = _read_json_file(report_file)
+    report = abdt_shareddictoutput.read_file(report_file)
     abdweb_arcydcontent.render(
         formatter,
         base_url,
@@ -17,9 +17,14 @@ from __future__ import absolute_import
 
 import BaseHTTPServer
 import os
+import urlparse
 
 import abdcmd_arcydstatushtml
 import abdcmd_repostatushtml
+import abdt_shareddictoutput
+import abdweb_metrics
+
+_HTML_CONTENT_TYPE = 'text/html'
 
 
 def getFromfilePrefixChars():
@@ -77,7 +82,7 @@ class _RequestHandler(BaseHTTPServer.BaseHTTPRequestHandler):
     def do_GET(self):
 
         try:
-            content = self._get_content()
+            content, content_type = self._get_content()
         except _NotFoundError:
             self.send_response(404)
             self.send_header("Content-type", "text/html")
@@ -86,7 +91,7 @@ class _RequestHandler(BaseHTTPServer.BaseHTTPRequestHandler):
             self.wfile.close()
         else:
             self.send_response(200)
-            self.send_header("Content-type", "text/html")
+            self.send_header("Content-type", content_type)
             self.end_headers()
             self.wfile.write(content)
             self.wfile.close()
@@ -94,10 +99,17 @@ class _RequestHandler(BaseHTTPServer.BaseHTTPRequestHandler):
     def _get_content(self):
 
         args = self._instaweb_args
+        content_type = _HTML_CONTENT_TYPE
 
         if self.path == '/':
             content = abdcmd_arcydstatushtml.render_content(
                 args.reset_file, args.pause_file, args.report_file, '')
+        elif self.path.startswith('/logs/'):
+            content = self._get_log_page_content()
+        elif self.path == '/metrics':
+            report = abdt_shareddictoutput.read_file(args.report_file)
+            content = abdweb_metrics.render(report)
+            content_type = abdweb_metrics.CONTENT_TYPE
         elif self.path.lower().endswith('favicon.ico'):
             raise _NotFoundError('could not find favicon')
         else:
@@ -111,6 +123,23 @@ class _RequestHandler(BaseHTTPServer.BaseHTTPRequestHandler):
             content = abdcmd_repostatushtml.render_content(
                 repo_path, branches_path)
 
+        return content, content_type
+
+    def _get_log_page_content(self):
+        url = urlparse.urlsplit(self.path)
+        log_name = url.path[len('/logs/'):]
+        query = urlparse.parse_qs(url.query)
+        try:
+            page = int(query.get('page', ['0'])[0])
+        except ValueError:
+            raise _NotFoundError('bad page: ' + self.path)
+        if page < 0:
+            raise _NotFoundError('bad page: ' + self.path)
+
+        content = abdcmd_arcydstatushtml.render_log_page(
+            self._instaweb_args.report_file, log_name, page, '')
+        if content is None:
+            raise _NotFoundError('no such log: ' + log_name)
         return content
 
 
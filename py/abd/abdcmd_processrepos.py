@@ -9,6 +9,8 @@
 #    .do
 #   RefreshCachesOperation
 #    .do
+#   PrefetchReviewStatesOperation
+#    .do
 #   ResetFileException
 #   FileCheckOperation
 #    .do
@@ -31,19 +33,41 @@ import contextlib
 import functools
 import os
 import sys
+import threading
 import time
 
+import phlsys_filewaker
+import phlsys_lockdecorator
 import phlsys_scheduleunreliables
+import phlsys_statestore
 import phlsys_statusline
+import phlsys_tracer
 import phlurl_watcher
 
 import abdi_processargs
 import abdt_arcydreporter
+import abdt_conduit
+import abdt_differ
 import abdt_errident
 import abdt_logging
+import abdt_revisioncache
 import abdt_shareddictoutput
 import abdt_tryloop
 
+_STATE_STORE_PATH = '.arcyd.state.sqlite'
+
+# the url watcher cache from before the state store, it's imported if the
+# store doesn't have any urls yet
+_LEGACY_URLWATCHER_CACHE_PATH = '.arcyd.urlwatcher.cache'
+
+_NAMESPACE_URLWATCHER = 'urlwatcher'
+_NAMESPACE_REVISION_CACHE = 'revisioncache:'
+_NAMESPACE_BRANCH_FINGERPRINTS = 'branchfingerprints:'
+
+# the revisions are stored as one list so that their order is preserved,
+# which is the order in which they'll be evicted
+_KEY_REVISIONS = 'revisions'
+
 
 def getFromfilePrefixChars():
     return None
@@ -64,6 +88,42 @@ def setupParser(parser):
         type=str,
         required=True,
         help="file to write status to")
+    parser.add_argument(
+        '--status-write-interval',
+        metavar="SECS",
+        type=float,
+        default=2,
+        help="minimum time between routine writes of the status file, e.g. "
+             "as each repo is processed.  Writes in-between are combined.  "
+             "Important changes, e.g. sleeping, are always written "
+             "immediately.")
+    parser.add_argument(
+        '--trace-dir',
+        metavar="DIR",
+        type=str,
+        help="directory to write traces of the operations in each cycle to, "
+             "in the Chrome trace-event format.  Tracing is off if this "
+             "isn't supplied.")
+    parser.add_argument(
+        '--trace-sample-rate',
+        metavar="FRACTION",
+        type=float,
+        default=0.1,
+        help="fraction of cycles to trace, from 0 to 1.")
+    parser.add_argument(
+        '--trace-max-events',
+        metavar="COUNT",
+        type=int,
+        default=phlsys_tracer.DEFAULT_MAX_EVENTS,
+        help="maximum number of operations to trace per cycle, later ones "
+             "are dropped.")
+    parser.add_argument(
+        '--trace-max-files',
+        metavar="COUNT",
+        type=int,
+        default=phlsys_tracer.DEFAULT_MAX_FILES,
+        help="maximum number of trace files to keep, the oldest are "
+             "removed.")
     parser.add_argument(
         '--kill-file',
         metavar="NAME",
@@ -82,6 +142,13 @@ def setupParser(parser):
         type=str,
         help="filename to watch for, will reset operations if the file is "
              "detected and remove the file.")
+    parser.add_argument(
+        '--wake-file',
+        metavar="NAME",
+        type=str,
+        help="filename to watch for, will end the sleep between runs "
+             "through the list immediately if the file is detected and "
+             "remove the file.")
     parser.add_argument(
         '--io-log-file',
         metavar="PATH",
@@ -98,6 +165,74 @@ def setupParser(parser):
         '--no-loop',
         action='store_true',
         help="supply this argument to only process each repo once then exit")
+    parser.add_argument(
+        '--max-workers',
+        metavar="N",
+        type=int,
+        default=1,
+        help="maximum number of repos to process at the same time, each repo "
+             "is processed on a separate worker thread if more than 1.  Note "
+             "that repos on the same Phabricator instance share a review "
+             "state cache which only one worker may use at a time, so "
+             "looking up the states of reviews isn't done concurrently.")
+    parser.add_argument(
+        '--revision-cache-size',
+        metavar="N",
+        type=int,
+        default=10000,
+        help="maximum number of commit descriptions to remember for each "
+             "repo between cycles, 0 to disable.")
+    parser.add_argument(
+        '--diff-cache-size',
+        metavar="BYTES",
+        type=int,
+        default=64 * 1024 * 1024,
+        help="maximum total size of the diffs to remember between cycles, so "
+             "that they don't need to be regenerated, 0 to disable.")
+    parser.add_argument(
+        '--conduit-max-in-flight',
+        metavar="N",
+        type=int,
+        default=4,
+        help="maximum number of independent conduit calls to make at the "
+             "same time, e.g. when looking up the users of a branch, 1 to "
+             "make them one at a time.")
+    parser.add_argument(
+        '--conduit-cache-size',
+        metavar="N",
+        type=int,
+        default=0,
+        help="number of responses to remember from read-only conduit calls, "
+             "e.g. looking up users by email, this reduces the load on "
+             "Phabricator.  Responses are forgotten after a while or when "
+             "Arcyd changes the revision concerned.  0 to disable, which is "
+             "the default.")
+    parser.add_argument(
+        '--incremental-review-refresh',
+        metavar="CYCLES",
+        type=int,
+        default=0,
+        help="only ask Phabricator for the reviews which were modified since "
+             "the last cycle, except for every CYCLES cycles when all the "
+             "active reviews are refreshed as a safety net.  0 to always "
+             "refresh all the active reviews, which is the default.")
+    parser.add_argument(
+        '--skip-unchanged-branches',
+        action='store_true',
+        help="don't process branches which are in review with nothing new "
+             "to review and whose review hasn't changed since they were "
+             "last processed.  This makes a cycle cost time proportional to "
+             "the changes rather than the number of branches.")
+    parser.add_argument(
+        '--generated-file-globs',
+        metavar="GLOB",
+        nargs="+",
+        type=str,
+        default=None,
+        help="globs matching the paths of files which are likely to be "
+             "generated, these are left out of diffs first if they are too "
+             "large, e.g. '*.min.js' 'gen/*'.  If not supplied then a set of "
+             "common patterns is used.")
     parser.add_argument(
         '--external-error-logger',
         metavar="PATH",
@@ -109,29 +244,48 @@ def setupParser(parser):
 
 class DelayedRetrySleepOperation(object):
 
-    def __init__(self, out, secs, reporter):
+    def __init__(self, out, secs, reporter, file_waker, wake_file, stop_files):
         self._out = out
         self._secs = secs
         self._reporter = reporter
+        self._file_waker = file_waker
+        self._wake_file = wake_file
+        self._stop_files = [f for f in stop_files if f]
 
     def do(self):
-        sleep_remaining = self._secs
-        self._reporter.start_sleep(sleep_remaining)
-        while sleep_remaining > 0:
-            self._out.display("sleep (" + str(sleep_remaining) + " seconds) ")
-            self._reporter.update_sleep(sleep_remaining)
-            time.sleep(1)
-            sleep_remaining -= 1
+        # N.B. the status is only written when the sleep starts and finishes,
+        #      so that nothing is written while Arcyd is idle
+        self._reporter.start_sleep(self._secs)
+        self._out.display("sleep (" + str(self._secs) + " seconds) ")
+        deadline = time.time() + self._secs
+        while not self._should_wake():
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                break
+            self._file_waker.wait(remaining)
         self._reporter.finish_sleep()
         return True
 
+    def _should_wake(self):
+        if self._wake_file and os.path.isfile(self._wake_file):
+            try:
+                os.remove(self._wake_file)
+            except OSError:
+                # someone else removed it first, we're awake regardless
+                pass
+            return True
+
+        # wake to act on the kill, reset or pause files straight away
+        return any(os.path.isfile(f) for f in self._stop_files)
+
 
 class RefreshCachesOperation(object):
 
-    def __init__(self, conduits, url_watcher, reporter):
+    def __init__(self, conduits, url_watcher, state_store, reporter):
         super(RefreshCachesOperation, self).__init__()
         self._conduits = conduits
         self._url_watcher = url_watcher
+        self._state_store = state_store
         self._reporter = reporter
 
     def do(self):
@@ -145,14 +299,40 @@ class RefreshCachesOperation(object):
                     abdt_errident.CONDUIT_REFRESH,
                     conduit.describe())
 
+        with self._reporter.tag_timer_context('save conduit states'):
+            abdi_processargs.save_conduit_states()
+
         with self._reporter.tag_timer_context('refresh git watcher'):
             abdt_tryloop.critical_tryloop(
                 self._url_watcher.refresh, abdt_errident.GIT_SNOOP, '')
 
+        with self._reporter.tag_timer_context('save git watcher'):
+            _save_url_watcher(self._url_watcher, self._state_store)
+
         self._reporter.finish_cache_refresh()
         return True
 
 
+class PrefetchReviewStatesOperation(object):
+
+    def __init__(self, repo_args_list, conduits, reporter):
+        super(PrefetchReviewStatesOperation, self).__init__()
+        self._repo_args_list = repo_args_list
+        self._conduits = conduits
+        self._reporter = reporter
+
+    def do(self):
+        with self._reporter.tag_timer_context('prefetch review states'):
+            try:
+                abdi_processargs.prefetch_review_states(
+                    self._repo_args_list, self._conduits, self._reporter)
+            except Exception:
+                # prefetching is only an optimisation and the failures are
+                # logged by the tryloops, the repos will query what they need
+                pass
+        return True
+
+
 class ResetFileException(Exception):
 
     def __init__(self, path):
@@ -162,11 +342,13 @@ class ResetFileException(Exception):
 
 class FileCheckOperation(object):
 
-    def __init__(self, kill_file, reset_file, pause_file, on_pause):
+    def __init__(
+            self, kill_file, reset_file, pause_file, on_pause, file_waker):
         self._kill_file = kill_file
         self._reset_file = reset_file
         self._pause_file = pause_file
         self._on_pause = on_pause
+        self._file_waker = file_waker
 
     def do(self):
         if self._kill_file and os.path.isfile(self._kill_file):
@@ -178,7 +360,7 @@ class FileCheckOperation(object):
             if self._on_pause:
                 self._on_pause()
             while os.path.isfile(self._pause_file):
-                time.sleep(1)
+                self._file_waker.wait()
         return True
 
 
@@ -198,9 +380,37 @@ def process(args):
     abdi_processargs.setup_sigterm_handler()
     abdi_processargs.configure_sendmail(args)
 
-    reporter_data = abdt_shareddictoutput.ToFile(args.status_path)
+    if args.status_write_interval < 0:
+        raise Exception("--status-write-interval must not be negative")
+
+    tracer = None
+    if args.trace_dir:
+        if not 0 <= args.trace_sample_rate <= 1:
+            raise Exception("--trace-sample-rate must be from 0 to 1")
+        if args.trace_max_events < 1 or args.trace_max_files < 1:
+            raise Exception(
+                "--trace-max-events and --trace-max-files must be positive")
+        tracer = phlsys_tracer.Tracer(
+            args.trace_sample_rate,
+            args.trace_dir,
+            args.trace_max_events,
+            args.trace_max_files)
+
+    # the repos and logs are large and rarely change, keep them in separate
+    # files so that they're only rewritten when they do
+    reporter_data = abdt_shareddictoutput.ToFile(
+        args.status_path,
+        section_keys=[
+            abdt_arcydreporter.ARCYD_REPOS,
+            abdt_arcydreporter.ARCYD_LOG_SYSTEM_ERROR,
+            abdt_arcydreporter.ARCYD_LOG_USER_ACTION,
+        ])
     reporter = abdt_arcydreporter.ArcydReporter(
-        reporter_data, args.io_log_file)
+        reporter_data,
+        args.io_log_file,
+        args.status_write_interval,
+        log_spill_prefix=args.status_path,
+        tracer=tracer)
 
     if args.external_error_logger:
         full_path = os.path.abspath(args.external_error_logger)
@@ -244,19 +454,53 @@ def _process(args, reporter):
 
     # TODO: test write access to repos here
 
-    operations = []
+    if args.max_workers < 1:
+        raise Exception("--max-workers must be at least 1")
+
+    if args.revision_cache_size < 0:
+        raise Exception("--revision-cache-size must not be negative")
+
+    if args.diff_cache_size < 0:
+        raise Exception("--diff-cache-size must not be negative")
+    abdt_differ.set_cache_max_bytes(args.diff_cache_size)
+    if args.generated_file_globs is not None:
+        abdt_differ.set_generated_file_globs(args.generated_file_globs)
+
+    if args.conduit_max_in_flight < 1:
+        raise Exception("--conduit-max-in-flight must be at least 1")
+    abdt_conduit.set_max_in_flight(args.conduit_max_in_flight)
+
+    if args.conduit_cache_size < 0:
+        raise Exception("--conduit-cache-size must not be negative")
+    abdi_processargs.set_conduit_cache_max_size(args.conduit_cache_size)
+
+    if args.incremental_review_refresh < 0:
+        raise Exception("--incremental-review-refresh must not be negative")
+    abdi_processargs.set_review_state_full_refresh_interval(
+        args.incremental_review_refresh)
+
+    state_store = phlsys_statestore.Store(
+        os.path.abspath(_STATE_STORE_PATH))
+    abdi_processargs.set_state_store(state_store)
+
+    repo_operations = []
     conduits = {}
     url_watcher = phlurl_watcher.Watcher()
+    _load_url_watcher(url_watcher, state_store)
 
-    urlwatcher_cache_path = os.path.abspath('.arcyd.urlwatcher.cache')
-
-    # load the url watcher cache (if any)
-    if os.path.isfile(urlwatcher_cache_path):
-        with open(urlwatcher_cache_path) as f:
-            url_watcher.load(f)
+    # the url watcher is shared between repos which may be processed
+    # concurrently, serialise access to it
+    phlsys_lockdecorator.decorate_object_methods(
+        url_watcher, threading.RLock())
 
     for repo, repo_args in repos:
 
+        revision_cache = _make_revision_cache(args, repo, state_store)
+
+        branch_fingerprints = None
+        if args.skip_unchanged_branches:
+            branch_fingerprints = _load_branch_fingerprints(repo, state_store)
+
         # create a function to update this particular repo.
         #
         # use partial to ensure we capture the value of the variables,
@@ -270,7 +514,9 @@ def _process(args, reporter):
             reporter,
             conduits,
             url_watcher,
-            urlwatcher_cache_path)
+            state_store,
+            revision_cache,
+            branch_fingerprints)
 
         on_exception_delay = abdi_processargs.make_exception_delay_handler(
             args, reporter, repo)
@@ -279,42 +525,97 @@ def _process(args, reporter):
             list(retry_delays),  # make a copy to be sure
             on_exception_delay)
 
-        operations.append(operation)
+        repo_operations.append(operation)
 
     def on_pause():
         on_exception_delay = abdi_processargs.make_exception_delay_handler(
             args, reporter, None)
         on_exception_delay("until_file_removed")
 
-    operations.append(
+    # wake up as soon as any of the special files are created or removed,
+    # rather than polling for them
+    special_files = [
+        args.kill_file, args.reset_file, args.pause_file, args.wake_file
+    ]
+    file_waker = phlsys_filewaker.FileWaker([f for f in special_files if f])
+
+    # retrieve the states of the reviews of all the repos together at the
+    # start of each cycle, rather than at least one query per repo
+    prefetch_operation = PrefetchReviewStatesOperation(
+        [repo_args for _, repo_args in repos], conduits, reporter)
+
+    cycle_operations = []
+
+    # N.B. the sleep ends early if any of the kill, reset or pause files are
+    #      created, so check them straight afterwards
+    cycle_operations.append(
+        DelayedRetrySleepOperation(
+            out,
+            args.sleep_secs,
+            reporter,
+            file_waker,
+            args.wake_file,
+            [args.kill_file, args.reset_file, args.pause_file]))
+
+    cycle_operations.append(
         FileCheckOperation(
             args.kill_file,
             args.reset_file,
             args.pause_file,
-            on_pause))
+            on_pause,
+            file_waker))
 
-    operations.append(
-        DelayedRetrySleepOperation(
-            out, args.sleep_secs, reporter))
-
-    operations.append(
+    cycle_operations.append(
         RefreshCachesOperation(
-            conduits, url_watcher, reporter))
-
-    if args.no_loop:
-        def process_once():
-            return phlsys_scheduleunreliables.process_once(list(operations))
-
-        new_ops = tryHandleSpecialFiles(process_once, on_exception_delay)
-        if new_ops != set(operations):
-            print 'ERROR: some operations failed'
-            sys.exit(1)
-    else:
-        def loopForever():
-            phlsys_scheduleunreliables.process_loop_forever(list(operations))
-
-        while True:
-            tryHandleSpecialFiles(loopForever, on_exception_delay)
+            conduits, url_watcher, state_store, reporter))
+
+    worker_pool = None
+    if args.max_workers > 1:
+        worker_pool = phlsys_scheduleunreliables.make_worker_pool(
+            args.max_workers)
+
+    def make_operations():
+        # N.B. make a new group of concurrent operations each time so that any
+        #      paused repos are resumed after a reset, as they are when not
+        #      processing concurrently
+        operations = [prefetch_operation]
+        if worker_pool is None:
+            operations.extend(repo_operations)
+        else:
+            operations.append(
+                phlsys_scheduleunreliables.ConcurrentOperations(
+                    repo_operations, worker_pool))
+        operations.extend(cycle_operations)
+        return operations
+
+    # N.B. SIGTERM is turned into 'SystemExit', so this also saves the url
+    #      watcher when Arcyd is terminated
+    try:
+        if args.no_loop:
+            operations = make_operations()
+
+            def process_once():
+                return phlsys_scheduleunreliables.process_once(
+                    list(operations))
+
+            new_ops = tryHandleSpecialFiles(process_once, on_exception_delay)
+            is_ok = new_ops == set(operations)
+            if worker_pool is not None:
+                concurrent_operation = operations[1]
+                active_repo_ops = concurrent_operation.active_operations()
+                is_ok = is_ok and active_repo_ops == set(repo_operations)
+            if not is_ok:
+                print 'ERROR: some operations failed'
+                sys.exit(1)
+        else:
+            def loopForever():
+                phlsys_scheduleunreliables.process_loop_forever(
+                    make_operations())
+
+            while True:
+                tryHandleSpecialFiles(loopForever, on_exception_delay)
+    finally:
+        _save_url_watcher(url_watcher, state_store)
 
 
 def process_single_repo(
@@ -324,13 +625,83 @@ def process_single_repo(
         reporter,
         conduits,
         url_watcher,
-        urlwatcher_cache_path):
+        state_store,
+        revision_cache,
+        branch_fingerprints):
     abdi_processargs.run_once(
-        repo, repo_args, out, reporter, conduits, url_watcher)
+        repo, repo_args, out, reporter, conduits, url_watcher, revision_cache,
+        branch_fingerprints)
+
+    # save everything we learned about the repo together, so that the store
+    # is never left with only some of it.  The url watcher is shared between
+    # repos so it's saved once per cycle instead, see '_save_url_watcher'.
+    with state_store.transaction() as t:
+
+        # save the revision cache, if it's in use and there's anything new
+        if revision_cache is not None and revision_cache.is_dirty:
+            t.replace_namespace(
+                _NAMESPACE_REVISION_CACHE + repo,
+                {_KEY_REVISIONS: revision_cache.dump_list()})
+
+        if branch_fingerprints is not None:
+            t.replace_namespace(
+                _NAMESPACE_BRANCH_FINGERPRINTS + repo, branch_fingerprints)
+
+
+def _save_url_watcher(url_watcher, state_store):
+    # save the url watcher, if there's anything new.  This is done once per
+    # cycle and when Arcyd stops, rather than after every repo.  If Arcyd is
+    # killed before then it'll only mean re-fetching some repos.
+    if url_watcher.is_dirty:
+        url_watcher_state = url_watcher.dump_dict()
+        with state_store.transaction() as t:
+            t.replace_namespace(_NAMESPACE_URLWATCHER, url_watcher_state)
+
+
+def _load_url_watcher(url_watcher, state_store):
+    url_watcher_state = state_store.get_namespace(_NAMESPACE_URLWATCHER)
+    if url_watcher_state:
+        url_watcher.load_dict(url_watcher_state)
+        return
+
+    # import the cache file from before the state store (if any), it's left
+    # in place so that older versions of Arcyd can still be run
+    legacy_path = os.path.abspath(_LEGACY_URLWATCHER_CACHE_PATH)
+    if os.path.isfile(legacy_path):
+        with open(legacy_path) as f:
+            url_watcher.load(f)
+
+
+def _make_revision_cache(args, repo, state_store):
+    # return a revision cache for 'repo' loaded from 'state_store', or None
+
+    if not args.revision_cache_size:
+        return None
+
+    revision_cache = abdt_revisioncache.RevisionCache(
+        args.revision_cache_size)
+    revision_cache_state = state_store.get_namespace(
+        _NAMESPACE_REVISION_CACHE + repo)
+    revision_cache.load_list(revision_cache_state.get(_KEY_REVISIONS, []))
+
+    return revision_cache
+
+
+def _load_branch_fingerprints(repo, state_store):
+    # the fingerprints are nested tuples, which come back from the store as
+    # lists and so wouldn't compare equal to new fingerprints
+    fingerprints = state_store.get_namespace(
+        _NAMESPACE_BRANCH_FINGERPRINTS + repo)
+    return {
+        name: _tuples_from_lists(fingerprint)
+        for name, fingerprint in fingerprints.iteritems()
+    }
+
 
-    # save the urlwatcher cache
-    with open(urlwatcher_cache_path, 'w') as f:
-        url_watcher.dump(f)
+def _tuples_from_lists(value):
+    if isinstance(value, list):
+        return tuple(_tuples_from_lists(item) for item in value)
+    return value
 
 
 #------------------------------------------------------------------------------
@@ -11,6 +11,7 @@
 #    .failedCreateReview
 #    .createdReview
 #    .updatedReview
+#    .reducedDiff
 #    .landedReview
 #    .abandonedBranch
 #    .usedDefaultTestPlan
@@ -149,6 +150,19 @@ the 'edit revision' link at the top-right of the page.
         message += phlcon_remarkup.monospaced(branch_hash) + "\n"
         self._createComment(message, silent=True)
 
+    def reducedDiff(self, reduced_context_paths, excluded_paths):
+        message = "the diff was too large, so it was reduced to fit. "
+        message += "please see the branch for the full changes.\n"
+        if reduced_context_paths:
+            message += "these files have less surrounding context:\n"
+            message += phlcon_remarkup.code_block(
+                '\n'.join(reduced_context_paths), lang="text")
+        if excluded_paths:
+            message += "these files were left out of the diff:\n"
+            message += phlcon_remarkup.code_block(
+                '\n'.join(excluded_paths), lang="text", isBad=True)
+        self._createComment(message, silent=True)
+
     def landedReview(self, branch_hash, branch_name, base_name, git_output):
         message = "landed "
         message += phlcon_remarkup.monospaced(branch_name) + " "
@@ -319,7 +333,7 @@ the 'edit revision' link at the top-right of the page.
         message = str("failed to create diff, tried to reduce context but it "
                       "was still too large.\n")
         message += "\n"
-        message += "diff size: " + str(e.diff_len) + " bytes\n"
+        message += "diff size: at least " + str(e.diff_len) + " bytes\n"
         message += "diff size limit: " + str(e.diff_len_limit) + " bytes\n"
         message += "summary:\n"
         message += phlcon_remarkup.code_block(
@@ -5,6 +5,11 @@
 # abdi_processargs
 #
 # Public Functions:
+#   set_conduit_cache_max_size
+#   set_review_state_full_refresh_interval
+#   set_state_store
+#   save_conduit_states
+#   prefetch_review_states
 #   setup_parser
 #   setup_repo_arg_parser
 #   configure_sendmail
@@ -20,19 +25,27 @@
 
 from __future__ import absolute_import
 
+import collections
 import contextlib
+import functools
+import os
 import platform
 import signal
 import sys
+import threading
 import traceback
 
+import phlcon_cachingconduit
 import phlcon_reviewstatecache
+import phlcon_userdirectory
 import phlmail_sender
 import phlsys_conduit
 import phlsys_git
+import phlsys_lockdecorator
 import phlsys_pluginmanager
 import phlsys_sendmail
 import phlsys_strtotime
+import phlsys_subprocess
 
 import abdmail_mailer
 import abdt_classicnaming
@@ -40,6 +53,7 @@ import abdt_compositenaming
 import abdt_conduit
 import abdt_errident
 import abdt_git
+import abdt_logging
 import abdt_rbranchnaming
 import abdt_repoconfig
 import abdt_reporeporter
@@ -48,6 +62,146 @@ import abdt_tryloop
 
 import abdi_processrepo
 
+# repos may be processed concurrently, serialise access to 'conduits'
+_CONDUITS_LOCK = threading.Lock()
+
+_TAG_CONDUIT_CACHE_HITS = 'conduit cache hits'
+_TAG_CONDUIT_CACHE_MISSES = 'conduit cache misses'
+
+_CONDUIT_CACHE_MAX_SIZE = 0
+_REVIEW_STATE_FULL_REFRESH_INTERVAL = None
+_STATE_STORE = None
+
+# map of conduit key to (instance uri, review state cache, user directory),
+# these are saved in '_STATE_STORE' by 'save_conduit_states'
+_CONDUIT_STATES = {}
+
+_NAMESPACE_REVIEW_STATES = 'reviewstates:'
+_NAMESPACE_USER_DIRECTORY = 'userdirectory:'
+
+
+def set_conduit_cache_max_size(max_size):
+    """Set the number of read-only conduit responses to remember.
+
+    Note that this only affects conduits which are connected afterwards.
+
+    :max_size: the maximum number of responses to remember, 0 to disable
+    :returns: None
+
+    """
+    global _CONDUIT_CACHE_MAX_SIZE
+    _CONDUIT_CACHE_MAX_SIZE = max_size
+
+
+def set_review_state_full_refresh_interval(interval):
+    """Set how many review state refreshes to make between full refreshes.
+
+    The refreshes in-between only ask for the reviews modified since the last
+    refresh.  Note that this only affects conduits which are connected
+    afterwards.
+
+    :interval: the number of refreshes, None or 0 to always refresh fully
+    :returns: None
+
+    """
+    global _REVIEW_STATE_FULL_REFRESH_INTERVAL
+    _REVIEW_STATE_FULL_REFRESH_INTERVAL = interval
+
+
+def set_state_store(store):
+    """Set the store to load and save the state of each conduit in.
+
+    The review states and the users found by email are saved per Phabricator
+    instance, so that they are still known when Arcyd restarts.  Note that
+    loading only affects conduits which are connected afterwards.
+
+    :store: a phlsys_statestore.Store, or None to not save them
+    :returns: None
+
+    """
+    global _STATE_STORE
+    _STATE_STORE = store
+
+
+def save_conduit_states():
+    """Save the state of all the connected conduits in the state store.
+
+    Does nothing if no store was set with 'set_state_store'.
+
+    :returns: None
+
+    """
+    if _STATE_STORE is None:
+        return
+
+    with _CONDUITS_LOCK:
+        states = list(_CONDUIT_STATES.values())
+
+    with _STATE_STORE.transaction() as t:
+        for instance_uri, reviewstate_cache, user_directory in states:
+            t.replace_namespace(
+                _NAMESPACE_REVIEW_STATES + instance_uri,
+                reviewstate_cache.dump_dict())
+            t.replace_namespace(
+                _NAMESPACE_USER_DIRECTORY + instance_uri,
+                user_directory.dump_dict())
+
+
+def prefetch_review_states(repo_args_list, conduits, arcyd_reporter):
+    """Retrieve the states of the reviews of all the repos, per conduit.
+
+    The reviews are found from the tracker branches that each repo had when
+    it was last fetched, so nothing is fetched here.  Repos on the same
+    Phabricator instance share a conduit, so the states of all of their
+    reviews are retrieved together in as few queries as possible.
+
+    :repo_args_list: list of the parsed args of each repo, as for 'run_once'
+    :conduits: dict of the conduits shared with 'run_once'
+    :arcyd_reporter: the ArcydReporter to report the conduits to
+    :returns: None
+
+    """
+    key_to_args = {}
+    key_to_review_ids = collections.defaultdict(set)
+    for args in repo_args_list:
+        # N.B. the repo may not be cloned or valid yet, processing it will
+        #      report the problem if it persists
+        if not os.path.isdir(args.repo_path):
+            continue
+        try:
+            review_ids = _get_tracked_review_ids(args)
+        except phlsys_subprocess.CalledProcessError:
+            continue
+        key = _make_conduit_key(args)
+        key_to_args.setdefault(key, args)
+        key_to_review_ids[key].update(review_ids)
+
+    for key, review_ids in key_to_review_ids.iteritems():
+        if not review_ids:
+            continue
+        arcyd_conduit = _connect(conduits, key_to_args[key], arcyd_reporter)
+        abdt_tryloop.tryloop(
+            functools.partial(
+                arcyd_conduit.prefetch_review_states, sorted(review_ids)),
+            abdt_errident.CONDUIT_PREFETCH,
+            arcyd_conduit.describe())
+
+
+def _get_tracked_review_ids(args):
+    # return the ids of the reviews tracked in the repo, as of its last fetch
+    repo = abdt_git.Clone(
+        phlsys_git.GitClone(args.repo_path), "origin", args.repo_desc)
+    branches = abdt_git.get_managed_branches(
+        repo, args.repo_desc, _make_branch_naming())
+    review_ids = [b.review_id_or_none() for b in branches]
+    return [i for i in review_ids if i is not None]
+
+
+def _make_branch_naming():
+    return abdt_compositenaming.Naming(
+        abdt_classicnaming.Naming(),
+        abdt_rbranchnaming.Naming())
+
 
 def setup_parser(parser):
     parser.add_argument(
@@ -179,6 +333,23 @@ def setup_repo_arg_parser(parser):
         required=True,
         help="file to touch when successfully updated a repo")
 
+    parser.add_argument(
+        '--persistent-git',
+        action='store_true',
+        help="answer object, commit and ref lookups using long-lived git "
+             "processes rather than starting a new git process for each "
+             "lookup, this is more efficient for repos with many branches "
+             "or long branches.")
+
+    parser.add_argument(
+        '--batch-tracker-pushes',
+        action='store_true',
+        help="collect the updates to Arcyd's tracker branches while "
+             "processing the repo and send them as a single atomic push at "
+             "the end, rather than pushing once per update.  Landing and "
+             "abandoning are still pushed immediately.  Requires git 2.4 or "
+             "later on both the Arcyd machine and the remote.")
+
     parser.add_argument(
         "--plugins",
         metavar="MODULE_NAME",
@@ -269,7 +440,9 @@ def get_retry_delays():
     return retry_delays
 
 
-def run_once(repo, args, out, arcyd_reporter, conduits, url_watcher):
+def run_once(
+        repo, args, out, arcyd_reporter, conduits, url_watcher,
+        revision_cache=None, branch_fingerprints=None):
 
     reporter = abdt_reporeporter.RepoReporter(
         arcyd_reporter,
@@ -281,7 +454,8 @@ def run_once(repo, args, out, arcyd_reporter, conduits, url_watcher):
     with arcyd_reporter.tag_timer_context('process args'):
         with contextlib.closing(reporter):
             _run_once(
-                args, out, reporter, arcyd_reporter, conduits, url_watcher)
+                args, out, reporter, arcyd_reporter, conduits, url_watcher,
+                revision_cache, branch_fingerprints)
 
 
 def _set_attrib_if_not_none(config, key, value):
@@ -314,11 +488,38 @@ def _determine_config(args, repo):
     return config
 
 
-def _run_once(args, out, reporter, arcyd_reporter, conduits, url_watcher):
+def _run_once(
+        args, out, reporter, arcyd_reporter, conduits, url_watcher,
+        revision_cache, branch_fingerprints):
+
+    with _git_clone_context(args) as git_clone:
+        _process_branches(
+            args, out, reporter, arcyd_reporter, conduits, url_watcher,
+            git_clone, revision_cache, branch_fingerprints)
+
+
+def _git_clone_context(args):
+    if args.persistent_git:
+        return contextlib.closing(phlsys_git.BatchGitClone(args.repo_path))
+    return _null_context(phlsys_git.GitClone(args.repo_path))
+
+
+@contextlib.contextmanager
+def _null_context(value):
+    yield value
+
+
+def _process_branches(
+        args, out, reporter, arcyd_reporter, conduits, url_watcher,
+        git_clone, revision_cache, branch_fingerprints):
 
     with arcyd_reporter.tag_timer_context('process branches prolog'):
         repo = abdt_git.Clone(
-            phlsys_git.GitClone(args.repo_path), "origin", args.repo_desc)
+            git_clone,
+            "origin",
+            args.repo_desc,
+            revision_cache,
+            args.batch_tracker_pushes)
 
         arcyd_reporter.tag_timer_decorate_object_methods_individually(
             repo, 'git')
@@ -356,28 +557,46 @@ def _run_once(args, out, reporter, arcyd_reporter, conduits, url_watcher):
                 return config.branch_url_format.format(branch=branch_name)
             branch_url_callable = make_branch_url
 
-        branch_naming = abdt_compositenaming.Naming(
-            abdt_classicnaming.Naming(),
-            abdt_rbranchnaming.Naming())
-
         branches = abdt_git.get_managed_branches(
             repo,
             config.description,
-            branch_naming,
+            _make_branch_naming(),
             branch_url_callable)
 
         for branch in branches:
             arcyd_reporter.tag_timer_decorate_object_methods_individually(
                 branch, 'branch')
 
+    # the states of the reviews tracked before the fetch were retrieved for
+    # all repos at the start of the cycle, see 'prefetch_review_states'.  Only
+    # reviews that are new since then will be queried for here, which is
+    # usually none of them.
+    with arcyd_reporter.tag_timer_context('prefetch new review states'):
+        review_ids = [b.review_id_or_none() for b in branches]
+        abdt_tryloop.tryloop(
+            lambda: arcyd_conduit.prefetch_review_states(
+                [i for i in review_ids if i is not None]),
+            abdt_errident.CONDUIT_PREFETCH,
+            args.repo_desc)
+
     try:
-        with arcyd_reporter.tag_timer_context('process branches'):
-            abdi_processrepo.process_branches(
-                branches,
-                arcyd_conduit,
-                mailer,
-                pluginManager,
-                reporter)
+        try:
+            with arcyd_reporter.tag_timer_context('process branches'):
+                abdi_processrepo.process_branches(
+                    branches,
+                    arcyd_conduit,
+                    mailer,
+                    pluginManager,
+                    reporter,
+                    branch_fingerprints)
+        finally:
+            # the trackers record work that has already been done, e.g. that
+            # a review was created, so they must be pushed even on error
+            with arcyd_reporter.tag_timer_context('push trackers'):
+                abdt_tryloop.tryloop(
+                    repo.flush_tracker_pushes,
+                    abdt_errident.PUSH_TRACKERS,
+                    args.repo_desc)
     except Exception:
         reporter.on_traceback(traceback.format_exc())
         raise
@@ -399,9 +618,18 @@ def _fetch_if_needed(url_watcher, snoop_url, repo, repo_desc):
 
 
 def _connect(conduits, args, arcyd_reporter):
+    with _CONDUITS_LOCK:
+        return _connect_locked(conduits, args, arcyd_reporter)
 
-    key = (
+
+def _make_conduit_key(args):
+    return (
         args.instance_uri, args.arcyd_user, args.arcyd_cert, args.https_proxy)
+
+
+def _connect_locked(conduits, args, arcyd_reporter):
+
+    key = _make_conduit_key(args)
     if key not in conduits:
         # create an array so that the 'connect' closure binds to the 'conduit'
         # variable as we'd expect, otherwise it'll just modify a local variable
@@ -424,11 +652,30 @@ def _connect(conduits, args, arcyd_reporter):
         conduit = conduit[0]
         arcyd_reporter.tag_timer_decorate_object_methods_individually(
             conduit, 'base_conduit')
-        reviewstate_cache = phlcon_reviewstatecache.ReviewStateCache()
+        if _CONDUIT_CACHE_MAX_SIZE:
+            conduit = _make_caching_conduit(conduit, _CONDUIT_CACHE_MAX_SIZE)
+        reviewstate_cache = phlcon_reviewstatecache.ReviewStateCache(
+            _REVIEW_STATE_FULL_REFRESH_INTERVAL)
         reviewstate_cache.set_conduit(conduit)
-        arcyd_conduit = abdt_conduit.Conduit(conduit, reviewstate_cache)
+
+        # the conduit is shared between repos which may be processed
+        # concurrently.  The user to act as is per-thread and the user
+        # directory, caching conduit and author maps lock themselves, which
+        # leaves the review state cache to be serialised here.
+        phlsys_lockdecorator.decorate_object_methods(
+            reviewstate_cache, threading.RLock())
+
+        user_directory = phlcon_userdirectory.UserDirectory(conduit)
+        if _STATE_STORE is not None:
+            _load_conduit_state(
+                args.instance_uri, reviewstate_cache, user_directory)
+        _CONDUIT_STATES[key] = (
+            args.instance_uri, reviewstate_cache, user_directory)
+        arcyd_conduit = abdt_conduit.Conduit(
+            conduit, reviewstate_cache, user_directory)
         arcyd_reporter.tag_timer_decorate_object_methods_individually(
             arcyd_conduit, 'conduit')
+
         conduits[key] = arcyd_conduit
     else:
         arcyd_conduit = conduits[key]
@@ -436,6 +683,32 @@ def _connect(conduits, args, arcyd_reporter):
     return arcyd_conduit
 
 
+def _make_caching_conduit(conduit, max_size):
+
+    def on_hit(method):
+        abdt_logging.on_tag_count(_TAG_CONDUIT_CACHE_HITS)
+
+    def on_miss(method):
+        abdt_logging.on_tag_count(_TAG_CONDUIT_CACHE_MISSES)
+
+    return phlcon_cachingconduit.CachingConduit(
+        conduit, max_size, on_hit=on_hit, on_miss=on_miss)
+
+
+def _load_conduit_state(instance_uri, reviewstate_cache, user_directory):
+    reviewstate_cache.load_dict(
+        _STATE_STORE.get_namespace(_NAMESPACE_REVIEW_STATES + instance_uri))
+    user_directory.load_dict(
+        _STATE_STORE.get_namespace(_NAMESPACE_USER_DIRECTORY + instance_uri))
+
+    # the loaded review states may be long out of date, refresh them now
+    # rather than acting on them for a whole cycle
+    abdt_tryloop.tryloop(
+        reviewstate_cache.refresh_active_reviews,
+        abdt_errident.CONDUIT_REFRESH,
+        instance_uri)
+
+
 #------------------------------------------------------------------------------
 # Copyright (C) 2013-2014 Bloomberg Finance L.P.
 #
@@ -34,6 +34,8 @@ import abdt_userwarning
 
 _DEFAULT_TEST_PLAN = "I DIDNT TEST"
 
+_TAG_SKIPPED_BRANCHES = 'skipped unchanged branches'
+
 
 def create_review(conduit, branch, plugin_manager):
     plugin_manager.hook(
@@ -82,7 +84,8 @@ def create_review(conduit, branch, plugin_manager):
             reviewer_phids.remove(phid)
             user_warnings.append(abdt_userwarning.SelfReviewer(user, message))
 
-    rawDiff = branch.make_raw_diff()
+    diff_result = branch.make_raw_diff()
+    rawDiff = diff_result.diff
 
     if not rawDiff:
         raise abdt_exception.AbdUserException("no difference to review")
@@ -91,6 +94,7 @@ def create_review(conduit, branch, plugin_manager):
         conduit, user, parsed, branch, rawDiff)
 
     commenter = abdcmnt_commenter.Commenter(conduit, revisionid)
+    _comment_on_reduced_diff(commenter, diff_result)
 
     if user_warnings:
         commenter.userWarnings(user_warnings)
@@ -171,7 +175,8 @@ def update_in_review(conduit, branch):
     print "update_in_review"
 
     print "- creating diff"
-    rawDiff = branch.make_raw_diff()
+    diff_result = branch.make_raw_diff()
+    rawDiff = diff_result.diff
 
     if not rawDiff:
         raise abdt_exception.AbdUserException("no difference to review")
@@ -192,12 +197,19 @@ def update_in_review(conduit, branch):
     commenter.updatedReview(
         branch.review_branch_hash(),
         branch.review_branch_name())
+    _comment_on_reduced_diff(commenter, diff_result)
 
     abdt_logging.on_review_event(
         'updaterev', '{} updated {}'.format(
             branch.review_branch_name(), review_id))
 
 
+def _comment_on_reduced_diff(commenter, diff_result):
+    if diff_result.reduced_context_paths or diff_result.excluded_paths:
+        commenter.reducedDiff(
+            diff_result.reduced_context_paths, diff_result.excluded_paths)
+
+
 def land(conduit, branch):
     print "landing " + branch.review_branch_name()
 
@@ -322,21 +334,78 @@ def process_abandoned_branch(conduit, branch):
     branch.abandon()
 
 
-def process_branches(branches, conduit, mailer, plugin_manager, reporter):
+def _make_fingerprint_or_none(conduit, branch):
+    # return a value which only changes when processing 'branch' might do
+    # something different, or None if it should always be processed.
+    #
+    # only branches which are 'ok' in review and have nothing new to review
+    # are considered, processing those depends only on the review state.
+    # branches which are 'bad' are retried every time, the problem may have
+    # been fixed outside of the repository, e.g. a user was created.
+    if branch.is_new() or branch.is_status_bad() or branch.has_new_commits():
+        return None
+    review_id = branch.review_id_or_none()
+    if review_id is None:
+        return None
+    return (
+        branch.review_branch_hash(),
+        review_id,
+        conduit.get_review_state_fingerprint(review_id))
+
+
+def process_branches(
+        branches, conduit, mailer, plugin_manager, reporter,
+        branch_fingerprints=None):
+    """Process each of 'branches', creating, updating and landing reviews.
+
+    If 'branch_fingerprints' is supplied then branches which haven't changed
+    since they were last processed are skipped, it's updated with the
+    branches that were processed.  It should be passed again on the next
+    call for the same repository.
+
+    :branches: a list of abdt_branch.Branch
+    :conduit: an abdt_conduit.Conduit
+    :mailer: an abdmail_mailer.Mailer
+    :plugin_manager: a phlsys_pluginmanager.PluginManager
+    :reporter: an abdt_reporeporter.RepoReporter
+    :branch_fingerprints: a dict of review branch name to fingerprint, or None
+    :returns: None
+
+    """
+    old_fingerprints = {}
+    if branch_fingerprints is not None:
+        old_fingerprints = dict(branch_fingerprints)
+        branch_fingerprints.clear()
+
     for branch in branches:
         if branch.is_abandoned():
             process_abandoned_branch(conduit, branch)
         elif branch.is_null():
             pass  # TODO: should handle these
         else:
-            reporter.start_branch(branch.review_branch_name())
-            print "pending:", branch.review_branch_name()
-            process_updated_branch(
-                mailer, conduit, branch, plugin_manager, reporter)
+            name = branch.review_branch_name()
+            fingerprint = None
+            if branch_fingerprints is not None:
+                fingerprint = _make_fingerprint_or_none(conduit, branch)
+
+            reporter.start_branch(name)
+            if fingerprint is not None and (
+                    old_fingerprints.get(name) == fingerprint):
+                abdt_logging.on_tag_count(_TAG_SKIPPED_BRANCHES)
+            else:
+                print "pending:", name
+                process_updated_branch(
+                    mailer, conduit, branch, plugin_manager, reporter)
             reporter.finish_branch(
                 abdt_branch.calc_is_ok(branch),
                 branch.review_id_or_none())
 
+            # N.B. the fingerprint is taken before processing, if processing
+            #      changed anything then the next fingerprint will differ and
+            #      the branch will be processed again to check the result
+            if fingerprint is not None:
+                branch_fingerprints[name] = fingerprint
+
 
 #------------------------------------------------------------------------------
 # Copyright (C) 2013-2014 Bloomberg Finance L.P.
@@ -42,6 +42,8 @@ import abdi_processrepo
 # [ B] processUpdateRepo doesn't leave the current branch set after processing
 # [ L] processUpdateRepo can handle a branch with only empty commits
 # [ M] processUpdateRepo won't emit errors in a cycle when landing w/o author
+# [ N] processUpdateRepo skips branches unchanged since they were processed
+# [ N] processUpdateRepo processes branches if their review changes
 # [  ] processUpdateRepo can handle a review without commits in repo
 # [  ] processUpdateRepo will comment on a bad branch if the error has changed
 #------------------------------------------------------------------------------
@@ -59,6 +61,7 @@ import abdi_processrepo
 # [ K] test_K_ExceptionDuringProcessing
 # [ L] test_L_EmptyDiff
 # [ M] test_M_NoLandingAuthor
+# [ N] test_N_SkipUnchangedBranches
 #==============================================================================
 
 
@@ -94,7 +97,7 @@ class Test(unittest.TestCase):
     def tearDown(self):
         pass
 
-    def _process_branches(self, branches):
+    def _process_branches(self, branches, branch_fingerprints=None):
         self.reporter_try = {}
         self.reporter_ok = {}
 
@@ -118,7 +121,8 @@ class Test(unittest.TestCase):
                 self.conduit,
                 self.mailer,
                 self.plugin_manager,
-                self.reporter)
+                self.reporter,
+                branch_fingerprints)
 
     def test_A_Breathing(self):
         self._process_branches([])
@@ -367,6 +371,38 @@ class Test(unittest.TestCase):
         # ensure that the review is landed
         self.assertTrue(branch.is_null())
 
+    def test_N_SkipUnchangedBranches(self):
+        branch, branch_data = abdt_branchmock.create_simple_new_review()
+        fingerprints = {}
+        self._process_branches([branch], fingerprints)
+        self.assertFalse(branch.is_status_bad())
+
+        accepted_queries = []
+        regular_is_review_accepted = self.conduit.is_review_accepted
+
+        def is_review_accepted(self, revisionid):
+            accepted_queries.append(revisionid)
+            return regular_is_review_accepted(revisionid)
+
+        self.conduit.is_review_accepted = types.MethodType(
+            is_review_accepted, self.conduit)
+
+        # [ N] processUpdateRepo skips branches unchanged since they were
+        #      processed
+        self._process_branches([branch], fingerprints)
+        self.assertEqual(len(accepted_queries), 1)
+        self._process_branches([branch], fingerprints)
+        self.assertEqual(len(accepted_queries), 1)
+        self.assertFalse(
+            self.reporter_try[abdt_reporeporter.REPO_ATTRIB_STATUS_BRANCH])
+
+        # [ N] processUpdateRepo processes branches if their review changes
+        self.conduit_data.accept_the_only_review()
+        self._process_branches([branch], fingerprints)
+        self.assertEqual(len(accepted_queries), 2)
+        self.assertTrue(self.conduit_data.revisions[0].is_closed())
+        self.assertTrue(branch.is_null())
+
 
 # factors affecting a review:
 #  age of the revisions
@@ -26,7 +26,10 @@
 #    .start_cache_refresh
 #    .finish_cache_refresh
 #    .start_repo
+#    .start_trace_span
+#    .finish_trace_span
 #    .tag_timer_context
+#    .tag_count
 #    .tag_timer_decorate_object_methods
 #    .tag_timer_decorate_object_methods_individually
 #    .fail_repo
@@ -35,6 +38,7 @@
 #
 # Public Functions:
 #   timer_context
+#   make_log_spill_path
 #
 # Public Assignments:
 #   ARCYD_STATUS
@@ -45,6 +49,7 @@
 #   ARCYD_LOG_SYSTEM_ERROR
 #   ARCYD_LOG_USER_ACTION
 #   ARCYD_LOG_USER_ACTION_MAX_SIZE
+#   ARCYD_LOG_SYSTEM_ERROR_MAX_SIZE
 #   ARCYD_LIST_ATTRIB
 #   ARCYD_STATUS_STARTING
 #   ARCYD_STATUS_UPDATING
@@ -65,7 +70,11 @@
 #   ARCYD_STAT_CURRENT_CYCLE_TIME
 #   ARCYD_STAT_LAST_CYCLE_TIME
 #   ARCYD_STAT_TAG_SAMPLERS
+#   ARCYD_STAT_TAG_HISTOGRAMS
+#   ARCYD_STAT_TAG_COUNTS
 #   ARCYD_LIST_STATISTICS
+#   ARCYD_TAG_TRYLOOP_RETRIES
+#   ARCYD_TAG_ERRORS_SUFFIX
 #   ARCYD_LOGITEM_DATETIME
 #   ARCYD_LOGITEM_IDENTIFIER
 #   ARCYD_LOGITEM_DETAIL
@@ -82,9 +91,14 @@ import datetime
 import functools
 import inspect
 import os
+import threading
+import time
 import traceback
 import types
 
+import phlsys_histogram
+import phlsys_ringlog
+import phlsys_tracer
 import phlsys_subprocess
 
 ARCYD_STATUS = 'status'
@@ -97,6 +111,7 @@ ARCYD_LOG_SYSTEM_ERROR = 'log-system-error'
 ARCYD_LOG_USER_ACTION = 'log-user-action'
 
 ARCYD_LOG_USER_ACTION_MAX_SIZE = 5
+ARCYD_LOG_SYSTEM_ERROR_MAX_SIZE = 50
 
 ARCYD_LIST_ATTRIB = [
     ARCYD_CURRENT_REPO,
@@ -149,13 +164,24 @@ REPO_STATUSES = [
 ARCYD_STAT_CURRENT_CYCLE_TIME = 'current-cycle-time'
 ARCYD_STAT_LAST_CYCLE_TIME = 'last-cycle-time'
 ARCYD_STAT_TAG_SAMPLERS = 'tag-samplers'
+ARCYD_STAT_TAG_HISTOGRAMS = 'tag-histograms'
+ARCYD_STAT_TAG_COUNTS = 'tag-counts'
 
 ARCYD_LIST_STATISTICS = [
     ARCYD_STAT_CURRENT_CYCLE_TIME,
     ARCYD_STAT_LAST_CYCLE_TIME,
     ARCYD_STAT_TAG_SAMPLERS,
+    ARCYD_STAT_TAG_HISTOGRAMS,
+    ARCYD_STAT_TAG_COUNTS,
 ]
 
+# counted when a tryloop fails and will retry
+ARCYD_TAG_TRYLOOP_RETRIES = 'tryloop retries'
+
+# appended to the name of a timed tag to count the failures of decorated
+# methods, e.g. 'conduit.update_revision errors'
+ARCYD_TAG_ERRORS_SUFFIX = ' errors'
+
 ARCYD_LOGITEM_DATETIME = 'logitem-datetime'
 ARCYD_LOGITEM_IDENTIFIER = 'logitem-identifier'
 ARCYD_LOGITEM_DETAIL = 'logitem-detail'
@@ -197,7 +223,7 @@ class Sampler(object):
         else:
             self.times += 1
             self.total += measurement
-            self.mean = self.total / self.times
+            self.mean = self.total / float(self.times)
 
     def to_dict(self):
         return self.__dict__
@@ -264,32 +290,86 @@ class _CycleTimer(object):
 
 class ArcydReporter(object):
 
-    def __init__(self, output, io_log_path=None):
+    def __init__(
+            self,
+            output,
+            io_log_path=None,
+            write_interval=0,
+            log_spill_prefix=None,
+            tracer=None):
         """Initialise a new reporter to report to the specified outputs.
 
+        Routine updates, e.g. starting and finishing each repo, are written
+        at most once every 'write_interval' seconds.  Updates made in-between
+        are coalesced into a single write at the end of the interval.  Other
+        transitions, e.g. starting to sleep, are always written immediately.
+
+        Only the most recent log items are reported in the status, older ones
+        are spilled to files named by 'make_log_spill_path' if
+        'log_spill_prefix' is supplied, otherwise they're discarded.
+
         :output: output to write status to
         :io_log_path: path to log io operations to
+        :write_interval: minimum seconds between routine writes of the status
+        :log_spill_prefix: string path prefix of the files to spill logs to
+        :tracer: a phlsys_tracer.Tracer to record each cycle with, or None
 
         """
         super(ArcydReporter, self).__init__()
         self._output = output
+        self._write_interval = write_interval
+        self._last_write_time = None
+        self._pending_status = None
+        self._flush_timer = None
 
         log_path = io_log_path
         self._io_log_path = os.path.abspath(log_path) if log_path else None
 
         assert self._output
 
+        # N.B. repos may be processed concurrently on worker threads, so keep
+        #      track of the current repo for each thread and serialise access
+        #      to our data
+        self._lock = threading.RLock()
         self._repos = {}
-        self._repo = None
+
+        # N.B. ordered by when each repo was started, 'start_repo' moves the
+        #      thread's entry to the end, so the last is the most recent
+        self._thread_to_repo = collections.OrderedDict()
 
         self._cycle_timer = _CycleTimer()
         self._tag_samplers = collections.defaultdict(Sampler)
         self._tag_times_now = collections.defaultdict(float)
-        self._log_system_error = list()
-        self._log_user_action = list()
+
+        # the durations of each individual timing of a tag, unlike the
+        # samplers which only see the total for each cycle
+        self._tag_histograms = collections.defaultdict(
+            phlsys_histogram.Histogram)
+        self._tag_histograms_now = collections.defaultdict(
+            phlsys_histogram.Histogram)
+
+        # the totals of counted tags for each cycle, e.g. cache hits, these
+        # are kept apart from the timings as they have no units
+        self._tag_counts = collections.defaultdict(Sampler)
+        self._tag_counts_now = collections.defaultdict(int)
+
+        self._log_system_error = _make_ring_log(
+            ARCYD_LOG_SYSTEM_ERROR_MAX_SIZE,
+            log_spill_prefix,
+            ARCYD_LOG_SYSTEM_ERROR)
+        self._log_user_action = _make_ring_log(
+            ARCYD_LOG_USER_ACTION_MAX_SIZE,
+            log_spill_prefix,
+            ARCYD_LOG_USER_ACTION)
 
         self._external_system_error_logger = None
 
+        # the span of the repo being processed by each thread, if tracing
+        self._tracer = tracer
+        self._thread_to_repo_span = {}
+        if self._tracer is not None:
+            self._tracer.start_cycle()
+
         self._write_status(ARCYD_STATUS_STARTING)
 
     def set_external_system_error_logger(self, path):
@@ -299,12 +379,15 @@ class ArcydReporter(object):
         _ = duration  # NOQA
         self._cycle_timer.stop_cycle()
         self._write_status(ARCYD_STATUS_SLEEPING)
+        if self._tracer is not None:
+            self._tracer.finish_cycle()
 
     def update_sleep(self, duration):
         _ = duration  # NOQA
-        self._write_status(ARCYD_STATUS_SLEEPING)
+        self._write_status(ARCYD_STATUS_SLEEPING, coalesce=True)
 
     def on_tryloop_exception(self, e, delay):
+        self.tag_count(ARCYD_TAG_TRYLOOP_RETRIES)
         tb = traceback.format_exc()
         self._write_status(
             ARCYD_STATUS_TRYLOOP_EXCEPTION,
@@ -317,7 +400,8 @@ class ArcydReporter(object):
             ARCYD_LOGITEM_IDENTIFIER: identifier,
             ARCYD_LOGITEM_DETAIL: detail,
         }
-        log.append(d)
+        with self._lock:
+            log.append(d)
 
     def log_system_error(self, identifier, detail):
         self._add_log_item(self._log_system_error, identifier, detail)
@@ -329,13 +413,10 @@ class ArcydReporter(object):
 
     def log_user_action(self, identifier, detail):
         self._add_log_item(self._log_user_action, identifier, detail)
-        if self._log_user_action > ARCYD_LOG_USER_ACTION_MAX_SIZE:
-            max_size = ARCYD_LOG_USER_ACTION_MAX_SIZE
-            self._log_user_action = self._log_user_action[-max_size:]
 
     def log_io_action(self, identifier, detail):
         if self._io_log_path:
-            with open(self._io_log_path, 'a') as f:
+            with self._lock, open(self._io_log_path, 'a') as f:
                 now = str(datetime.datetime.utcnow())
                 description = '{}: {} - {}\n'.format(now, identifier, detail)
                 f.write(description)
@@ -349,9 +430,20 @@ class ArcydReporter(object):
         self._cycle_timer.start_cycle()
 
         # accumulate tag times from last cycle
-        for k, v in self._tag_times_now.iteritems():
-            self._tag_samplers[k].sample(v)
-        self._tag_times_now = collections.defaultdict(float)
+        with self._lock:
+            for k, v in self._tag_times_now.iteritems():
+                self._tag_samplers[k].sample(v)
+            self._tag_times_now = collections.defaultdict(float)
+            for k, v in self._tag_histograms_now.iteritems():
+                self._tag_histograms[k].merge(v)
+            self._tag_histograms_now = collections.defaultdict(
+                phlsys_histogram.Histogram)
+            for k, v in self._tag_counts_now.iteritems():
+                self._tag_counts[k].sample(v)
+            self._tag_counts_now = collections.defaultdict(int)
+
+        if self._tracer is not None:
+            self._tracer.start_cycle()
 
     def start_cache_refresh(self):
         self._write_status(ARCYD_STATUS_REFRESHING_CACHE)
@@ -360,24 +452,86 @@ class ArcydReporter(object):
         self._write_status(ARCYD_STATUS_IDLE)
 
     def start_repo(self, name, human_name):
-        self._repo = {
-            REPO_ATTRIB_NAME: name,
-            REPO_ATTRIB_HUMAN_NAME: human_name,
-            REPO_ATTRIB_STATUS: REPO_STATUS_UPDATING,
-        }
-        self._write_status(ARCYD_STATUS_UPDATING)
+        with self._lock:
+            thread = threading.current_thread()
+
+            # make sure this is the most recently started repo in the ordering
+            self._thread_to_repo.pop(thread, None)
+
+            self._thread_to_repo[thread] = {
+                REPO_ATTRIB_NAME: name,
+                REPO_ATTRIB_HUMAN_NAME: human_name,
+                REPO_ATTRIB_STATUS: REPO_STATUS_UPDATING,
+            }
+            self._thread_to_repo_span[thread] = self.start_trace_span(
+                human_name, 'repo')
+            self._write_status(ARCYD_STATUS_UPDATING, coalesce=True)
+
+    def start_trace_span(self, name, category, args=None):
+        """Return a new trace span on the current thread, if tracing.
+
+        The span must be passed to 'finish_trace_span' on the same thread.
+
+        :name: the string name of the span, e.g. the name of a branch
+        :category: the string category of the span, e.g. 'branch'
+        :args: a dict of string names to values to show with the span, or None
+        :returns: an opaque span, or None
+
+        """
+        if self._tracer is None:
+            return None
+        return self._tracer.begin(name, category, args)
+
+    def finish_trace_span(self, span):
+        """Finish 'span', as returned by 'start_trace_span'.
+
+        :span: an opaque span, or None
+        :returns: None
+
+        """
+        if self._tracer is not None:
+            self._tracer.end(span)
 
     @contextlib.contextmanager
-    def tag_timer_context(self, tag_name):
-        with timer_context() as timer:
+    def tag_timer_context(self, tag_name, trace_args=None):
+        # N.B. record failures too, so that errors can be counted against
+        #      the number of attempts
+        timer = Timer()
+        timer.start()
+        span = self.start_trace_span(
+            tag_name, _tag_to_trace_category(tag_name), trace_args)
+        try:
             yield
-        self._tag_times_now[tag_name] += timer.duration
+        finally:
+            timer.stop()
+            self.finish_trace_span(span)
+            with self._lock:
+                self._tag_times_now[tag_name] += timer.duration
+                self._tag_histograms_now[tag_name].record(timer.duration)
+
+    def tag_count(self, tag_name, count=1):
+        """Add 'count' to the 'tag_name' count for the current cycle.
+
+        :tag_name: string name of the tag to count against
+        :count: the number to add
+        :returns: None
+
+        """
+        with self._lock:
+            self._tag_counts_now[tag_name] += count
 
     def _tag_timer_decorate(self, tag, f):
         @functools.wraps(f)
         def wrapper(other_self, *args, **kwargs):
-            with self.tag_timer_context(tag):
-                return f(other_self, *args, **kwargs)
+            trace_args = None
+            if self._tracer is not None and self._tracer.is_sampling:
+                trace_args = _summarise_call_args(args, kwargs)
+            with self.tag_timer_context(tag, trace_args):
+                try:
+                    return f(other_self, *args, **kwargs)
+                except Exception:
+                    self.tag_count(tag + ARCYD_TAG_ERRORS_SUFFIX)
+                    raise
         return wrapper
 
     def tag_timer_decorate_object_methods(self, object_, tag):
@@ -396,24 +550,69 @@ class ArcydReporter(object):
                 object_.__dict__[name] = new_method
 
     def fail_repo(self):
-        self._repo[REPO_ATTRIB_STATUS] = REPO_STATUS_FAILED
-        self._repos[self._repo[REPO_ATTRIB_NAME]] = self._repo
-        self._repo = None
-        self._write_status(ARCYD_STATUS_UPDATING)
+        with self._lock:
+            repo = self._thread_to_repo.pop(threading.current_thread())
+            repo[REPO_ATTRIB_STATUS] = REPO_STATUS_FAILED
+            self._repos[repo[REPO_ATTRIB_NAME]] = repo
+            self.finish_trace_span(
+                self._thread_to_repo_span.pop(threading.current_thread()))
+            self._write_status(ARCYD_STATUS_UPDATING)
 
     def finish_repo(self):
-        if self._repo is None:
-            # if we fail_repo then we'll finish_repo after so allow
-            # finishing when there's no current repo
-            # (we still want to set the repo to None in fail_repo or we'll
-            #  accidentally set it to OK in this function)
-            return
-        self._repo[REPO_ATTRIB_STATUS] = REPO_STATUS_OK
-        self._repos[self._repo[REPO_ATTRIB_NAME]] = self._repo
-        self._repo = None
-        self._write_status(ARCYD_STATUS_IDLE)
-
-    def _write_status(self, status, description=None):
+        with self._lock:
+            repo = self._thread_to_repo.pop(threading.current_thread(), None)
+            if repo is None:
+                # if we fail_repo then we'll finish_repo after so allow
+                # finishing when there's no current repo
+                # (we still want to remove the repo in fail_repo or we'll
+                #  accidentally set it to OK in this function)
+                return
+            repo[REPO_ATTRIB_STATUS] = REPO_STATUS_OK
+            self._repos[repo[REPO_ATTRIB_NAME]] = repo
+            self.finish_trace_span(
+                self._thread_to_repo_span.pop(threading.current_thread()))
+
+            # other workers may still be processing their repos
+            status = ARCYD_STATUS_IDLE
+            if self._thread_to_repo:
+                status = ARCYD_STATUS_UPDATING
+            self._write_status(status, coalesce=True)
+
+    def _current_repo(self):
+        # report the most recently started of the repos being processed, the
+        # last in the start-ordered '_thread_to_repo'
+        current_repo = None
+        if self._thread_to_repo:
+            current_repo = self._thread_to_repo.values()[-1]
+        return current_repo
+
+    def _write_status(self, status, description=None, coalesce=False):
+        with self._lock:
+            now = time.time()
+            if coalesce and self._last_write_time is not None:
+                remaining = self._last_write_time + self._write_interval - now
+                if remaining > 0:
+                    self._pending_status = (status, description)
+                    self._start_flush_timer_locked(remaining)
+                    return
+            self._pending_status = None
+            self._last_write_time = now
+            self._write_status_locked(status, description)
+
+    def _start_flush_timer_locked(self, delay):
+        if self._flush_timer is None:
+            self._flush_timer = threading.Timer(delay, self._flush_pending)
+            self._flush_timer.daemon = True
+            self._flush_timer.start()
+
+    def _flush_pending(self):
+        with self._lock:
+            self._flush_timer = None
+            if self._pending_status is not None:
+                status, description = self._pending_status
+                self._write_status(status, description)
+
+    def _write_status_locked(self, status, description):
         timer = self._cycle_timer
         assert status in ARCYD_LIST_STATUS
 
@@ -421,26 +620,75 @@ class ArcydReporter(object):
         for k, v in tag_samplers.iteritems():
             tag_samplers[k] = v.to_dict()
 
+        tag_histograms = dict(
+            (k, v.to_dict()) for k, v in self._tag_histograms.iteritems())
+
+        tag_counts = dict(
+            (k, v.to_dict()) for k, v in self._tag_counts.iteritems())
+
         statistics = {
             ARCYD_STAT_CURRENT_CYCLE_TIME: timer.current_duration(),
             ARCYD_STAT_LAST_CYCLE_TIME: timer.last_duration,
             ARCYD_STAT_TAG_SAMPLERS: tag_samplers,
+            ARCYD_STAT_TAG_HISTOGRAMS: tag_histograms,
+            ARCYD_STAT_TAG_COUNTS: tag_counts,
         }
         assert set(statistics.keys()) == set(ARCYD_LIST_STATISTICS)
         d = {
             ARCYD_STATUS: status,
             ARCYD_STATUS_DESCRIPTION: description,
-            ARCYD_CURRENT_REPO: self._repo,
+            ARCYD_CURRENT_REPO: self._current_repo(),
             ARCYD_REPOS: [self._repos[k] for k in self._repos],
             ARCYD_STATISTICS: statistics,
-            ARCYD_LOG_SYSTEM_ERROR: self._log_system_error,
-            ARCYD_LOG_USER_ACTION: self._log_user_action,
+            ARCYD_LOG_SYSTEM_ERROR: self._log_system_error.items(),
+            ARCYD_LOG_USER_ACTION: self._log_user_action.items(),
         }
         assert set(d.keys()) == set(ARCYD_LIST_ATTRIB)
         self._output.write(d)
 
     def close(self):
-        self._write_status(ARCYD_STATUS_STOPPED)
+        with self._lock:
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+            self._write_status(ARCYD_STATUS_STOPPED)
+
+
+def _tag_to_trace_category(tag_name):
+    # decorated objects are tagged like 'git.fetch', use the object
+    if '.' in tag_name:
+        return tag_name.split('.', 1)[0]
+    return 'arcyd'
+
+
+def _summarise_call_args(args, kwargs):
+    trace_args = {}
+    if args:
+        trace_args['args'] = [phlsys_tracer.summarise(a) for a in args]
+    for name, value in kwargs.iteritems():
+        trace_args[name] = phlsys_tracer.summarise(value)
+    return trace_args
+
+
+def make_log_spill_path(log_spill_prefix, log_name):
+    """Return the path of the file that the 'log_name' log is spilled to.
+
+    Use 'phlsys_ringlog.read_spilled' to read the items back.
+
+    :log_spill_prefix: the prefix supplied to ArcydReporter
+    :log_name: ARCYD_LOG_SYSTEM_ERROR or ARCYD_LOG_USER_ACTION
+    :returns: the string path
+
+    """
+    return '{}.{}.jsonl'.format(log_spill_prefix, log_name)
+
+
+def _make_ring_log(capacity, log_spill_prefix, log_name):
+    spill_path = None
+    if log_spill_prefix:
+        spill_path = make_log_spill_path(
+            os.path.abspath(log_spill_prefix), log_name)
+    return phlsys_ringlog.RingLog(capacity, spill_path)
 
 
 #------------------------------------------------------------------------------
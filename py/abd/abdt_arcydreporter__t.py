@@ -0,0 +1,218 @@
+"""Test suite for abdt_arcydreporter."""
+#==============================================================================
+#                                   TEST PLAN
+#------------------------------------------------------------------------------
+# Here we detail the things we are concerned to test and specify which tests
+# cover those concerns.
+#
+# Concerns:
+# [ A] every update is written if there is no write interval
+# [ B] routine updates within the write interval are coalesced
+# [ B] coalesced updates are written at the end of the interval
+# [ B] important updates are written immediately
+# [ C] only the most recent log items are reported
+# [ C] older log items are spilled to a file
+# [ D] repos and decorated method calls are traced with their nesting
+# [ E] the status is only idle once every worker has finished its repo
+# [ E] the most recently started repo is reported as the current one
+# [ F] counted tags are reported apart from the timed tags
+#------------------------------------------------------------------------------
+# Tests:
+# [ A] test_A_Breathing
+# [ B] test_B_CoalesceWrites
+# [ C] test_C_Logs
+# [ D] test_D_Trace
+# [ E] test_E_ConcurrentRepos
+# [ F] test_F_Counts
+#==============================================================================
+
+from __future__ import absolute_import
+
+import threading
+import time
+import unittest
+
+import phlsys_fs
+import phlsys_ringlog
+import phlsys_tracer
+
+import abdt_arcydreporter
+
+
+class _RecordingOutput(object):
+
+    def __init__(self):
+        self.statuses = []
+        self.last = None
+
+    def write(self, d):
+        self.statuses.append(d[abdt_arcydreporter.ARCYD_STATUS])
+        self.last = d
+
+
+class Test(unittest.TestCase):
+
+    def test_A_Breathing(self):
+        output = _RecordingOutput()
+        reporter = abdt_arcydreporter.ArcydReporter(output)
+        reporter.start_repo('repo', 'repo')
+        reporter.finish_repo()
+        reporter.close()
+        self.assertEqual(
+            output.statuses,
+            [
+                abdt_arcydreporter.ARCYD_STATUS_STARTING,
+                abdt_arcydreporter.ARCYD_STATUS_UPDATING,
+                abdt_arcydreporter.ARCYD_STATUS_IDLE,
+                abdt_arcydreporter.ARCYD_STATUS_STOPPED,
+            ])
+
+    def test_B_CoalesceWrites(self):
+        output = _RecordingOutput()
+        reporter = abdt_arcydreporter.ArcydReporter(
+            output, write_interval=0.2)
+        for i in xrange(10):
+            reporter.start_repo('repo', 'repo')
+            reporter.finish_repo()
+        self.assertEqual(
+            output.statuses, [abdt_arcydreporter.ARCYD_STATUS_STARTING])
+
+        # the last of the coalesced updates is written after the interval
+        time.sleep(0.5)
+        self.assertEqual(
+            output.statuses,
+            [
+                abdt_arcydreporter.ARCYD_STATUS_STARTING,
+                abdt_arcydreporter.ARCYD_STATUS_IDLE,
+            ])
+
+        reporter.start_repo('repo', 'repo')
+        reporter.start_sleep(1)
+        self.assertEqual(
+            output.statuses[-1], abdt_arcydreporter.ARCYD_STATUS_SLEEPING)
+
+        reporter.close()
+        self.assertEqual(
+            output.statuses[-1], abdt_arcydreporter.ARCYD_STATUS_STOPPED)
+
+    def test_C_Logs(self):
+        max_size = abdt_arcydreporter.ARCYD_LOG_USER_ACTION_MAX_SIZE
+        log_name = abdt_arcydreporter.ARCYD_LOG_USER_ACTION
+        with phlsys_fs.chtmpdir_context():
+            output = _RecordingOutput()
+            reporter = abdt_arcydreporter.ArcydReporter(
+                output, log_spill_prefix='status')
+            for i in xrange(max_size + 2):
+                reporter.log_user_action('action', str(i))
+            reporter.close()
+
+            details = [
+                item[abdt_arcydreporter.ARCYD_LOGITEM_DETAIL]
+                for item in output.last[log_name]
+            ]
+            self.assertEqual(
+                details, [str(i) for i in xrange(2, max_size + 2)])
+
+            spill_path = abdt_arcydreporter.make_log_spill_path(
+                'status', log_name)
+            spilled = phlsys_ringlog.read_spilled(spill_path, 0, 10)
+            self.assertEqual(
+                [item[abdt_arcydreporter.ARCYD_LOGITEM_DETAIL]
+                 for item in spilled],
+                ['1', '0'])
+
+    def test_D_Trace(self):
+
+        class Git(object):
+
+            def fetch(self, remote):
+                pass
+
+        output = _RecordingOutput()
+        tracer = phlsys_tracer.Tracer(sample_rate=1)
+        reporter = abdt_arcydreporter.ArcydReporter(output, tracer=tracer)
+        git = Git()
+        reporter.tag_timer_decorate_object_methods_individually(git, 'git')
+
+        reporter.start_repo('repo', 'human repo')
+        git.fetch('origin')
+        reporter.finish_repo()
+        trace = tracer.finish_cycle()
+        reporter.close()
+
+        spans = [e for e in trace['traceEvents'] if e['ph'] == 'X']
+        self.assertEqual(
+            [(s['name'], s['cat']) for s in spans],
+            [('git.fetch', 'git'), ('human repo', 'repo')])
+        self.assertEqual(spans[0]['args'], {'args': ["'origin'"]})
+
+    def test_E_ConcurrentRepos(self):
+        output = _RecordingOutput()
+        reporter = abdt_arcydreporter.ArcydReporter(output)
+        started = threading.Event()
+        finish = threading.Event()
+
+        def process_other_repo():
+            reporter.start_repo('other', 'other')
+            started.set()
+            finish.wait()
+            reporter.finish_repo()
+
+        thread = threading.Thread(target=process_other_repo)
+        thread.start()
+        started.wait()
+
+        reporter.start_repo('repo', 'repo')
+        current_repo = output.last[abdt_arcydreporter.ARCYD_CURRENT_REPO]
+        self.assertEqual(
+            current_repo[abdt_arcydreporter.REPO_ATTRIB_NAME], 'repo')
+        reporter.finish_repo()
+        self.assertEqual(
+            output.statuses[-1], abdt_arcydreporter.ARCYD_STATUS_UPDATING)
+
+        finish.set()
+        thread.join()
+        self.assertEqual(
+            output.statuses[-1], abdt_arcydreporter.ARCYD_STATUS_IDLE)
+        reporter.close()
+
+    def test_F_Counts(self):
+        output = _RecordingOutput()
+        reporter = abdt_arcydreporter.ArcydReporter(output)
+        reporter.tag_count('hits', 2)
+        reporter.tag_count('hits')
+        with reporter.tag_timer_context('work'):
+            pass
+        reporter.start_sleep(1)
+        reporter.finish_sleep()
+        reporter.close()
+
+        stats = output.last[abdt_arcydreporter.ARCYD_STATISTICS]
+        counts = stats[abdt_arcydreporter.ARCYD_STAT_TAG_COUNTS]
+        samplers = stats[abdt_arcydreporter.ARCYD_STAT_TAG_SAMPLERS]
+        self.assertItemsEqual(counts.keys(), ['hits'])
+        self.assertEqual(counts['hits']['total'], 3)
+        self.assertItemsEqual(samplers.keys(), ['work'])
+
+
+#------------------------------------------------------------------------------
+# Copyright (C) 2013-2014 Bloomberg Finance L.P.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to
+# deal in the Software without restriction, including without limitation the
+# rights to use, copy, modify, merge, publish, distribute, sublicense, and/or
+# sell copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.  IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+# IN THE SOFTWARE.
+#------------------------------- END-OF-FILE ----------------------------------
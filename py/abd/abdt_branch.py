@@ -52,9 +52,7 @@
 from __future__ import absolute_import
 
 import phlgit_log
-import phlgit_push
 import phlgit_revparse
-import phlgitu_ref
 
 import abdt_differ
 import abdt_errident
@@ -228,8 +226,7 @@ class Branch(object):
         # appear.  reverse the order so that the the most recent commit is
         # considered first.
         hashes.reverse()
-        names_emails = phlgit_log.get_author_names_emails_from_hashes(
-            self._clone, hashes)
+        names_emails = self._get_author_names_emails_from_hashes(hashes)
         names_emails.reverse()
 
         return names_emails
@@ -252,11 +249,14 @@ class Branch(object):
         if not hashes:
             hashes = phlgit_log.get_last_n_commit_hashes_from_ref(
                 self._clone, 1, self._review_branch.remote_branch)
-        committers = phlgit_log.get_author_names_emails_from_hashes(
-            self._clone, hashes)
+        committers = self._get_author_names_emails_from_hashes(hashes)
         emails = [committer[1] for committer in committers]
         return emails
 
+    def _get_author_names_emails_from_hashes(self, hashes):
+        revisions = self._clone.make_revisions_from_hashes(hashes)
+        return phlgit_log.get_author_names_emails_from_revisions(revisions)
+
     def get_repo_name(self):
         """Return the human name for the repo the branch came from."""
         return self._repo_name
@@ -320,10 +320,10 @@ class Branch(object):
         return message
 
     def make_raw_diff(self):
-        """Return a string raw diff of the changes on the branch.
+        """Return an 'abdt_differ.DiffResult' of the changes on the branch.
 
         If the diff would exceed the pre-specified max diff size then take
-        measures to reduce the diff.
+        measures to reduce the diff, these are described in the result.
 
         """
         return abdt_differ.make_raw_diff(
@@ -352,7 +352,7 @@ class Branch(object):
     def get_commit_message_from_tip(self):
         """Return string commit message from latest commit on branch."""
         hashes = self._get_commit_hashes()
-        revision = phlgit_log.make_revision_from_hash(self._clone, hashes[-1])
+        revision = self._clone.make_revisions_from_hashes([hashes[-1]])[0]
         message = revision.subject + "\n"
         message += "\n"
         message += revision.message + "\n"
@@ -366,7 +366,7 @@ class Branch(object):
 
     def _push_delete_tracking_branch(self):
         def action():
-            self._clone.push_delete(self._tracking_branch.branch)
+            self._clone.push_delete_tracker(self._tracking_branch.branch)
 
         self._tryloop(action, abdt_errident.PUSH_DELETE_TRACKING)
 
@@ -558,18 +558,10 @@ class Branch(object):
 
         new_branch = self._tracking_branch.branch
         if old_branch == new_branch:
-            phlgit_push.push_asymmetrical_force(
-                self._clone,
-                self._review_branch.remote_branch,
-                phlgitu_ref.make_local(new_branch),
-                self._tracking_branch.remote)
-        else:
-            phlgit_push.move_asymmetrical(
-                self._clone,
-                self._review_branch.remote_branch,
-                phlgitu_ref.make_local(old_branch),
-                phlgitu_ref.make_local(new_branch),
-                self._clone.get_remote())
+            old_branch = None
+
+        self._clone.push_tracker(
+            self._review_branch.remote_branch, new_branch, old_branch)
 
         self._tracking_hash = self._review_hash
 
@@ -577,11 +569,8 @@ class Branch(object):
         tracking_branch = self._review_branch.make_tracker(
             status, revision_id)
 
-        phlgit_push.push_asymmetrical_force(
-            self._clone,
-            self._review_branch.remote_branch,
-            phlgitu_ref.make_local(tracking_branch.branch),
-            tracking_branch.remote)
+        self._clone.push_tracker(
+            self._review_branch.remote_branch, tracking_branch.branch)
 
         self._tracking_branch = tracking_branch
         self._tracking_hash = self._review_hash
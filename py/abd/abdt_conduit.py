@@ -8,6 +8,7 @@
 #   Conduit
 #    .describe
 #    .refresh_cache_on_cycle
+#    .prefetch_review_states
 #    .create_comment
 #    .create_empty_revision_as_user
 #    .get_commit_message
@@ -17,6 +18,7 @@
 #    .parse_commit_message
 #    .is_review_accepted
 #    .is_review_abandoned
+#    .get_review_state_fingerprint
 #    .is_review_recently_updated
 #    .update_revision
 #    .set_requires_revision
@@ -25,6 +27,9 @@
 #    .accept_revision_as_user
 #    .commandeer_revision_as_user
 #
+# Public Functions:
+#   set_max_in_flight
+#
 # -----------------------------------------------------------------------------
 # (this contents block is generated, edits will be lost)
 # =============================================================================
@@ -32,29 +37,58 @@
 from __future__ import absolute_import
 
 import datetime
+import threading
 
 import phlcon_differential
 import phlcon_user
+import phlcon_userdirectory
 import phlsys_conduit
 import phlsys_textconvert
 
 import abdt_exception
 import abdt_logging
 
+# the maximum number of independent conduit calls to make at the same time
+_MAX_IN_FLIGHT = phlsys_conduit.DEFAULT_MAX_IN_FLIGHT
+
+
+def set_max_in_flight(max_in_flight):
+    """Set the maximum number of independent conduit calls to make at once.
+
+    :max_in_flight: the maximum number of calls, 1 to make them one at a time
+    :returns: None
+
+    """
+    global _MAX_IN_FLIGHT
+    _MAX_IN_FLIGHT = max_in_flight
+
 
 # TODO: re-order methods as (accessor, mutator)
 class Conduit(object):
 
-    def __init__(self, conduit, reviewstate_cache):
+    def __init__(self, conduit, reviewstate_cache, user_directory=None):
         """Initialise a new Conduit.
 
         :conduit: a phlsys_conduit to delegate to
+        :reviewstate_cache: a phlcon_reviewstatecache.ReviewStateCache
+        :user_directory: a phlcon_userdirectory.UserDirectory or None to
+                         make a new one which isn't persisted
         :returns: None
 
         """
         super(Conduit, self).__init__()
         self._conduit = conduit
         self._reviewstate_cache = reviewstate_cache
+        self._user_directory = user_directory
+        if self._user_directory is None:
+            self._user_directory = phlcon_userdirectory.UserDirectory(conduit)
+
+        # the authors of revisions rarely change, remember them to save
+        # querying for them every time that we act as the author.  Repos may
+        # be processed concurrently with the same Conduit, so guard them.
+        self._author_lock = threading.Lock()
+        self._revision_to_author = {}
+        self._phid_to_username = {}
 
     def describe(self):
         """Return a string description of this conduit for a human to read.
@@ -80,6 +114,21 @@ class Conduit(object):
 
         """
         self._reviewstate_cache.refresh_active_reviews()
+        with self._author_lock:
+            self._revision_to_author = {}
+            self._phid_to_username = {}
+
+    def prefetch_review_states(self, revisionids):
+        """Retrieve the states of 'revisionids' in as few queries as possible.
+
+        This is an optimisation for when it is known that the states will be
+        needed soon, it isn't required before querying them.
+
+        :revisionids: a list of ids of Differential revisions
+        :returns: None
+
+        """
+        self._reviewstate_cache.prefetch(revisionids)
 
     def create_comment(self, revision, message, silent=False):
         """Make a comment on the specified 'revision'.
@@ -149,11 +198,7 @@ class Conduit(object):
         :returns: a (username, phid) tuple
 
         """
-        user = phlcon_user.query_user_from_email(self._conduit, email)
-        result = None
-        if user:
-            result = (user.userName, user.phid)
-        return result
+        return self._user_directory.query_user_from_email(email)
 
     def query_users_from_emails(self, emails):
         """Return a list of username strings based on the provided emails.
@@ -165,7 +210,9 @@ class Conduit(object):
         :returns: a list of strings corresponding to Phabricator usernames
 
         """
-        return phlcon_user.query_users_from_emails(self._conduit, emails)
+        users = self._user_directory.query_users_from_emails(
+            emails, _MAX_IN_FLIGHT)
+        return [u[0] if u is not None else None for u in users]
 
     def parse_commit_message(self, message):
         """Return a ParseCommitMessageResponse based on 'message'.
@@ -178,11 +225,33 @@ class Conduit(object):
         return phlcon_differential.parse_commit_message(self._conduit, message)
 
     def _get_author_user(self, revisionid):
-        # TODO: these queries are very expensive, cache them
-        revision = phlcon_differential.query(self._conduit, [revisionid])[0]
-        author_user = phlcon_user.query_usernames_from_phids(
-            self._conduit, [revision.authorPHID])[0]
-        return author_user
+        with self._author_lock:
+            author_user = self._revision_to_author.get(revisionid)
+            if author_user is None:
+                author_phid = self._reviewstate_cache.get_author_phid(
+                    revisionid)
+                if author_phid not in self._phid_to_username:
+                    self._resolve_author_phids(author_phid)
+                author_user = self._phid_to_username[author_phid]
+                self._revision_to_author[revisionid] = author_user
+            return author_user
+
+    def _resolve_author_phids(self, author_phid):
+        # resolve all the authors that the review state cache knows about in
+        # one query, it's likely that we'll need to act as them later
+        phids = self._reviewstate_cache.get_known_author_phids()
+        phids.add(author_phid)
+        phids.difference_update(self._phid_to_username)
+
+        users = phlcon_user.query_users_from_phids(self._conduit, list(phids))
+        if users is None:
+            # at least one of the phids is bad, just get the one we need
+            users = phlcon_user.query_users_from_phids(
+                self._conduit, [author_phid])
+            if users is None:
+                raise Exception("unknown author: " + str(author_phid))
+
+        self._phid_to_username.update((u.phid, u.userName) for u in users)
 
     def is_review_accepted(self, revisionid):
         """Return True if the supplied 'revisionid' is in 'accepted' status.
@@ -209,6 +278,20 @@ class Conduit(object):
         update_time = datetime.datetime.fromtimestamp(float(date_modified))
         return datetime.datetime.now() - update_time
 
+    def get_review_state_fingerprint(self, revisionid):
+        """Return a value which changes whenever 'revisionid' is modified.
+
+        The value may be compared with '==' to values returned for the same
+        'revisionid' previously.
+
+        :revisionid: id of the Differential revision to query
+        :returns: a hashable value
+
+        """
+        return (
+            self._reviewstate_cache.get_status(revisionid),
+            self._reviewstate_cache.get_date_modified(revisionid))
+
     def is_review_recently_updated(self, revisionid):
         """Return True if the supplied 'revisionid' was updated recently.
 
@@ -336,6 +419,7 @@ class Conduit(object):
                 self._conduit,
                 revisionid,
                 action=phlcon_differential.Action.claim)
+        self._revision_to_author[revisionid] = username
         self._log(
             'conduit-commandeer',
             'commandeered {} as {}'.format(revisionid, username))
@@ -20,6 +20,7 @@
 #    .describe
 #    .create_comment
 #    .refresh_cache_on_cycle
+#    .prefetch_review_states
 #    .create_empty_revision_as_user
 #    .get_commit_message
 #    .create_revision_as_user
@@ -28,6 +29,7 @@
 #    .parse_commit_message
 #    .is_review_accepted
 #    .is_review_abandoned
+#    .get_review_state_fingerprint
 #    .is_review_recently_updated
 #    .update_revision
 #    .set_requires_revision
@@ -68,22 +70,34 @@ class _Revision(object):
         self.revisionid = revisionid
         self.author = author
         self._status = None
+        self._modified_count = 0
         self.set_in_review()
 
+    def touch(self):
+        self._modified_count += 1
+
+    def fingerprint(self):
+        return (self._status, self._modified_count)
+
     def set_abandoned(self):
         self._status = _RevisionStates.abandoned
+        self.touch()
 
     def set_accepted(self):
         self._status = _RevisionStates.accepted
+        self.touch()
 
     def set_closed(self):
         self._status = _RevisionStates.closed
+        self.touch()
 
     def set_in_review(self):
         self._status = _RevisionStates.in_review
+        self.touch()
 
     def set_needs_revision(self):
         self._status = _RevisionStates.needs_revision
+        self.touch()
 
     def is_abandoned(self):
         return self._status == _RevisionStates.abandoned
@@ -217,7 +231,7 @@ class ConduitMock(object):
         # unused parameters
         _ = silent  # NOQA
 
-        self._data.assert_is_revision(revision)
+        self._data.get_revision(revision).touch()
         str(message)  # test that message can be converted to string
         self._data.set_changed()
 
@@ -233,6 +247,18 @@ class ConduitMock(object):
         """
         pass
 
+    def prefetch_review_states(self, revisionids):
+        """Retrieve the states of 'revisionids' in as few queries as possible.
+
+        This is an optimisation for when it is known that the states will be
+        needed soon, it isn't required before querying them.
+
+        :revisionids: a list of ids of Differential revisions
+        :returns: None
+
+        """
+        pass
+
     def create_empty_revision_as_user(self, username):
         """Return the id of a newly created empty revision as 'username'.
 
@@ -336,6 +362,18 @@ class ConduitMock(object):
         revision = self._data.get_revision(revisionid)
         return revision.is_abandoned()
 
+    def get_review_state_fingerprint(self, revisionid):
+        """Return a value which changes whenever 'revisionid' is modified.
+
+        The value may be compared with '==' to values returned for the same
+        'revisionid' previously.
+
+        :revisionid: id of the Differential revision to query
+        :returns: a hashable value
+
+        """
+        return self._data.get_revision(revisionid).fingerprint()
+
     def is_review_recently_updated(self, revisionid):
         """Return True if the supplied 'revisionid' was updated recently.
 
@@ -373,6 +411,7 @@ class ConduitMock(object):
         # a sticky state as far as updating the review is concerned
         if not revision.is_accepted():
             revision.set_in_review()
+        revision.touch()
 
         self._data.set_changed()
 
@@ -440,6 +479,7 @@ class ConduitMock(object):
         assert not revision.is_closed()
         assert revision.author != username
         revision.author = username
+        revision.touch()
         self._data.set_changed()
 
 
@@ -5,69 +5,377 @@
 # abdt_differ
 #
 # Public Functions:
+#   set_cache_max_bytes
+#   set_generated_file_globs
 #   make_raw_diff
 #
+# Public Assignments:
+#   DiffResult
+#
 # -----------------------------------------------------------------------------
 # (this contents block is generated, edits will be lost)
 # =============================================================================
 
 from __future__ import absolute_import
 
+import collections
+import fnmatch
+import math
+import threading
+
 import phlgit_diff
+import phlgit_mergebase
+import phlgit_revparse
+import phlsys_lrucache
+import phlsys_subprocess
 
 import abdt_exception
 
 _LOTS_OF_DIFF_CONTEXT_LINES = 10000
-_LESS_DIFF_CONTEXT_LINES = 100
+
+# files which are likely to be generated, these are left out of the diff
+# first if it's too big
+_DEFAULT_GENERATED_FILE_GLOBS = [
+    '*.min.js',
+    '*.min.css',
+    '*.js.map',
+    '*.css.map',
+    '*_pb2.py',
+    '*.pb.cc',
+    '*.pb.h',
+    '*.pb.go',
+    'package-lock.json',
+    'yarn.lock',
+]
+
+_DEFAULT_CACHE_MAX_BYTES = 64 * 1024 * 1024
+
+# the number of (base, tip) pairs to remember the fitting plan for
+_MAX_FITTING_LEVELS = 10000
+
+# the most files that a diff may change and still be reduced, bigger diffs
+# are rejected outright
+_MAX_REDUCIBLE_FILES = 10000
+
+# the most files to name on a single git command-line, so that reducing a
+# diff with many files can't exceed the operating system's limit
+_MAX_LISTED_FILES = 1000
+
+"""NamedTuple to represent a diff and any reductions made to it.
+
+:diff: the unicode diff
+:reduced_context_paths: list of string paths which have less context
+:excluded_paths: list of string paths which were left out of the diff
+
+"""
+DiffResult = collections.namedtuple(
+    "abdt_differ__DiffResult", [
+        'diff',
+        'reduced_context_paths',
+        'excluded_paths',
+    ])
+
+# a plan for reducing the diff.  'reduced' and 'excluded' are tuples of
+# 'FileStat' to report.  'full_pathspecs' and 'reduced_pathspecs' select the
+# files to diff with full context and with no context, None to diff none.
+_Plan = collections.namedtuple(
+    '_Plan', ['reduced', 'excluded', 'full_pathspecs', 'reduced_pathspecs'])
+
+
+class _DiffCache(object):
+
+    def __init__(self, max_bytes):
+        # N.B. repos may be processed concurrently, serialise access
+        self._lock = threading.Lock()
+
+        # (base sha1, tip sha1, context, pathspecs) -> raw diff, as bytes
+        # from git.  the numstat output is also stored here.
+        self._diffs = phlsys_lrucache.LruCache(max_bytes, len)
+
+        # (base sha1, tip sha1) -> index of the plan that last fit
+        self._fitting_levels = phlsys_lrucache.LruCache(_MAX_FITTING_LEVELS)
+
+    def get_diff(self, key):
+        with self._lock:
+            return self._diffs.get(key)
+
+    def set_diff(self, key, raw_diff):
+        with self._lock:
+            self._diffs[key] = raw_diff
+
+    def get_fitting_level(self, key):
+        with self._lock:
+            return self._fitting_levels.get(key, 0)
+
+    def set_fitting_level(self, key, level):
+        with self._lock:
+            self._fitting_levels[key] = level
+
+
+_CACHE = _DiffCache(_DEFAULT_CACHE_MAX_BYTES)
+_GENERATED_FILE_GLOBS = list(_DEFAULT_GENERATED_FILE_GLOBS)
+
+
+def set_cache_max_bytes(max_bytes):
+    """Set the total size of diffs to remember between calls to make_raw_diff.
+
+    Note that this discards any diffs that are already remembered.
+
+    :max_bytes: the maximum total size of the remembered diffs, 0 to disable
+    :returns: None
+
+    """
+    global _CACHE
+    _CACHE = _DiffCache(max_bytes)
+
+
+def set_generated_file_globs(globs):
+    """Set the globs which match files that are likely to be generated.
+
+    If a diff is too big then these files are left out of it first.
+
+    :globs: list of string fnmatch-style globs, matched against the full path
+    :returns: None
+
+    """
+    global _GENERATED_FILE_GLOBS
+    _GENERATED_FILE_GLOBS = list(globs)
 
 
 def make_raw_diff(clone, base, branch, max_bytes):
-    """Return a string raw diff of the changes on 'branch'.
+    """Return a 'DiffResult' of the changes on 'branch'.
 
-    If the diff would exceed the _MAX_DIFF_SIZE then take measures
-    to reduce the diff size by reducing the amount of context.
+    If the diff would exceed the _MAX_DIFF_SIZE then take measures to reduce
+    the diff size.  Generated files are left out first, then the largest
+    files have their context reduced, then the largest files are left out.
+    The reductions are described in the 'DiffResult'.
 
     Raise 'abdt_exception.LargeDiffException' if the diff could not be fit into
-    'max_bytes'.
+    'max_bytes', diffs which change very many files aren't reduced at all.
+
+    Diffs are remembered by the commits they were made from, so that they
+    don't need to be regenerated if asked for again.  The reductions which
+    last fit into 'max_bytes' are also remembered, so that they can be
+    tried first next time.
 
     :clone: supports 'call'
     :base: string name of the merge-base of 'branch'
     :branch: string name of the branch to diff
     :max_bytes: the maximum allowed size of the diff
-    :returns: the string diff of the changes on the branch
+    :returns: a 'DiffResult' of the changes on the branch
 
     """
-    raw_diff = phlgit_diff.raw_diff_range(
-        clone, base, branch, _LOTS_OF_DIFF_CONTEXT_LINES)
+    # N.B. 'git diff base...branch' is the same as diffing from the merge-base
+    #      to the tip of 'branch', so it's fully determined by the two hashes
+    tip = phlgit_revparse.get_sha1(clone, branch)
+    merge_base = phlgit_mergebase.get_merge_base(clone, base, tip)
+    cache = _CACHE
+    range_key = (merge_base, tip)
 
-    # TODO: report that we replaced errors, if any
-    raw_diff = unicode(raw_diff, errors='replace')
+    # the diff fits if it's less than 'max_bytes', which may not be integral
+    limit = int(math.ceil(max_bytes)) - 1
+
+    # the first plan is to not reduce anything, only work out the others if
+    # we need them.  start with the plan that fit last time to save diffing.
+    plans = [
+        _Plan(
+            reduced=(),
+            excluded=(),
+            full_pathspecs=(),
+            reduced_pathspecs=None)
+    ]
+    level = cache.get_fitting_level(range_key)
+    if level:
+        plans.extend(_make_reduction_plans(cache, clone, merge_base, tip))
+        if level >= len(plans):
+            level = 0
+
+    while True:
+        raw_diff, diff_len = _get_planned_raw_diff(
+            cache, clone, merge_base, tip, plans[level], limit)
+        if raw_diff is not None:
+            break
+
+        if len(plans) == 1:
+            plans.extend(_make_reduction_plans(cache, clone, merge_base, tip))
+
+        # if the diff is still too big then error
+        if level + 1 == len(plans):
+            cache.set_fitting_level(range_key, level)
+            raise abdt_exception.LargeDiffException(
+                "diff too big", diff_len, max_bytes)
+
+        level += 1
+
+    cache.set_fitting_level(range_key, level)
 
     if not raw_diff:
         raise abdt_exception.AbdUserException(
             str("no difference from " + base + " to " + branch))
 
-    # TODO: detect generated files and try less context on just those first
-    # TODO: detect generated files and try no context on just those first
-    # TODO: detect generated files and try excluding those first
+    # TODO: report that we replaced errors, if any
+    plan = plans[level]
+    return DiffResult(
+        diff=unicode(raw_diff, errors='replace'),
+        reduced_context_paths=_describe_paths(plan.reduced),
+        excluded_paths=_describe_paths(plan.excluded))
+
+
+def _is_generated(file_stat):
+    return any(
+        fnmatch.fnmatch(path, glob)
+        for path in file_stat.paths
+        for glob in _GENERATED_FILE_GLOBS)
+
+
+def _make_reduction_plans(cache, clone, merge_base, tip):
+    # return a list of '_Plan', in the order to try them.  the pathspecs are
+    # made from the smaller side of each split of the files, so that they
+    # never name more than '_MAX_LISTED_FILES' files.
+
+    key = (merge_base, tip, '--numstat')
+    raw_numstat = cache.get_diff(key)
+    if raw_numstat is None:
+        raw_numstat = phlgit_diff.raw_numstat_range(clone, merge_base, tip)
+        cache.set_diff(key, raw_numstat)
+    file_stats = phlgit_diff.parse_numstat_z(raw_numstat)
+    if len(file_stats) > _MAX_REDUCIBLE_FILES:
+        return []
+
+    def num_lines(file_stat):
+        return (file_stat.added or 0) + (file_stat.deleted or 0)
+
+    generated = tuple(f for f in file_stats if _is_generated(f))
+    others = [f for f in file_stats if not _is_generated(f)]
+    if not others:
+        # don't plan to leave everything out, treat them like any others
+        others = list(generated)
+        generated = ()
+
+    # the biggest files have the most to lose
+    others.sort(key=num_lines, reverse=True)
+    others = tuple(others)
+
+    # N.B. exclude the generated files by the globs which matched them rather
+    #      than by naming them, there may be very many.  the default pathspec
+    #      magic matches like 'fnmatch', where '*' may match '/'.
+    everything = ('.',)
+    if generated:
+        everything += tuple(':(exclude)' + g for g in _GENERATED_FILE_GLOBS)
+
+    plans = []
+    if generated:
+        plans.append(
+            _Plan(
+                reduced=(),
+                excluded=generated,
+                full_pathspecs=everything,
+                reduced_pathspecs=None))
+
+    # reduce the context on more and more of the biggest files, until all
+    # of them have no context
+    max_count = min(len(others) - 1, _MAX_LISTED_FILES)
+    for count in _doubling_counts(max_count):
+        biggest = _literal_paths(others[:count])
+        plans.append(
+            _Plan(
+                reduced=others[:count],
+                excluded=generated,
+                full_pathspecs=everything + _exclude_pathspecs(biggest),
+                reduced_pathspecs=_include_pathspecs(biggest)))
+    plans.append(
+        _Plan(
+            reduced=others,
+            excluded=generated,
+            full_pathspecs=None,
+            reduced_pathspecs=everything))
+
+    # leave out more and more of the biggest files, but never all of them
+    for count in _doubling_counts(max_count):
+        biggest = _literal_paths(others[:count])
+        plans.append(
+            _Plan(
+                reduced=others[count:],
+                excluded=generated + others[:count],
+                full_pathspecs=None,
+                reduced_pathspecs=everything + _exclude_pathspecs(biggest)))
+
+    return plans
+
+
+def _doubling_counts(max_count):
+    # return a list like [1, 2, 4, max_count] if 'max_count' is 6
+    counts = []
+    count = 1
+    while count < max_count:
+        counts.append(count)
+        count *= 2
+    if max_count > 0:
+        counts.append(max_count)
+    return counts
+
+
+def _describe_paths(file_stats):
+    # describe each file by its new path
+    return [f.paths[-1] for f in file_stats]
+
+
+def _literal_paths(file_stats):
+    return [p for f in file_stats for p in f.paths]
+
+
+# N.B. use 'literal' pathspecs so that paths aren't interpreted as globs
+def _include_pathspecs(paths):
+    return tuple(':(literal)' + p for p in paths)
+
+
+def _exclude_pathspecs(paths):
+    return tuple(':(exclude,literal)' + p for p in paths)
+
+
+def _get_planned_raw_diff(cache, clone, merge_base, tip, plan, limit):
+    # return a tuple of (raw_diff, diff_len), 'raw_diff' is None if 'diff_len'
+    # is over the 'limit'.  note that we stop generating the diff as soon as
+    # it goes over the limit, so 'diff_len' may be less than the full size.
+
+    raw_diff, diff_len = '', 0
+    if plan.full_pathspecs is not None:
+        raw_diff, diff_len = _get_raw_diff(
+            cache, clone, merge_base, tip, _LOTS_OF_DIFF_CONTEXT_LINES,
+            plan.full_pathspecs, limit)
+        if raw_diff is None:
+            return raw_diff, diff_len
+
+    if plan.reduced_pathspecs is None:
+        return raw_diff, diff_len
+
+    reduced_raw_diff, reduced_len = _get_raw_diff(
+        cache, clone, merge_base, tip, 0, plan.reduced_pathspecs,
+        limit - diff_len)
+    if reduced_raw_diff is None:
+        return None, diff_len + reduced_len
+
+    return raw_diff + reduced_raw_diff, diff_len + reduced_len
+
 
-    # if the diff is too big then regen with less context
-    if len(raw_diff) >= max_bytes:
-        raw_diff = phlgit_diff.raw_diff_range(
-            clone, base, branch, _LESS_DIFF_CONTEXT_LINES)
+def _get_raw_diff(cache, clone, merge_base, tip, context, pathspecs, limit):
+    # return a tuple of (raw_diff, diff_len) as for '_get_planned_raw_diff'
 
-    # if the diff is still too big then regen with no context
-    if len(raw_diff) >= max_bytes:
-        raw_diff = phlgit_diff.raw_diff_range(clone, base, branch, None)
+    key = (merge_base, tip, context, pathspecs)
+    raw_diff = cache.get_diff(key)
+    if raw_diff is None:
+        try:
+            raw_diff = phlgit_diff.raw_diff_range(
+                clone, merge_base, tip, context, limit, pathspecs)
+        except phlsys_subprocess.OutputLimitExceededError as e:
+            return None, e.size_read
+        cache.set_diff(key, raw_diff)
 
-    # if the diff is still too big then error
-    if len(raw_diff) >= max_bytes:
-        raise abdt_exception.LargeDiffException(
-            "diff too big", len(raw_diff), max_bytes)
+    if len(raw_diff) > limit:
+        return None, len(raw_diff)
 
-    # TODO: somehow report if we had to reduce the diff at all
+    return raw_diff, len(raw_diff)
 
-    return raw_diff
 
 #------------------------------------------------------------------------------
 # Copyright (C) 2013-2014 Bloomberg Finance L.P.
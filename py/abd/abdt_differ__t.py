@@ -6,33 +6,235 @@
 # cover those concerns.
 #
 # Concerns:
-# [  ] a diff within the limits passes straight through
-# [  ] a diff outside the limits can be reduced ok with less context
-# [  ] a diff still outside the limits can be reduced ok with no context
-# [  ] raise if a diff cannot be reduced to the limits
+# [ B] a diff within the limits passes straight through
+# [ B] a diff outside the limits can be reduced ok with less context
+# [ B] raise if a diff cannot be reduced to the limits
 # [  ] bad unicode chars are replaced
+# [ C] diffs are not regenerated for the same commits and context
+# [ C] the reductions that fit last time are tried first
+# [ D] generated files are left out first
+# [ D] the largest files have their context reduced before smaller ones
+# [ D] the largest files are left out before smaller ones
+# [ D] reductions are reported in the result
+# [ E] files with reduced context have no context lines
+# [ F] diffs with very many files are reduced without naming them all
+# [ F] diffs with too many files to reduce are rejected outright
 #------------------------------------------------------------------------------
 # Tests:
 # [ A] test_A_Breathing
+# [ B] test_B_ReduceContext
+# [ C] test_C_Cache
+# [ D] test_D_ReduceFiles
+# [ E] test_E_NoContext
+# [ F] test_F_ManyFiles
 #==============================================================================
 
 from __future__ import absolute_import
 
+import contextlib
+import os
 import unittest
 
-# import abdt_differ
+import phlsys_git
+
+import abdt_differ
+import abdt_exception
+
+
+class _CountingClone(object):
+
+    def __init__(self, clone):
+        self._clone = clone
+        self.diffs = []
+
+    def call(self, *args, **kwargs):
+        if args[0] == 'diff':
+            self.diffs.append(args)
+        return self._clone.call(*args, **kwargs)
+
+
+def _write_lines(repo, filename, lines):
+    path = os.path.join(repo.working_dir, filename)
+    if not os.path.isdir(os.path.dirname(path)):
+        os.makedirs(os.path.dirname(path))
+    with open(path, 'w') as f:
+        f.write(''.join(lines))
+
+
+@contextlib.contextmanager
+def _big_change_repo_context(extra_files=None):
+    # make a repo with a 'master' and a 'change' branch, where 'change'
+    # changes one line in the middle of a long file and adds 'extra_files'
+    with phlsys_git.tmprepo_context() as repo:
+        lines = ['line {}\n'.format(i) for i in xrange(1000)]
+        _write_lines(repo, 'README', lines)
+        _write_lines(repo, 'small.txt', ['small\n'])
+        repo.call('add', '.')
+        repo.call('commit', '-m', 'initial commit')
+        repo.call('checkout', '-b', 'change')
+        lines[500] = 'changed\n'
+        _write_lines(repo, 'README', lines)
+        for filename, file_lines in (extra_files or {}).iteritems():
+            _write_lines(repo, filename, file_lines)
+        repo.call('add', '.')
+        repo.call('commit', '-m', 'change')
+        yield repo
 
 
 class Test(unittest.TestCase):
 
     def setUp(self):
-        pass
+        abdt_differ.set_cache_max_bytes(1024 * 1024)
 
     def tearDown(self):
-        pass
+        abdt_differ.set_cache_max_bytes(1024 * 1024)
 
     def test_A_Breathing(self):
-        pass
+        with _big_change_repo_context() as repo:
+            result = abdt_differ.make_raw_diff(
+                repo, 'master', 'change', 1024 * 1024)
+            self.assertIn('+changed', result.diff)
+            self.assertIsInstance(result.diff, unicode)
+            self.assertListEqual(result.reduced_context_paths, [])
+            self.assertListEqual(result.excluded_paths, [])
+
+    def test_B_ReduceContext(self):
+        with _big_change_repo_context() as repo:
+            lots = abdt_differ.make_raw_diff(repo, 'master', 'change', 100000)
+            less = abdt_differ.make_raw_diff(
+                repo, 'master', 'change', len(lots.diff))
+            self.assertLess(len(less.diff), len(lots.diff))
+            self.assertIn('+changed', less.diff)
+            self.assertListEqual(less.reduced_context_paths, ['README'])
+            self.assertListEqual(less.excluded_paths, [])
+
+            # there's only one file, so it can't be left out
+            self.assertRaises(
+                abdt_exception.LargeDiffException,
+                abdt_differ.make_raw_diff,
+                repo,
+                'master',
+                'change',
+                len(less.diff))
+
+    def test_C_Cache(self):
+        with _big_change_repo_context() as repo:
+            clone = _CountingClone(repo)
+            lots = abdt_differ.make_raw_diff(clone, 'master', 'change', 100000)
+            self.assertEqual(len(clone.diffs), 1)
+
+            # the same diff again should come from the cache
+            self.assertEqual(
+                lots,
+                abdt_differ.make_raw_diff(clone, 'master', 'change', 100000))
+            self.assertEqual(len(clone.diffs), 1)
+
+            # after reducing the diff, the same reductions are tried first
+            less = abdt_differ.make_raw_diff(
+                clone, 'master', 'change', len(lots.diff))
+            clone.diffs = []
+            self.assertEqual(
+                less,
+                abdt_differ.make_raw_diff(
+                    clone, 'master', 'change', len(lots.diff)))
+            self.assertListEqual(clone.diffs, [])
+
+            # a disabled cache regenerates each time
+            abdt_differ.set_cache_max_bytes(0)
+            abdt_differ.make_raw_diff(clone, 'master', 'change', 100000)
+            abdt_differ.make_raw_diff(clone, 'master', 'change', 100000)
+            self.assertEqual(len(clone.diffs), 2)
+
+    def test_D_ReduceFiles(self):
+        generated = ['var x{} = {};\n'.format(i, i) for i in xrange(2000)]
+        extra_files = {
+            'small.txt': ['small\n', 'changed\n'],
+            'gen.min.js': generated,
+        }
+        with _big_change_repo_context(extra_files) as repo:
+
+            def make_diff(max_bytes):
+                return abdt_differ.make_raw_diff(
+                    repo, 'master', 'change', max_bytes)
+
+            full = make_diff(1024 * 1024)
+            self.assertIn('gen.min.js', full.diff)
+
+            # the generated file is left out first
+            no_generated = make_diff(len(full.diff))
+            self.assertNotIn('gen.min.js', no_generated.diff)
+            self.assertIn('small.txt', no_generated.diff)
+            self.assertListEqual(no_generated.reduced_context_paths, [])
+            self.assertListEqual(no_generated.excluded_paths, ['gen.min.js'])
+
+            # then the biggest change has its context reduced
+            reduced = make_diff(len(no_generated.diff))
+            self.assertIn('+changed', reduced.diff)
+            self.assertListEqual(reduced.reduced_context_paths, ['README'])
+            self.assertListEqual(reduced.excluded_paths, ['gen.min.js'])
+
+            # then the biggest change is left out
+            excluded = make_diff(len(reduced.diff) - len('small\n'))
+            self.assertNotIn('README', excluded.diff)
+            self.assertListEqual(excluded.reduced_context_paths, ['small.txt'])
+            self.assertListEqual(
+                excluded.excluded_paths, ['gen.min.js', 'README'])
+
+            # all files are never left out
+            self.assertRaises(
+                abdt_exception.LargeDiffException,
+                make_diff,
+                len(excluded.diff))
+
+    def test_E_NoContext(self):
+        with _big_change_repo_context() as repo:
+            lots = abdt_differ.make_raw_diff(repo, 'master', 'change', 100000)
+            self.assertIn(' line 499\n', lots.diff)
+
+            less = abdt_differ.make_raw_diff(
+                repo, 'master', 'change', len(lots.diff))
+            self.assertListEqual(less.reduced_context_paths, ['README'])
+            hunk_lines = less.diff.split('\n@@')[1].splitlines()[1:]
+            self.assertListEqual(hunk_lines, ['-line 500', '+changed'])
+
+    def test_F_ManyFiles(self):
+        # long paths, so that naming every file on the command-line would
+        # exceed the operating system's limit on the length of arguments
+        directory = os.path.join('d' * 200, 'e' * 200)
+        extra_files = dict(
+            (os.path.join(directory, str(i)), ['new\n'])
+            for i in xrange(6000))
+        extra_files['gen.min.js'] = ['generated\n']
+        with _big_change_repo_context(extra_files) as repo:
+            clone = _CountingClone(repo)
+            self.assertRaises(
+                abdt_exception.LargeDiffException,
+                abdt_differ.make_raw_diff,
+                clone,
+                'master',
+                'change',
+                1024)
+            self.assertLess(
+                max(len(args) for args in clone.diffs),
+                abdt_differ._MAX_LISTED_FILES + 100)
+
+            # with too many files to reduce, only the unreduced diff and the
+            # list of files are tried
+            abdt_differ.set_cache_max_bytes(0)
+            clone.diffs = []
+            max_files = abdt_differ._MAX_REDUCIBLE_FILES
+            abdt_differ._MAX_REDUCIBLE_FILES = 1000
+            try:
+                self.assertRaises(
+                    abdt_exception.LargeDiffException,
+                    abdt_differ.make_raw_diff,
+                    clone,
+                    'master',
+                    'change',
+                    1024)
+            finally:
+                abdt_differ._MAX_REDUCIBLE_FILES = max_files
+            self.assertEqual(len(clone.diffs), 2)
 
 
 #------------------------------------------------------------------------------
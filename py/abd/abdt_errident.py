@@ -12,11 +12,13 @@ kinds of error identifiers to expect.
 #
 # Public Assignments:
 #   CONDUIT_REFRESH
+#   CONDUIT_PREFETCH
 #   GIT_SNOOP
 #   FETCH_PRUNE
 #   CONDUIT_CONNECT
 #   PUSH_DELETE_REVIEW
 #   PUSH_DELETE_TRACKING
+#   PUSH_TRACKERS
 #   MARK_BAD_LAND
 #   MARK_BAD_ABANDONED
 #   MARK_BAD_IN_REVIEW
@@ -40,6 +42,7 @@ from __future__ import absolute_import
 
 # abdi_processrepos
 CONDUIT_REFRESH = "conduit-refresh"
+CONDUIT_PREFETCH = "conduit-prefetch"
 GIT_SNOOP = "git-snoop"
 
 # abdi_processargs
@@ -49,6 +52,7 @@ CONDUIT_CONNECT = 'conduit-connect'
 # abdt_branch
 PUSH_DELETE_REVIEW = 'push-delete-review'
 PUSH_DELETE_TRACKING = 'push-delete-tracking'
+PUSH_TRACKERS = 'push-trackers'
 MARK_BAD_LAND = 'mark-bad-land'
 MARK_BAD_ABANDONED = 'mark-bad-abandoned'
 MARK_BAD_IN_REVIEW = 'mark-bad-in-review'
@@ -20,6 +20,9 @@
 #    .push_asymmetrical
 #    .push
 #    .push_delete
+#    .push_tracker
+#    .push_delete_tracker
+#    .flush_tracker_pushes
 #    .fetch_prune
 #    .call
 #    .get_remote
@@ -36,6 +39,8 @@
 # =============================================================================
 from __future__ import absolute_import
 
+import collections
+
 import phlgit_branch
 import phlgit_checkout
 import phlgit_commit
@@ -99,12 +104,23 @@ _ARCYD_ABANDONED_BRANCH_FQ = "refs/heads/" + _ARCYD_ABANDONED_BRANCH
 class Clone(object):
 
     def __init__(
-            self, clone, remote, description):
+            self,
+            clone,
+            remote,
+            description,
+            revision_cache=None,
+            batch_tracker_pushes=False):
         """Initialise a new Clone.
 
+        If 'batch_tracker_pushes' is True then tracker pushes are collected
+        and only sent to the remote by 'flush_tracker_pushes()', as a single
+        atomic push.
+
         :clone: the clone to attach to and delegate calls to
         :remote: name of the remote to use
         :description: short identification of the repo for humans
+        :revision_cache: an 'abdt_revisioncache.RevisionCache' or None
+        :batch_tracker_pushes: True to defer tracker pushes until flushed
         :returns: None
 
         """
@@ -112,8 +128,15 @@ class Clone(object):
         self._clone = clone
         self._remote = remote
         self._description = description
+        self._revision_cache = revision_cache
         self._is_landing_archive_enabled = None
 
+        # map of short remote branch name to the ref to force-push there, or
+        # None to delete the branch
+        self._pending_tracker_pushes = None
+        if batch_tracker_pushes:
+            self._pending_tracker_pushes = collections.OrderedDict()
+
     def is_identical(self, branch1, branch2):
         """Return True if the branches point to the same commit.
 
@@ -192,6 +215,9 @@ class Clone(object):
         :returns: a list of 'phlgit_log__Revision'
 
         """
+        if self._revision_cache is not None:
+            return self._revision_cache.make_revisions_from_hashes(
+                self, hashes)
         return phlgit_log.make_revisions_from_hashes(self, hashes)
 
     def squash_merge(self, branch, message, author_name, author_email):
@@ -282,6 +308,7 @@ class Clone(object):
         #       temporary measure to get through the backlog quickly but is
         #       more error-prone
         #
+        self._discard_pending_tracker_pushes([review_branch, tracking_branch])
         self.call(
             'push',
             self._remote,
@@ -317,8 +344,94 @@ class Clone(object):
         :returns: None
 
         """
+        self._discard_pending_tracker_pushes([branch] + list(args))
         phlgit_push.delete(self, self._remote, branch, *args)
 
+    def push_tracker(
+            self, local_branch, remote_branch, old_remote_branch=None):
+        """Force push 'local_branch' as 'remote_branch', delete the old one.
+
+        If tracker pushes are batched then nothing is sent to the remote until
+        'flush_tracker_pushes()' is called.
+
+        :local_branch: string name of the ref to push
+        :remote_branch: string short name of the tracker on the remote
+        :old_remote_branch: string short name of the tracker to delete or None
+        :returns: None
+
+        """
+        pending = self._pending_tracker_pushes
+        if pending is None:
+            if old_remote_branch is None:
+                phlgit_push.push_asymmetrical_force(
+                    self,
+                    local_branch,
+                    phlgitu_ref.make_local(remote_branch),
+                    self._remote)
+            else:
+                phlgit_push.move_asymmetrical(
+                    self,
+                    local_branch,
+                    phlgitu_ref.make_local(old_remote_branch),
+                    phlgitu_ref.make_local(remote_branch),
+                    self._remote)
+        else:
+            if old_remote_branch is not None:
+                _set_pending(pending, old_remote_branch, None)
+            _set_pending(pending, remote_branch, local_branch)
+
+    def push_delete_tracker(self, branch):
+        """Delete tracker 'branch' from the remote.
+
+        If tracker pushes are batched then nothing is sent to the remote until
+        'flush_tracker_pushes()' is called.
+
+        :branch: string short name of the tracker on the remote
+        :returns: None
+
+        """
+        pending = self._pending_tracker_pushes
+        if pending is None:
+            phlgit_push.delete(self, self._remote, branch)
+        else:
+            _set_pending(pending, branch, None)
+
+    def flush_tracker_pushes(self):
+        """Send any batched tracker pushes to the remote in one atomic push.
+
+        The batch is only cleared if the push succeeds, so it is safe to retry.
+        Deletions of branches that are not known on the remote are dropped, so
+        that trackers which were created and removed within the same batch
+        don't fail the whole push.
+
+        :returns: None
+
+        """
+        pending = self._pending_tracker_pushes
+        if not pending:
+            return
+
+        remote_refs = set(phlgit_showref.names(self))
+
+        refspecs = []
+        for branch, local_branch in pending.iteritems():
+            fq_branch = phlgitu_ref.make_local(branch)
+            if local_branch is not None:
+                refspecs.append('+' + local_branch + ':' + fq_branch)
+            elif phlgitu_ref.make_remote(branch, self._remote) in remote_refs:
+                refspecs.append(':' + fq_branch)
+
+        if refspecs:
+            self.call('push', '--atomic', self._remote, *refspecs)
+
+        pending.clear()
+
+    def _discard_pending_tracker_pushes(self, branches):
+        pending = self._pending_tracker_pushes
+        if pending:
+            for branch in branches:
+                pending.pop(branch, None)
+
     def fetch_prune(self):
         """Fetch from the remote and prune branches.
 
@@ -343,6 +456,12 @@ class Clone(object):
         return self._clone.working_dir
 
 
+def _set_pending(pending, branch, local_branch):
+    # re-insert so that the push order follows the order of the requests
+    pending.pop(branch, None)
+    pending[branch] = local_branch
+
+
 def _get_branch_to_hash(git):
 
     remote = git.get_remote()
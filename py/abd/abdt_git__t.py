@@ -8,10 +8,13 @@
 # Concerns:
 # [ B] changes to review branches can be detected when creating 'Branch'-es
 # [ A] can create archive refs without error
+# [ C] batched tracker pushes are not sent until flushed
+# [ C] batched tracker pushes leave the remote as unbatched pushes would
 #------------------------------------------------------------------------------
 # Tests:
 # [ A] test_A_Breathing
 # [ B] test_B_RawDiffNewCommits
+# [ C] test_C_BatchTrackerPushes
 #==============================================================================
 
 from __future__ import absolute_import
@@ -136,13 +139,13 @@ class Test(unittest.TestCase):
         # check for new stuff as arcyd
         self.assertIs(branch.has_new_commits(), True)
         branch.describe_new_commits()  # just exercise
-        self.assertIn(filename, branch.make_raw_diff())
+        self.assertIn(filename, branch.make_raw_diff().diff)
         branch.mark_ok_in_review()
         self.assertIs(branch.has_new_commits(), False)
         branch.describe_new_commits()  # just exercise
 
         # exercise queries a bit
-        self.assertIn(filename, branch.make_raw_diff())
+        self.assertIn(filename, branch.make_raw_diff().diff)
         self.assertIn(filename, branch.make_message_digest())
         self.assertEqual(
             branch.get_commit_message_from_tip().strip(),
@@ -170,7 +173,7 @@ class Test(unittest.TestCase):
         # check for new stuff as arcyd
         self.assertIs(branch.has_new_commits(), False)
         branch = self._get_updated_branch(branch_name)
-        self.assertNotIn(filename, branch.make_raw_diff())
+        self.assertNotIn(filename, branch.make_raw_diff().diff)
         branch.mark_ok_in_review()
         self.assertIs(branch.has_new_commits(), False)
 
@@ -187,6 +190,48 @@ class Test(unittest.TestCase):
         branch.mark_ok_in_review()
         self.assertIs(branch.has_new_commits(), False)
 
+    def test_C_BatchTrackerPushes(self):
+        self.clone_arcyd = abdt_git.Clone(
+            phlsys_git.GitClone(self.clone_arcyd.working_dir),
+            'origin',
+            'myrepo',
+            batch_tracker_pushes=True)
+        base, branch_name, branch = self._setup_for_untracked_branch()
+        self.assertSetEqual(set(), self._get_central_trackers())
+
+        # create a tracker and rename it within the same batch
+        branch.mark_ok_new_review(101)
+        branch.mark_bad_in_review()
+        self.assertSetEqual(set(), self._get_central_trackers())
+
+        self.clone_arcyd.flush_tracker_pushes()
+        bad_trackers = self._get_central_trackers()
+        self.assertEqual(len(bad_trackers), 1)
+
+        # rename the existing tracker
+        branch.mark_ok_in_review()
+        self.assertSetEqual(bad_trackers, self._get_central_trackers())
+
+        self.clone_arcyd.flush_tracker_pushes()
+        ok_trackers = self._get_central_trackers()
+        self.assertEqual(len(ok_trackers), 1)
+        self.assertNotEqual(bad_trackers, ok_trackers)
+
+        # flushing an empty batch does nothing
+        self.clone_arcyd.flush_tracker_pushes()
+        self.assertSetEqual(ok_trackers, self._get_central_trackers())
+
+        # trackers created and deleted in the same batch are never pushed
+        branch.mark_bad_in_review()
+        branch.abandon()
+        self.clone_arcyd.flush_tracker_pushes()
+        self.assertSetEqual(set(), self._get_central_trackers())
+
+    def _get_central_trackers(self):
+        refs = self.repo_central.call(
+            'for-each-ref', '--format=%(refname)', 'refs/heads/').split()
+        return set(r for r in refs if r.startswith('refs/heads/dev/arcyd/'))
+
     def _setup_for_tracked_branch(self):
         base, branch_name, branch = self._setup_for_untracked_branch()
         branch.mark_ok_new_review(101)
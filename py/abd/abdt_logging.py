@@ -11,6 +11,7 @@
 #   on_retry_exception
 #   on_review_event
 #   on_io_event
+#   on_tag_count
 #
 # -----------------------------------------------------------------------------
 # (this contents block is generated, edits will be lost)
@@ -71,6 +72,12 @@ def on_io_event(identifier, detail):
         reporter.log_io_action(identifier, detail)
 
 
+def on_tag_count(tag_name, count=1):
+    reporter = _get_reporter()
+    if reporter:
+        reporter.tag_count(tag_name, count)
+
+
 #------------------------------------------------------------------------------
 # Copyright (C) 2013-2014 Bloomberg Finance L.P.
 #
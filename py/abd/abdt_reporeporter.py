@@ -142,6 +142,7 @@ class RepoReporter(object):
         }
 
         self._branch_notes = None
+        self._branch_span = None
 
         # make sure we've initialised all the expected attributes
         assert set(self._repo_attribs.keys()) == set(REPO_LIST_ATTRIB)
@@ -175,6 +176,8 @@ class RepoReporter(object):
     def start_branch(self, name):
         self._repo_attribs[REPO_ATTRIB_STATUS_BRANCH] = name
         self._branch_notes = ''
+        self._branch_span = self._arcyd_reporter.start_trace_span(
+            name, 'branch')
 
     def no_users_on_branch(self, emails):
         self._branch_notes += """Unable to assign any users to branch.
@@ -241,6 +244,8 @@ class RepoReporter(object):
         self._branches.append(d)
         self._repo_attribs[REPO_ATTRIB_STATUS_BRANCH] = ''
         self._branch_notes = ''
+        self._arcyd_reporter.finish_trace_span(self._branch_span)
+        self._branch_span = None
 
     def _update_write_repo_status(self, status, text=''):
         self._repo_attribs[REPO_ATTRIB_STATUS] = status
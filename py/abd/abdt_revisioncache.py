@@ -0,0 +1,154 @@
+"""Cache 'phlgit_log.Revision' objects by their commit hash.
+
+Commits never change, so once a revision has been retrieved it can be re-used
+for as long as it stays in the cache.  This saves Arcyd from retrieving the
+same commit messages and authors again for every branch in review on every
+cycle.
+
+Note that the 'abbrev_hash' may in theory become longer in the repository as
+more objects are added, the cached value will be used until it's evicted.
+
+"""
+# =============================================================================
+# CONTENTS
+# -----------------------------------------------------------------------------
+# abdt_revisioncache
+#
+# Public Classes:
+#   RevisionCache
+#    .make_revisions_from_hashes
+#    .is_dirty
+#    .load_list
+#    .dump_list
+#
+# Public Assignments:
+#   TAG_HITS
+#   TAG_MISSES
+#
+# -----------------------------------------------------------------------------
+# (this contents block is generated, edits will be lost)
+# =============================================================================
+
+from __future__ import absolute_import
+
+import phlgit_log
+import phlsys_lrucache
+
+import abdt_logging
+
+# tags to report the hit and miss counts against
+TAG_HITS = 'revision cache hits'
+TAG_MISSES = 'revision cache misses'
+
+# commit messages aren't necessarily utf-8, latin-1 will round-trip any bytes
+_JSON_ENCODING = 'latin-1'
+
+
+class RevisionCache(object):
+
+    def __init__(self, max_size):
+        """Initialise a new cache to hold at most 'max_size' revisions.
+
+        :max_size: the integer maximum number of revisions to hold
+        :returns: None
+
+        """
+        super(RevisionCache, self).__init__()
+        self._cache = phlsys_lrucache.LruCache(max_size)
+        self._is_dirty = False
+
+    def make_revisions_from_hashes(self, clone, hashes):
+        """Return a list of 'phlgit_log__Revision' from 'hashes'.
+
+        Any revisions which aren't in the cache are retrieved from 'clone'
+        in a single batch and added to the cache.
+
+        :clone: something that supports "call()" with git commands
+        :hashes: a list of commit hash strings
+        :returns: a list of 'phlgit_log__Revision'
+
+        """
+        hash_to_revision = {}
+        missing_hashes = []
+        for h in hashes:
+            revision = self._cache.get(h)
+            if revision is None:
+                missing_hashes.append(h)
+            else:
+                hash_to_revision[h] = revision
+
+        if missing_hashes:
+            revisions = phlgit_log.make_revisions_from_hashes(
+                clone, missing_hashes)
+            for h, revision in zip(missing_hashes, revisions):
+                hash_to_revision[h] = revision
+
+                # only cache by full hash, abbreviated hashes are ambiguous
+                if h == revision.hash:
+                    self._cache[h] = revision
+                    self._is_dirty = True
+
+        abdt_logging.on_tag_count(
+            TAG_HITS, len(hashes) - len(missing_hashes))
+        abdt_logging.on_tag_count(TAG_MISSES, len(missing_hashes))
+
+        return [hash_to_revision[h] for h in hashes]
+
+    @property
+    def is_dirty(self):
+        """Return True if the cache has changed since the last load or dump."""
+        return self._is_dirty
+
+    def load_list(self, revision_fields_list):
+        """Load revisions from the supplied list, adding to existing.
+
+        The loaded revisions are more recently used than existing ones, in
+        the order they are listed.
+
+        :revision_fields_list: a list as returned by 'dump_list'
+        :returns: None
+
+        """
+        for fields in revision_fields_list:
+            revision = phlgit_log.Revision(
+                *[x.encode(_JSON_ENCODING) for x in fields])
+            self._cache[revision.hash] = revision
+        self._is_dirty = False
+
+    def dump_list(self):
+        """Return a list of the revisions which can be made into JSON.
+
+        The revisions are listed least recently used first, so that
+        'load_list' preserves the order in which they will be evicted.
+
+        :returns: a list of lists of unicode fields
+
+        """
+        self._is_dirty = False
+        return [
+            [x.decode(_JSON_ENCODING) for x in r]
+            for _, r in self._cache.items()
+        ]
+
+
+#------------------------------------------------------------------------------
+# Copyright (C) 2013-2014 Bloomberg Finance L.P.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to
+# deal in the Software without restriction, including without limitation the
+# rights to use, copy, modify, merge, publish, distribute, sublicense, and/or
+# sell copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.  IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+# IN THE SOFTWARE.
+#------------------------------- END-OF-FILE ----------------------------------
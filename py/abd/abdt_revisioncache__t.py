@@ -0,0 +1,123 @@
+"""Test suite for abdt_revisioncache."""
+#==============================================================================
+#                                   TEST PLAN
+#------------------------------------------------------------------------------
+# Here we detail the things we are concerned to test and specify which tests
+# cover those concerns.
+#
+# Concerns:
+# [ A] revisions are the same as retrieved without the cache
+# [ A] cached revisions are not retrieved again
+# [ B] revisions survive a dump and load, including non-utf8 messages
+# [ B] the order of eviction survives a dump and load
+#------------------------------------------------------------------------------
+# Tests:
+# [ A] test_A_Breathing
+# [ B] test_B_DumpLoad
+#==============================================================================
+
+from __future__ import absolute_import
+
+import json
+import unittest
+
+import phlgit_log
+import phlsys_git
+
+import abdt_revisioncache
+
+
+class _CountingClone(object):
+
+    def __init__(self, clone):
+        self._clone = clone
+        self.num_calls = 0
+
+    def call(self, *args, **kwargs):
+        self.num_calls += 1
+        return self._clone.call(*args, **kwargs)
+
+
+class Test(unittest.TestCase):
+
+    def _make_hashes(self, repo):
+        repo.call('commit', '--allow-empty', '-m', 'one\n\nbody')
+        repo.call('commit', '--allow-empty', '-m', 'two')
+        repo.call('commit', '--allow-empty', '-m', 'caf\xe9 (latin-1)')
+        return phlgit_log.get_last_n_commit_hashes(repo, 3)
+
+    def test_A_Breathing(self):
+        with phlsys_git.tmprepo_context() as repo:
+            hashes = self._make_hashes(repo)
+            expected = phlgit_log.make_revisions_from_hashes(repo, hashes)
+
+            clone = _CountingClone(repo)
+            cache = abdt_revisioncache.RevisionCache(10)
+            self.assertFalse(cache.is_dirty)
+
+            revisions = cache.make_revisions_from_hashes(clone, hashes[:2])
+            self.assertListEqual(expected[:2], revisions)
+            self.assertTrue(cache.is_dirty)
+            self.assertEqual(clone.num_calls, 1)
+
+            # only the missing revision should be retrieved
+            revisions = cache.make_revisions_from_hashes(clone, hashes)
+            self.assertListEqual(expected, revisions)
+            self.assertEqual(clone.num_calls, 2)
+
+            revisions = cache.make_revisions_from_hashes(clone, hashes)
+            self.assertListEqual(expected, revisions)
+            self.assertEqual(clone.num_calls, 2)
+
+    def test_B_DumpLoad(self):
+        with phlsys_git.tmprepo_context() as repo:
+            hashes = self._make_hashes(repo)
+            cache = abdt_revisioncache.RevisionCache(10)
+            expected = cache.make_revisions_from_hashes(repo, hashes)
+
+            # use the most recent commit, so it's the last to be evicted
+            cache.make_revisions_from_hashes(repo, hashes[:1])
+
+            # round-trip through JSON, as the state store does
+            dumped = json.loads(json.dumps(cache.dump_list()))
+            self.assertFalse(cache.is_dirty)
+
+            clone = _CountingClone(repo)
+            loaded_cache = abdt_revisioncache.RevisionCache(10)
+            loaded_cache.load_list(dumped)
+            self.assertEqual(loaded_cache.dump_list(), dumped)
+            revisions = loaded_cache.make_revisions_from_hashes(clone, hashes)
+            self.assertListEqual(expected, revisions)
+            self.assertEqual(clone.num_calls, 0)
+            for r in revisions:
+                for field in r:
+                    self.assertIsInstance(field, str)
+
+            # a smaller cache keeps the most recently used revisions
+            small_cache = abdt_revisioncache.RevisionCache(2)
+            small_cache.load_list(dumped)
+            small_cache.make_revisions_from_hashes(clone, hashes[:1])
+            self.assertEqual(clone.num_calls, 0)
+
+
+#------------------------------------------------------------------------------
+# Copyright (C) 2013-2014 Bloomberg Finance L.P.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to
+# deal in the Software without restriction, including without limitation the
+# rights to use, copy, modify, merge, publish, distribute, sublicense, and/or
+# sell copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.  IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+# IN THE SOFTWARE.
+#------------------------------- END-OF-FILE ----------------------------------
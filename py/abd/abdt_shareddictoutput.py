@@ -10,6 +10,9 @@
 #   ToDict
 #    .write
 #
+# Public Functions:
+#   read_file
+#
 # -----------------------------------------------------------------------------
 # (this contents block is generated, edits will be lost)
 # =============================================================================
@@ -21,17 +24,77 @@ import os
 
 import phlsys_fs
 
+# the key in the main file which lists the sections in separate files
+_SECTIONS_KEY = 'shareddictoutput-sections'
+
 
 class ToFile(object):
 
-    def __init__(self, filename):
+    def __init__(self, filename, section_keys=None):
+        """Initialise to write dictionaries to 'filename'.
+
+        The values of 'section_keys' are written to separate files alongside
+        'filename', which are only rewritten when the values change.  Use
+        'read_file' to read the dictionary back from the files.
+
+        :filename: the string path of the file to write
+        :section_keys: a list of keys which are large and rarely change
+        :returns: None
+
+        """
         super(ToFile, self).__init__()
         self._filename = os.path.abspath(filename)
+        self._section_keys = list(section_keys) if section_keys else []
+        self._section_to_text = {}
 
     def write(self, d):
         assert isinstance(d, dict)
-        with phlsys_fs.write_file_lock_context(self._filename) as f:
-            f.write(json.dumps(d))
+        d = dict(d)
+
+        # N.B. write the sections first so that the main file never refers
+        #      to sections which haven't been written yet
+        for key in self._section_keys:
+            text = json.dumps(d.pop(key))
+            if self._section_to_text.get(key) != text:
+                _write_file(_make_section_filename(self._filename, key), text)
+                self._section_to_text[key] = text
+
+        if self._section_keys:
+            d[_SECTIONS_KEY] = self._section_keys
+        _write_file(self._filename, json.dumps(d))
+
+
+def read_file(filename):
+    """Return the dictionary written to 'filename' by a 'ToFile', or None.
+
+    :filename: the string path of the file to read
+    :returns: the dictionary, or None if the file is empty
+
+    """
+    d = _read_json_file(filename)
+    if d is not None:
+        for key in d.pop(_SECTIONS_KEY, []):
+            d[key] = _read_json_file(_make_section_filename(filename, key))
+    return d
+
+
+def _make_section_filename(filename, key):
+    return filename + '.' + key
+
+
+def _write_file(filename, text):
+    # N.B. write to a temporary file and rename it, so that readers never see
+    #      a partially written file and needn't lock it
+    with phlsys_fs.write_file_atomic_context(filename) as f:
+        f.write(text)
+
+
+def _read_json_file(filename):
+    with open(filename) as f:
+        text = f.read()
+    if not text:
+        return None
+    return json.loads(text)
 
 
 class ToDict(object):
@@ -0,0 +1,79 @@
+"""Test suite for abdt_shareddictoutput."""
+#==============================================================================
+#                                   TEST PLAN
+#------------------------------------------------------------------------------
+# Here we detail the things we are concerned to test and specify which tests
+# cover those concerns.
+#
+# Concerns:
+# [ A] dictionaries written with ToFile can be read with read_file
+# [ B] sections are written to separate files and read back
+# [ B] sections are only rewritten when they change
+#------------------------------------------------------------------------------
+# Tests:
+# [ A] test_A_Breathing
+# [ B] test_B_Sections
+#==============================================================================
+
+from __future__ import absolute_import
+
+import os
+import unittest
+
+import phlsys_fs
+
+import abdt_shareddictoutput
+
+
+class Test(unittest.TestCase):
+
+    def test_A_Breathing(self):
+        with phlsys_fs.chtmpdir_context():
+            output = abdt_shareddictoutput.ToFile('status')
+            d = {'status': 'idle', 'repos': [1, 2, 3]}
+            output.write(d)
+            self.assertEqual(abdt_shareddictoutput.read_file('status'), d)
+            self.assertEqual(os.listdir('.'), ['status'])
+
+    def test_B_Sections(self):
+        with phlsys_fs.chtmpdir_context():
+            output = abdt_shareddictoutput.ToFile(
+                'status', section_keys=['repos'])
+            d = {'status': 'idle', 'repos': [1, 2, 3]}
+            output.write(d)
+            self.assertEqual(abdt_shareddictoutput.read_file('status'), d)
+            self.assertEqual(
+                sorted(os.listdir('.')), ['status', 'status.repos'])
+
+            # remove the section, it mustn't be rewritten if it's unchanged
+            os.remove('status.repos')
+            d['status'] = 'updating'
+            output.write(d)
+            self.assertFalse(os.path.exists('status.repos'))
+
+            d['repos'] = [4]
+            output.write(d)
+            self.assertEqual(abdt_shareddictoutput.read_file('status'), d)
+
+
+#------------------------------------------------------------------------------
+# Copyright (C) 2013-2014 Bloomberg Finance L.P.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to
+# deal in the Software without restriction, including without limitation the
+# rights to use, copy, modify, merge, publish, distribute, sublicense, and/or
+# sell copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.  IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+# IN THE SOFTWARE.
+#------------------------------- END-OF-FILE ----------------------------------
@@ -11,6 +11,8 @@
 #   render_stats
 #   render_controls
 #   render_error_log
+#   render_log_page
+#   render_older_log_link
 #   render_info_log
 #
 # -----------------------------------------------------------------------------
@@ -18,6 +20,7 @@
 # =============================================================================
 from __future__ import absolute_import
 
+import phlsys_histogram
 import phlurl_request
 
 import abdt_arcydreporter
@@ -59,11 +62,15 @@ def render(
     if log_system_error:
         formatter.horizontal_rule()
         render_error_log('recent system errors', log_system_error, formatter)
+        render_older_log_link(
+            base_url, abdt_arcydreporter.ARCYD_LOG_SYSTEM_ERROR, 0, formatter)
 
     log_user_action = report[abdt_arcydreporter.ARCYD_LOG_USER_ACTION]
     if log_user_action:
         formatter.horizontal_rule()
         render_info_log('recent user actions', log_user_action, formatter)
+        render_older_log_link(
+            base_url, abdt_arcydreporter.ARCYD_LOG_USER_ACTION, 0, formatter)
 
     formatter.horizontal_rule()
     render_stats(stats, formatter)
@@ -111,7 +118,13 @@ def render_stats(stats, formatter):
     last_duration = stats[abdt_arcydreporter.ARCYD_STAT_LAST_CYCLE_TIME]
     tag_samplers = stats[abdt_arcydreporter.ARCYD_STAT_TAG_SAMPLERS]
 
-    if current_duration or last_duration or tag_samplers:
+    # N.B. status files from older versions won't have the histograms or
+    #      the counts
+    tag_histograms = stats.get(
+        abdt_arcydreporter.ARCYD_STAT_TAG_HISTOGRAMS, {})
+    tag_counts = stats.get(abdt_arcydreporter.ARCYD_STAT_TAG_COUNTS, {})
+
+    if current_duration or last_duration or tag_samplers or tag_counts:
         formatter.heading('stats')
 
     if current_duration:
@@ -134,10 +147,12 @@ def render_stats(stats, formatter):
                 s.mean,
                 s.most,
                 s.last,
-            )
+            ) + _get_percentiles(tag_histograms.get(t), (50, 90, 99))
             for s, t in samplers_tags
         ]
 
+        # N.B. the min, mean, max and last are of the totals for each cycle,
+        #      the percentiles are of each individual timing of the tag
         heading_format = (
             ('total time', '{:.2f} secs'),
             ('tag', '{}'),
@@ -146,6 +161,9 @@ def render_stats(stats, formatter):
             ('mean', '{:.2f} secs'),
             ('max', '{:.2f} secs'),
             ('last', '{:.2f} secs'),
+            ('p50', '{}'),
+            ('p90', '{}'),
+            ('p99', '{}'),
         )
 
         stats_tags.sort()
@@ -157,6 +175,46 @@ def render_stats(stats, formatter):
             [i[1] for i in heading_format],
             'stats')
 
+    if tag_counts:
+        Sampler = abdt_arcydreporter.Sampler.from_dict
+        samplers_tags = [(Sampler(s), t) for t, s in tag_counts.iteritems()]
+        counts_tags = [
+            (s.total, t, s.times, s.least, s.mean, s.most, s.last)
+            for s, t in samplers_tags
+        ]
+
+        # N.B. the min, mean, max and last are of the totals for each cycle
+        heading_format = (
+            ('total', '{}'),
+            ('tag', '{}'),
+            ('cycles', '{}'),
+            ('min', '{}'),
+            ('mean', '{:.2f}'),
+            ('max', '{}'),
+            ('last', '{}'),
+        )
+
+        counts_tags.sort()
+        counts_tags.reverse()
+
+        formatter.table_from_tuple_list(
+            counts_tags,
+            [i[0] for i in heading_format],
+            [i[1] for i in heading_format],
+            'stats')
+
+
+def _get_percentiles(histogram_dict, percents):
+    # return a tuple of the formatted percentiles of the histogram, or of
+    # empty strings if there aren't any, e.g. the status is from an older
+    # version which didn't record them
+    if histogram_dict is None:
+        return ('',) * len(percents)
+    histogram = phlsys_histogram.Histogram.from_dict(histogram_dict)
+    values = [histogram.percentile(p) for p in percents]
+    return tuple(
+        '' if v is None else '{:.3f} secs'.format(v) for v in values)
+
 
 def render_controls(is_reset_scheduled, is_pause_scheduled, formatter):
     with formatter.tags_context('table'):
@@ -189,6 +247,40 @@ def render_error_log(name, item_list, formatter):
                 formatter.text(detail)
 
 
+def render_log_page(base_url, log_name, page, item_list, is_last, formatter):
+    """Render a page of the items spilled from the 'log_name' log.
+
+    :base_url: the url that the log pages are relative to
+    :log_name: ARCYD_LOG_SYSTEM_ERROR or ARCYD_LOG_USER_ACTION
+    :page: the index of the page, 0 is the newest
+    :item_list: the items on the page, oldest first
+    :is_last: True if there are no older pages
+    :formatter: the formatter to render with
+    :returns: None
+
+    """
+    name = 'older {} (page {})'.format(log_name, page + 1)
+    if log_name == abdt_arcydreporter.ARCYD_LOG_SYSTEM_ERROR:
+        render_error_log(name, item_list, formatter)
+    else:
+        render_info_log(name, item_list, formatter)
+
+    if page > 0:
+        formatter.link(
+            _make_log_page_url(base_url, log_name, page - 1), 'newer')
+    if not is_last:
+        render_older_log_link(base_url, log_name, page + 1, formatter)
+
+
+def render_older_log_link(base_url, log_name, page, formatter):
+    formatter.link(_make_log_page_url(base_url, log_name, page), 'older')
+
+
+def _make_log_page_url(base_url, log_name, page):
+    return phlurl_request.join_url(
+        base_url, 'logs/{}?page={}'.format(log_name, page))
+
+
 def render_info_log(name, item_list, formatter):
     formatter.heading(name)
     with formatter.singletag_context('div', class_='container'):
@@ -0,0 +1,224 @@
+"""Render the state of a running instance of Arcyd as Prometheus metrics.
+
+The metrics are generated from the status file that Arcyd writes, so that
+scraping them never waits on or slows down Arcyd itself.  They use the
+Prometheus text exposition format, version 0.0.4.
+
+"""
+# =============================================================================
+# CONTENTS
+# -----------------------------------------------------------------------------
+# abdweb_metrics
+#
+# Public Functions:
+#   render
+#
+# Public Assignments:
+#   CONTENT_TYPE
+#
+# -----------------------------------------------------------------------------
+# (this contents block is generated, edits will be lost)
+# =============================================================================
+
+from __future__ import absolute_import
+
+import collections
+
+import phlsys_histogram
+
+import abdt_arcydreporter
+
+CONTENT_TYPE = 'text/plain; version=0.0.4'
+
+# the upper bounds of the buckets of the duration histograms, in seconds
+_DURATION_BUCKETS = (
+    0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 10, 30, 60, 300, 1800)
+
+# tags of decorated objects, whose calls are also reported separately
+_CONDUIT_TAG_PREFIXES = ('conduit.', 'base_conduit.')
+_GIT_TAG_PREFIX = 'git.'
+
+
+def render(report):
+    """Return the string metrics for the supplied Arcyd status 'report'.
+
+    :report: the dict of status written by abdt_arcydreporter
+    :returns: a string in the Prometheus text format
+
+    """
+    metrics = _Metrics()
+
+    status = report[abdt_arcydreporter.ARCYD_STATUS]
+    metrics.add(
+        'arcyd_status', 'gauge', 'the current status of Arcyd',
+        [({'status': s}, int(s == status))
+         for s in abdt_arcydreporter.ARCYD_LIST_STATUS])
+
+    repo_counts = collections.Counter(
+        r[abdt_arcydreporter.REPO_ATTRIB_STATUS]
+        for r in report[abdt_arcydreporter.ARCYD_REPOS])
+    metrics.add(
+        'arcyd_repos', 'gauge', 'the number of repos with each status',
+        [({'status': s}, repo_counts[s])
+         for s in abdt_arcydreporter.REPO_STATUSES])
+
+    stats = report[abdt_arcydreporter.ARCYD_STATISTICS]
+    for name, key, help_ in (
+            ('arcyd_current_cycle_seconds',
+             abdt_arcydreporter.ARCYD_STAT_CURRENT_CYCLE_TIME,
+             'the duration of the cycle in progress so far'),
+            ('arcyd_last_cycle_seconds',
+             abdt_arcydreporter.ARCYD_STAT_LAST_CYCLE_TIME,
+             'the duration of the last complete cycle')):
+        if stats[key] is not None:
+            metrics.add(name, 'gauge', help_, [({}, stats[key])])
+
+    _add_tag_metrics(metrics, stats)
+
+    return metrics.get_text()
+
+
+def _add_tag_metrics(metrics, stats):
+    tag_samplers = stats[abdt_arcydreporter.ARCYD_STAT_TAG_SAMPLERS]
+    tag_histograms = stats.get(
+        abdt_arcydreporter.ARCYD_STAT_TAG_HISTOGRAMS, {})
+    tag_counts = stats.get(abdt_arcydreporter.ARCYD_STAT_TAG_COUNTS, {})
+
+    tag_to_total = dict(
+        (t, abdt_arcydreporter.Sampler.from_dict(s).total or 0)
+        for t, s in tag_samplers.iteritems())
+    tag_to_count = dict(
+        (t, abdt_arcydreporter.Sampler.from_dict(s).total or 0)
+        for t, s in tag_counts.iteritems())
+    tag_to_histogram = dict(
+        (t, phlsys_histogram.Histogram.from_dict(h))
+        for t, h in tag_histograms.iteritems())
+
+    # the histograms and their totals are only updated at the end of each
+    # cycle, so they're consistent with each other
+    samples = []
+    for tag, histogram in sorted(tag_to_histogram.iteritems()):
+        labels = {'tag': tag}
+        for bound in _DURATION_BUCKETS:
+            samples.append((
+                '_bucket',
+                dict(labels, le=_format_value(bound)),
+                histogram.count_at_most(bound)))
+        samples.append(
+            ('_bucket', dict(labels, le='+Inf'), histogram.count))
+        samples.append(('_sum', labels, tag_to_total.get(tag, 0)))
+        samples.append(('_count', labels, histogram.count))
+    metrics.add_with_suffixes(
+        'arcyd_tag_duration_seconds',
+        'histogram',
+        'the duration of each timing of a tag, e.g. a conduit call',
+        samples)
+
+    metrics.add(
+        'arcyd_tag_total',
+        'counter',
+        'the total of each counted tag, e.g. cache hits',
+        [({'tag': t}, c) for t, c in sorted(tag_to_count.iteritems())])
+
+    metrics.add(
+        'arcyd_tryloop_retries_total',
+        'counter',
+        'the number of times that an operation failed and was retried',
+        [({}, tag_to_count.get(
+            abdt_arcydreporter.ARCYD_TAG_TRYLOOP_RETRIES, 0))])
+
+    errors_suffix = abdt_arcydreporter.ARCYD_TAG_ERRORS_SUFFIX
+    conduit_calls = []
+    conduit_errors = []
+    git_calls = []
+    for tag, histogram in sorted(tag_to_histogram.iteritems()):
+        errors = tag_to_count.get(tag + errors_suffix, 0)
+        for prefix in _CONDUIT_TAG_PREFIXES:
+            if tag.startswith(prefix):
+                labels = {
+                    'object': prefix.rstrip('.'),
+                    'method': tag[len(prefix):],
+                }
+                conduit_calls.append((labels, histogram.count))
+                conduit_errors.append((labels, errors))
+        if tag.startswith(_GIT_TAG_PREFIX):
+            labels = {'method': tag[len(_GIT_TAG_PREFIX):]}
+            git_calls.append((labels, histogram.count))
+
+    metrics.add(
+        'arcyd_conduit_calls_total', 'counter',
+        'the number of calls of each conduit method', conduit_calls)
+    metrics.add(
+        'arcyd_conduit_errors_total', 'counter',
+        'the number of calls of each conduit method which failed',
+        conduit_errors)
+    metrics.add(
+        'arcyd_git_calls_total', 'counter',
+        'the number of calls of each git method, each runs git at least once',
+        git_calls)
+
+
+class _Metrics(object):
+
+    def __init__(self):
+        super(_Metrics, self).__init__()
+        self._lines = []
+
+    def add(self, name, type_, help_, samples):
+        self.add_with_suffixes(
+            name, type_, help_, [('', l, v) for l, v in samples])
+
+    def add_with_suffixes(self, name, type_, help_, samples):
+        if not samples:
+            return
+        self._lines.append('# HELP {} {}'.format(name, help_))
+        self._lines.append('# TYPE {} {}'.format(name, type_))
+        for suffix, labels, value in samples:
+            self._lines.append('{}{}{} {}'.format(
+                name, suffix, _format_labels(labels), _format_value(value)))
+
+    def get_text(self):
+        return ''.join(line + '\n' for line in self._lines)
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(
+        '{}="{}"'.format(k, _escape_label_value(v))
+        for k, v in sorted(labels.iteritems())) + '}'
+
+
+def _escape_label_value(value):
+    value = unicode(value).encode('utf-8')
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_value(value):
+    # N.B. durations are floats, show the whole ones as integers
+    if isinstance(value, float) and not value.is_integer():
+        return repr(value)
+    return str(int(value))
+
+
+#------------------------------------------------------------------------------
+# Copyright (C) 2013-2014 Bloomberg Finance L.P.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to
+# deal in the Software without restriction, including without limitation the
+# rights to use, copy, modify, merge, publish, distribute, sublicense, and/or
+# sell copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.  IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+# IN THE SOFTWARE.
+#------------------------------- END-OF-FILE ----------------------------------
@@ -0,0 +1,128 @@
+"""Test suite for abdweb_metrics."""
+#==============================================================================
+#                                   TEST PLAN
+#------------------------------------------------------------------------------
+# Here we detail the things we are concerned to test and specify which tests
+# cover those concerns.
+#
+# Concerns:
+# [ A] the status of Arcyd and its repos are reported
+# [ A] timed tags are reported as cumulative histograms
+# [ A] calls and failures of conduit methods are reported
+# [ A] retries are reported
+# [ B] label values are escaped
+#------------------------------------------------------------------------------
+# Tests:
+# [ A] test_A_Breathing
+# [ B] test_B_EscapeLabels
+#==============================================================================
+
+from __future__ import absolute_import
+
+import unittest
+
+import abdt_arcydreporter
+
+import abdweb_metrics
+
+
+class _RecordingOutput(object):
+
+    def __init__(self):
+        self.last = None
+
+    def write(self, d):
+        self.last = d
+
+
+class _Conduit(object):
+
+    def ping(self):
+        pass
+
+    def fail(self):
+        raise Exception('fail')
+
+
+class Test(unittest.TestCase):
+
+    def test_A_Breathing(self):
+        output = _RecordingOutput()
+        reporter = abdt_arcydreporter.ArcydReporter(output)
+        conduit = _Conduit()
+        reporter.tag_timer_decorate_object_methods_individually(
+            conduit, 'conduit')
+
+        reporter.start_repo('repo', 'repo')
+        conduit.ping()
+        conduit.ping()
+        self.assertRaises(Exception, conduit.fail)
+        reporter.on_tryloop_exception(Exception('retry'), 1)
+        reporter.finish_repo()
+        reporter.start_sleep(1)
+        reporter.finish_sleep()
+
+        # the statistics of the last cycle are written with the next status
+        reporter.close()
+        lines = abdweb_metrics.render(output.last).splitlines()
+
+        self.assertIn('arcyd_status{status="stopped"} 1', lines)
+        self.assertIn('arcyd_status{status="idle"} 0', lines)
+        self.assertIn('arcyd_repos{status="ok"} 1', lines)
+        self.assertIn(
+            'arcyd_tag_duration_seconds_bucket'
+            '{le="+Inf",tag="conduit.ping"} 2',
+            lines)
+        self.assertIn(
+            'arcyd_tag_duration_seconds_bucket'
+            '{le="1800",tag="conduit.ping"} 2',
+            lines)
+        self.assertIn(
+            'arcyd_tag_duration_seconds_count{tag="conduit.ping"} 2', lines)
+        self.assertIn(
+            'arcyd_conduit_calls_total'
+            '{method="fail",object="conduit"} 1',
+            lines)
+        self.assertIn(
+            'arcyd_conduit_errors_total'
+            '{method="fail",object="conduit"} 1',
+            lines)
+        self.assertIn(
+            'arcyd_conduit_errors_total'
+            '{method="ping",object="conduit"} 0',
+            lines)
+        self.assertIn('arcyd_tryloop_retries_total 1', lines)
+
+    def test_B_EscapeLabels(self):
+        output = _RecordingOutput()
+        reporter = abdt_arcydreporter.ArcydReporter(output)
+        reporter.tag_count('say "hi"\\\n')
+        reporter.start_sleep(1)
+        reporter.finish_sleep()
+        reporter.close()
+        text = abdweb_metrics.render(output.last)
+
+        self.assertIn('arcyd_tag_total{tag="say \\"hi\\"\\\\\\n"} 1', text)
+
+
+#------------------------------------------------------------------------------
+# Copyright (C) 2013-2014 Bloomberg Finance L.P.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to
+# deal in the Software without restriction, including without limitation the
+# rights to use, copy, modify, merge, publish, distribute, sublicense, and/or
+# sell copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.  IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+# IN THE SOFTWARE.
+#------------------------------- END-OF-FILE ----------------------------------
@@ -81,6 +81,13 @@ def setupParser(parser):
         type=str,
         help="perform an action on a review")
 
+    parser.add_argument(
+        '--max-in-flight',
+        metavar="N",
+        type=int,
+        default=4,
+        help="maximum number of comments to make at the same time")
+
     parser.add_argument(
         '--act-as-user',
         type=str,
@@ -113,9 +120,13 @@ def process(args):
         print "error: you have not specified any revision ids"
         sys.exit(1)
 
+    calls = []
     for i in ids:
-        d["revision_id"] = i
-        result = conduit.call("differential.createcomment", d)
+        params = dict(d)
+        params["revision_id"] = i
+        calls.append(("differential.createcomment", params))
+
+    for result in conduit.call_many(calls, args.max_in_flight):
         print result
 
 
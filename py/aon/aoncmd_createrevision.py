@@ -37,7 +37,7 @@ from __future__ import absolute_import
 import argparse
 
 import phlcon_differential
-import phlcon_user
+import phlcon_userdirectory
 import phlsys_makeconduit
 
 
@@ -153,7 +153,9 @@ def process(args):
         fields[MessageFields.cc_phids] = args.ccs
 
     # conduit expects PHIDs not plain usernames
-    user_phids = phlcon_user.UserPhidCache(conduit)
+    user_phids = phlcon_userdirectory.UserDirectory(
+        conduit,
+        phlcon_userdirectory.make_default_path(conduit.conduit_uri))
     for users in fields.itervalues():
         user_phids.add_hint_list(users)
     for key in fields.iterkeys():
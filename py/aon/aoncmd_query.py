@@ -67,6 +67,7 @@ import sys
 import textwrap
 
 import phlcon_user
+import phlcon_userdirectory
 import phlsys_dictutil
 import phlsys_makeconduit
 import phlsys_strtotime
@@ -269,7 +270,9 @@ def _process_user_fields(me, conduit, args):
         args.responsible_me)
 
     # conduit expects PHIDs not plain usernames
-    user_phids = phlcon_user.UserPhidCache(conduit)
+    user_phids = phlcon_userdirectory.UserDirectory(
+        conduit,
+        phlcon_userdirectory.make_default_path(conduit.conduit_uri))
     for users in d.itervalues():
         user_phids.add_hint_list(users)
 
@@ -44,7 +44,7 @@ import textwrap
 
 import phlcon_maniphest
 import phlcon_project
-import phlcon_user
+import phlcon_userdirectory
 import phlsys_makeconduit
 
 
@@ -143,7 +143,9 @@ def process(args):
         priority = phlcon_maniphest.PRIORITIES[args.priority]
 
     # conduit expects PHIDs not plain usernames
-    user_phids = phlcon_user.UserPhidCache(conduit)
+    user_phids = phlcon_userdirectory.UserDirectory(
+        conduit,
+        phlcon_userdirectory.make_default_path(conduit.conduit_uri))
     if args.owner:
         user_phids.add_hint(args.owner)
     user_phids.add_hint_list(args.ccs)
@@ -58,7 +58,7 @@ import textwrap
 
 import phlcon_maniphest
 import phlcon_project
-import phlcon_user
+import phlcon_userdirectory
 import phlsys_makeconduit
 
 
@@ -208,7 +208,9 @@ def process(args):
     conduit = phlsys_makeconduit.make_conduit(args.uri, args.user, args.cert)
 
     # conduit expects PHIDs not plain usernames
-    user_phids = phlcon_user.UserPhidCache(conduit)
+    user_phids = phlcon_userdirectory.UserDirectory(
+        conduit,
+        phlcon_userdirectory.make_default_path(conduit.conduit_uri))
     user_phids.add_hint_list(
         _combine_lists_if_not_none(args.owners, args.ccs))
     authors = [user_phids.get_phid(user) for user in args.authors]
@@ -0,0 +1,318 @@
+"""Remember the responses of read-only conduit calls for a while.
+
+Calls to methods which change things evict the responses that they may have
+made out of date, e.g. commenting on a revision evicts the remembered
+'differential.query' responses which include that revision.
+
+"""
+# =============================================================================
+# CONTENTS
+# -----------------------------------------------------------------------------
+# phlcon_cachingconduit
+#
+# Public Classes:
+#   CachingConduit
+#    .hit_count
+#    .miss_count
+#    .conduit_uri
+#    .set_act_as_user
+#    .clear_act_as_user
+#    .get_act_as_user
+#    .get_user
+#    .ping
+#    .call
+#    .call_many
+#
+# Public Assignments:
+#   DEFAULT_TTLS
+#
+# -----------------------------------------------------------------------------
+# (this contents block is generated, edits will be lost)
+# =============================================================================
+
+from __future__ import absolute_import
+
+import copy
+import json
+import threading
+import time
+
+import phlsys_conduit
+import phlsys_lrucache
+
+# the number of seconds to remember responses for each read-only method,
+# methods which aren't listed here are never cached
+DEFAULT_TTLS = {
+    "user.query": 600,
+    "project.query": 600,
+    "differential.query": 10,
+}
+
+# methods which change a revision, mapped to the name of the parameter that
+# identifies the revision.  Responses which concern that revision are evicted
+# when these are called.  None means that a new revision is made.
+_REVISION_WRITE_METHODS = {
+    "differential.close": "revisionID",
+    "differential.createcomment": "revision_id",
+    "differential.createinline": "revisionID",
+    "differential.createrevision": None,
+    "differential.updaterevision": "id",
+}
+
+# methods which neither change nor are worth remembering, every other method
+# that isn't read-only is assumed to potentially change anything
+_NEUTRAL_METHODS = set([
+    "conduit.connect",
+    "conduit.ping",
+    "differential.createrawdiff",
+    "differential.creatediff",
+    "differential.getcommitmessage",
+    "differential.getdiff",
+    "differential.parsecommitmessage",
+    "user.whoami",
+])
+
+
+class CachingConduit(object):
+
+    def __init__(self, conduit, max_size, ttls=None, on_hit=None,
+                 on_miss=None):
+        """Initialise a new CachingConduit, delegating to 'conduit'.
+
+        :conduit: a phlsys_conduit.Conduit to delegate to
+        :max_size: the maximum number of responses to remember
+        :ttls: dict of method name to seconds to remember responses for, these
+               override the entries in DEFAULT_TTLS
+        :on_hit: callable to be invoked like 'on_hit(method)' or None
+        :on_miss: callable to be invoked like 'on_miss(method)' or None
+        :returns: None
+
+        """
+        super(CachingConduit, self).__init__()
+        self._conduit = conduit
+        self._ttls = dict(DEFAULT_TTLS)
+        if ttls:
+            self._ttls.update(ttls)
+        self._on_hit = on_hit
+        self._on_miss = on_miss
+        self._hit_count = 0
+        self._miss_count = 0
+        self._lock = threading.Lock()
+
+        # map of (act_as_user, method, params) to _Entry
+        self._cache = phlsys_lrucache.LruCache(max_size)
+
+    @property
+    def hit_count(self):
+        return self._hit_count
+
+    @property
+    def miss_count(self):
+        return self._miss_count
+
+    @property
+    def conduit_uri(self):
+        return self._conduit.conduit_uri
+
+    def set_act_as_user(self, user):
+        self._conduit.set_act_as_user(user)
+
+    def clear_act_as_user(self):
+        self._conduit.clear_act_as_user()
+
+    def get_act_as_user(self):
+        return self._conduit.get_act_as_user()
+
+    def get_user(self):
+        return self._conduit.get_user()
+
+    def ping(self):
+        return self.call("conduit.ping")
+
+    def call(self, method, param_dict_in=None):
+        if method not in self._ttls:
+            try:
+                return self._conduit.call(method, param_dict_in)
+            finally:
+                self._invalidate(method, param_dict_in)
+
+        act_as_user = self._conduit.get_act_as_user()
+        key = _make_key(act_as_user, method, param_dict_in)
+        is_hit, result = self._lookup(key)
+        if is_hit:
+            return result
+
+        result = self._conduit.call(method, param_dict_in)
+        self._store(key, param_dict_in, result)
+        return result
+
+    def call_many(
+            self,
+            calls,
+            max_in_flight=phlsys_conduit.DEFAULT_MAX_IN_FLIGHT):
+        """Return a list of the results of the supplied 'calls', in order.
+
+        See 'phlsys_conduit.Conduit.call_many()', only the calls which can't
+        be answered from the cache are passed on.
+
+        :calls: a list of (method, param_dict) or
+                (method, param_dict, act_as_user) tuples
+        :max_in_flight: the maximum number of calls to make at the same time
+        :returns: a list of the results of the calls
+
+        """
+        act_as_user = self._conduit.get_act_as_user()
+        results = []
+        misses = []
+        for index, call in enumerate(calls):
+            method, param_dict = call[0], call[1]
+            user = call[2] if len(call) > 2 else act_as_user
+            key = None
+            is_hit, result = False, None
+            if method in self._ttls:
+                key = _make_key(user, method, param_dict)
+                is_hit, result = self._lookup(key)
+            results.append(result)
+            if not is_hit:
+                misses.append((index, key, (method, param_dict, user)))
+
+        if misses:
+            try:
+                miss_results = self._conduit.call_many(
+                    [call for _, _, call in misses], max_in_flight)
+                for (index, key, call), result in zip(misses, miss_results):
+                    if key is not None:
+                        self._store(key, call[1], result)
+                    results[index] = result
+            finally:
+                # invalidate after storing, the reads may have been made
+                # concurrently with the writes so they may be out of date
+                for _, key, call in misses:
+                    if key is None:
+                        self._invalidate(call[0], call[1])
+
+        return results
+
+    def _lookup(self, key):
+        method = key[1]
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is not None and entry.expiry <= time.time():
+                self._cache.discard(key)
+                entry = None
+            if entry is not None:
+                self._hit_count += 1
+            else:
+                self._miss_count += 1
+
+        if entry is None:
+            if self._on_miss is not None:
+                self._on_miss(method)
+            return False, None
+
+        if self._on_hit is not None:
+            self._on_hit(method)
+        return True, copy.deepcopy(entry.result)
+
+    def _store(self, key, param_dict, result):
+        method = key[1]
+        ttl = self._ttls.get(method)
+        if not ttl:
+            return
+        entry = _Entry(
+            time.time() + ttl,
+            _get_revision_ids_or_none(method, param_dict, result),
+            copy.deepcopy(result))
+        with self._lock:
+            self._cache[key] = entry
+
+    def _invalidate(self, method, param_dict):
+        if method in _NEUTRAL_METHODS:
+            return
+
+        with self._lock:
+            if method not in _REVISION_WRITE_METHODS:
+                # we don't know what this affects, assume everything
+                for key in self._cache.keys():
+                    self._cache.discard(key)
+                return
+
+            revision_id = None
+            param_name = _REVISION_WRITE_METHODS[method]
+            if param_name is not None:
+                revision_id = _int_or_none(
+                    (param_dict or {}).get(param_name))
+
+            for key, entry in self._cache.items():
+                if not key[1].startswith("differential."):
+                    continue
+                if entry.revision_ids is None:
+                    self._cache.discard(key)
+                elif revision_id in entry.revision_ids:
+                    self._cache.discard(key)
+                elif revision_id is None and param_name is not None:
+                    self._cache.discard(key)
+
+
+class _Entry(object):
+
+    def __init__(self, expiry, revision_ids, result):
+        super(_Entry, self).__init__()
+        self.expiry = expiry
+        self.revision_ids = revision_ids
+        self.result = result
+
+
+def _make_key(act_as_user, method, param_dict):
+    params_json = json.dumps(param_dict or {}, sort_keys=True)
+    return (act_as_user, method, params_json)
+
+
+def _int_or_none(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _get_revision_ids_or_none(method, param_dict, result):
+    # return the set of revision ids that 'result' depends on, or None if it
+    # may depend on any revision
+    if not method.startswith("differential."):
+        return frozenset()
+
+    param_dict = param_dict or {}
+    ids = param_dict.get("ids")
+    if not ids:
+        return None
+
+    revision_ids = set(_int_or_none(i) for i in ids)
+    if isinstance(result, list):
+        for item in result:
+            if isinstance(item, dict):
+                revision_ids.add(_int_or_none(item.get("id")))
+    revision_ids.discard(None)
+    return frozenset(revision_ids)
+
+
+#------------------------------------------------------------------------------
+# Copyright (C) 2013-2014 Bloomberg Finance L.P.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to
+# deal in the Software without restriction, including without limitation the
+# rights to use, copy, modify, merge, publish, distribute, sublicense, and/or
+# sell copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.  IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+# IN THE SOFTWARE.
+#------------------------------- END-OF-FILE ----------------------------------
@@ -0,0 +1,182 @@
+"""Test suite for phlcon_cachingconduit."""
+#==============================================================================
+#                                   TEST PLAN
+#------------------------------------------------------------------------------
+# Here we detail the things we are concerned to test and specify which tests
+# cover those concerns.
+#
+# Concerns:
+# [ A] repeated read-only calls are answered from the cache
+# [ A] calls with different parameters or users are cached separately
+# [ A] hits and misses are counted and reported
+# [ A] changes to returned results don't affect the cache
+# [ B] methods without a ttl are never cached
+# [ C] revision writes only evict responses concerning that revision
+# [ C] creating a revision evicts responses which aren't limited to ids
+# [ C] unknown methods evict everything, neutral methods evict nothing
+# [ D] call_many only passes on the calls that miss the cache
+#------------------------------------------------------------------------------
+# Tests:
+# [ A] test_A_Breathing
+# [ B] test_B_Ttls
+# [ C] test_C_Invalidation
+# [ D] test_D_CallMany
+#==============================================================================
+
+from __future__ import absolute_import
+
+import unittest
+
+import phlcon_cachingconduit
+
+
+class _RecordingConduit(object):
+
+    def __init__(self):
+        super(_RecordingConduit, self).__init__()
+        self.calls = []
+        self._act_as_user = None
+
+    def set_act_as_user(self, user):
+        self._act_as_user = user
+
+    def clear_act_as_user(self):
+        self._act_as_user = None
+
+    def get_act_as_user(self):
+        return self._act_as_user
+
+    def call(self, method, param_dict_in=None):
+        self.calls.append((method, param_dict_in, self._act_as_user))
+        if method == "differential.query":
+            ids = (param_dict_in or {}).get("ids", [1, 2])
+            return [{"id": str(i), "calls": len(self.calls)} for i in ids]
+        return {"calls": len(self.calls)}
+
+    def call_many(self, calls, max_in_flight):
+        results = []
+        for call in calls:
+            self._act_as_user = call[2]
+            results.append(self.call(call[0], call[1]))
+        self._act_as_user = None
+        return results
+
+
+class Test(unittest.TestCase):
+
+    def setUp(self):
+        self.base = _RecordingConduit()
+        self.hits = []
+        self.misses = []
+        self.conduit = phlcon_cachingconduit.CachingConduit(
+            self.base,
+            100,
+            on_hit=self.hits.append,
+            on_miss=self.misses.append)
+
+    def _query(self, *ids):
+        return self.conduit.call("differential.query", {"ids": list(ids)})
+
+    def test_A_Breathing(self):
+        emails = {"emails": ["a@b.com"]}
+        first = self.conduit.call("user.query", emails)
+        self.assertEqual(self.conduit.call("user.query", emails), first)
+        self.assertEqual(len(self.base.calls), 1)
+        self.assertEqual(self.hits, ["user.query"])
+        self.assertEqual(self.misses, ["user.query"])
+        self.assertEqual(self.conduit.hit_count, 1)
+        self.assertEqual(self.conduit.miss_count, 1)
+
+        self.conduit.call("user.query", {"emails": ["c@d.com"]})
+        self.assertEqual(len(self.base.calls), 2)
+
+        self.conduit.set_act_as_user("alice")
+        self.conduit.call("user.query", emails)
+        self.assertEqual(len(self.base.calls), 3)
+        self.conduit.clear_act_as_user()
+
+        first["calls"] = "changed"
+        self.assertNotEqual(
+            self.conduit.call("user.query", emails)["calls"], "changed")
+
+    def test_B_Ttls(self):
+        self.conduit.call("conduit.ping")
+        self.conduit.call("conduit.ping")
+        self.assertEqual(len(self.base.calls), 2)
+        self.assertEqual(self.conduit.miss_count, 0)
+
+        conduit = phlcon_cachingconduit.CachingConduit(
+            self.base, 100, ttls={"user.query": 0})
+        conduit.call("user.query")
+        conduit.call("user.query")
+        self.assertEqual(len(self.base.calls), 4)
+
+    def test_C_Invalidation(self):
+        self._query(1)
+        self._query(2)
+        self.conduit.call("differential.query", {"authors": ["x"]})
+        self.conduit.call("user.query")
+        self.assertEqual(len(self.base.calls), 4)
+
+        self.conduit.call(
+            "differential.createcomment", {"revision_id": 1})
+        self._query(1)
+        self._query(2)
+        self.conduit.call("differential.query", {"authors": ["x"]})
+        self.conduit.call("user.query")
+        self.assertEqual(len(self.base.calls), 7)
+
+        self.conduit.call("differential.createrevision", {})
+        self._query(1)
+        self._query(2)
+        self.conduit.call("differential.query", {"authors": ["x"]})
+        self.assertEqual(len(self.base.calls), 9)
+
+        self.conduit.call("conduit.ping")
+        self._query(1)
+        self.assertEqual(len(self.base.calls), 10)
+
+        self.conduit.call("project.create", {"name": "x"})
+        self._query(1)
+        self.conduit.call("user.query")
+        self.assertEqual(len(self.base.calls), 13)
+
+    def test_D_CallMany(self):
+        self._query(1)
+        results = self.conduit.call_many([
+            ("differential.query", {"ids": [1]}),
+            ("differential.query", {"ids": [2]}),
+            ("differential.createcomment", {"revision_id": 2}),
+            ("differential.query", {"ids": [1]}, "alice"),
+        ])
+        self.assertEqual(len(results), 4)
+        self.assertEqual(results[0], self._query(1))
+        self.assertEqual(len(self.base.calls), 4)
+        self.assertEqual(self.base.calls[-1][2], "alice")
+
+        # the comment evicted the response for revision 2
+        self._query(2)
+        self.assertEqual(len(self.base.calls), 5)
+
+
+#------------------------------------------------------------------------------
+# Copyright (C) 2013-2014 Bloomberg Finance L.P.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to
+# deal in the Software without restriction, including without limitation the
+# rights to use, copy, modify, merge, publish, distribute, sublicense, and/or
+# sell copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.  IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+# IN THE SOFTWARE.
+#------------------------------- END-OF-FILE ----------------------------------
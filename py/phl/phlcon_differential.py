@@ -7,6 +7,7 @@
 # Public Classes:
 #   ReviewStates
 #   Action
+#   QueryOrder
 #   MessageFields
 #   ParseCommitMessageFail
 #   ParseCommitMessageNoTestPlanFail
@@ -91,6 +92,12 @@ class Action(object):  # XXX: will derive from Enum in Python 3.4+
     reopen = 'reopen'
 
 
+# Enumerate the orders that 'differential.query' can return revisions in
+class QueryOrder(object):  # XXX: will derive from Enum in Python 3.4+
+    created = 'order-created'
+    modified = 'order-modified'
+
+
 # Enumerate all the actions that an author may perform on a review
 # map the strings that appear in the web UI to string that conduit expects
 AUTHOR_ACTIONS = {
@@ -349,9 +356,17 @@ def create_revision(conduit, diffId, fields):
 
 def query(
         conduit,
-        ids=None):  # list(uint)
+        ids=None,  # list(uint)
+        order=None,  # e.g. QueryOrder.modified
+        limit=None,
+        offset=None):
     # TODO: typechecking
-    d = phlsys_dictutil.copy_dict_no_nones({'ids': ids})
+    d = phlsys_dictutil.copy_dict_no_nones({
+        'ids': ids,
+        'order': order,
+        'limit': limit,
+        'offset': offset,
+    })
     response = conduit.call("differential.query", d)
     query_response_list = []
     for r in response:
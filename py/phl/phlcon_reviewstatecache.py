@@ -8,12 +8,18 @@
 #   ReviewStateCache
 #    .get_status
 #    .get_date_modified
+#    .get_author_phid
+#    .get_known_author_phids
 #    .refresh_active_reviews
+#    .prefetch
+#    .load_dict
+#    .dump_dict
 #    .set_conduit
 #    .clear_conduit
 #
 # Public Functions:
 #   make_revision_list_status_callable
+#   make_recently_modified_callable
 #
 # -----------------------------------------------------------------------------
 # (this contents block is generated, edits will be lost)
@@ -25,12 +31,31 @@ import collections
 
 import phlcon_differential
 
+_DEFAULT_PREFETCH_CHUNK_SIZE = 100
+
+# when refreshing incrementally, fall back to a full refresh if more than
+# this many pages of recently modified revisions would be needed
+_MODIFIED_PAGE_SIZE = 100
+_MAX_MODIFIED_PAGES = 10
+
 
 class ReviewStateCache(object):
 
-    def __init__(self):
+    def __init__(self, full_refresh_interval=None):
+        """Initialise a new ReviewStateCache.
+
+        If 'full_refresh_interval' is supplied then 'refresh_active_reviews'
+        only queries for revisions modified since the last refresh, except
+        for every 'full_refresh_interval'th refresh which queries all the
+        active reviews as a safety net.
+
+        :full_refresh_interval: int number of refreshes, or None to always
+                                refresh fully
+        :returns: None
+
+        """
         super(ReviewStateCache, self).__init__()
-        self._cache = _ReviewStateCache()
+        self._cache = _ReviewStateCache(full_refresh_interval)
 
     def get_status(self, review_id):
         return self._cache.get_status(review_id)
@@ -38,17 +63,68 @@ class ReviewStateCache(object):
     def get_date_modified(self, review_id):
         return self._cache.get_date_modified(review_id)
 
+    def get_author_phid(self, review_id):
+        return self._cache.get_author_phid(review_id)
+
+    def get_known_author_phids(self):
+        """Return a set of the author phids of all the remembered reviews.
+
+        This does not query for any reviews, so it is useful for resolving the
+        authors in bulk before they are needed.
+
+        :returns: a set of string phids
+
+        """
+        return self._cache.get_known_author_phids()
+
     def refresh_active_reviews(self):
         self._cache.refresh_active_reviews()
 
+    def prefetch(self, review_ids, chunk_size=_DEFAULT_PREFETCH_CHUNK_SIZE):
+        """Retrieve the states of 'review_ids' that aren't already remembered.
+
+        The reviews are queried in chunks of 'chunk_size', rather than one at
+        a time as they're asked for.
+
+        :review_ids: an iterable of int review ids
+        :chunk_size: the maximum number of reviews to query at once
+        :returns: None
+
+        """
+        self._cache.prefetch(review_ids, chunk_size)
+
+    def load_dict(self, state):
+        """Load the review states from 'state', adding to existing ones.
+
+        The loaded states may be out of date, they are all considered active
+        so 'refresh_active_reviews' should be called before relying on them.
+
+        :state: a dict as returned by 'dump_dict'
+        :returns: None
+
+        """
+        self._cache.load_dict(state)
+
+    def dump_dict(self):
+        """Return a dict of the review states which can be made into JSON.
+
+        :returns: a dict
+
+        """
+        return self._cache.dump_dict()
+
     def set_conduit(self, conduit):
         assert conduit
         self._cache.set_revision_list_status_callable(
             make_revision_list_status_callable(
                 conduit))
+        self._cache.set_recently_modified_callable(
+            make_recently_modified_callable(
+                conduit))
 
     def clear_conduit(self):
         self._cache.clear_revision_list_status_callable()
+        self._cache.clear_recently_modified_callable()
 
 
 def make_revision_list_status_callable(conduit):
@@ -59,21 +135,41 @@ def make_revision_list_status_callable(conduit):
     return revision_list_status
 
 
+def make_recently_modified_callable(conduit):
+
+    def recently_modified(limit, offset):
+        return phlcon_differential.query(
+            conduit,
+            order=phlcon_differential.QueryOrder.modified,
+            limit=limit,
+            offset=offset)
+
+    return recently_modified
+
+
 _ReviewState = collections.namedtuple(
     'phlcon_reviewstatecache__ReviewState',
-    ['status', 'date_modified'])
+    ['status', 'date_modified', 'author_phid'])
 
 
 class _ReviewStateCache(object):
 
-    def __init__(self):
+    def __init__(self, full_refresh_interval=None):
         super(_ReviewStateCache, self).__init__()
         self._review_to_state = {}
         self._active_reviews = set()
         self._revision_list_status_callable = None
+        self._recently_modified_callable = None
+        self._full_refresh_interval = full_refresh_interval
+        self._refreshes_since_full = 0
+
+        # the latest 'dateModified' seen by a refresh, everything modified
+        # before this is reflected in the cache
+        self._max_date_modified = None
 
     def _make_state(self, response):
-        return _ReviewState(response.status, response.dateModified)
+        return _ReviewState(
+            response.status, response.dateModified, response.authorPHID)
 
     def _get_state(self, review_id):
         assert self._revision_list_status_callable
@@ -90,8 +186,34 @@ class _ReviewStateCache(object):
     def get_date_modified(self, review_id):
         return self._get_state(review_id).date_modified
 
+    def get_author_phid(self, review_id):
+        return self._get_state(review_id).author_phid
+
+    def get_known_author_phids(self):
+        return set(s.author_phid for s in self._review_to_state.itervalues())
+
     def refresh_active_reviews(self):
         assert self._revision_list_status_callable
+        if self._is_incremental_refresh_due():
+            modified = self._query_modified_since(self._max_date_modified)
+            if modified is not None:
+                self._refresh_incrementally(modified)
+                self._refreshes_since_full += 1
+                return
+
+        self._refresh_fully()
+        self._refreshes_since_full = 0
+
+    def _is_incremental_refresh_due(self):
+        if not self._full_refresh_interval:
+            return False
+        if self._recently_modified_callable is None:
+            return False
+        if self._max_date_modified is None:
+            return False
+        return self._refreshes_since_full + 1 < self._full_refresh_interval
+
+    def _refresh_fully(self):
         self._review_to_state = {}
         if self._active_reviews:
             responses = self._revision_list_status_callable(
@@ -100,6 +222,80 @@ class _ReviewStateCache(object):
                 r.id: self._make_state(r) for r in responses
             }
             self._active_reviews = set()
+            self._update_max_date_modified(responses)
+
+    def _refresh_incrementally(self, modified_responses):
+        self._review_to_state = {
+            r: self._review_to_state[r] for r in self._active_reviews
+        }
+        for r in modified_responses:
+            if r.id in self._review_to_state:
+                self._review_to_state[r.id] = self._make_state(r)
+        self._active_reviews = set()
+        self._update_max_date_modified(modified_responses)
+
+    def _query_modified_since(self, date_modified):
+        # return the revisions modified since 'date_modified', or None if
+        # there were too many of them
+        results = []
+        for page in xrange(_MAX_MODIFIED_PAGES):
+            responses = self._recently_modified_callable(
+                _MODIFIED_PAGE_SIZE, page * _MODIFIED_PAGE_SIZE)
+
+            # N.B. revisions modified in the same second as 'date_modified'
+            #      may not have been seen yet, so include those
+            recent = [
+                r for r in responses if int(r.dateModified) >= date_modified
+            ]
+            results.extend(recent)
+
+            if len(recent) < len(responses):
+                return results
+            if len(responses) < _MODIFIED_PAGE_SIZE:
+                return results
+
+        return None
+
+    def _update_max_date_modified(self, responses):
+        if not self._full_refresh_interval:
+            return
+        for r in responses:
+            date_modified = int(r.dateModified)
+            if self._max_date_modified is None:
+                self._max_date_modified = date_modified
+            elif date_modified > self._max_date_modified:
+                self._max_date_modified = date_modified
+
+    def prefetch(self, review_ids, chunk_size):
+        assert self._revision_list_status_callable
+        missing = sorted(
+            set(review_ids).difference(self._review_to_state))
+        for i in xrange(0, len(missing), chunk_size):
+            responses = self._revision_list_status_callable(
+                missing[i:i + chunk_size])
+            for r in responses:
+                self._review_to_state[r.id] = self._make_state(r)
+
+    def load_dict(self, state):
+        for review_id, fields in state.get('states', {}).iteritems():
+            review_id = int(review_id)
+            self._review_to_state[review_id] = _ReviewState(*fields)
+            self._active_reviews.add(review_id)
+        max_date_modified = state.get('max_date_modified')
+        if max_date_modified is not None:
+            if self._max_date_modified is None:
+                self._max_date_modified = max_date_modified
+            else:
+                self._max_date_modified = min(
+                    self._max_date_modified, max_date_modified)
+
+    def dump_dict(self):
+        return {
+            'states': {
+                str(r): list(s) for r, s in self._review_to_state.iteritems()
+            },
+            'max_date_modified': self._max_date_modified,
+        }
 
     def set_revision_list_status_callable(self, status_callable):
         self._revision_list_status_callable = status_callable
@@ -108,6 +304,13 @@ class _ReviewStateCache(object):
     def clear_revision_list_status_callable(self):
         self._revision_list_status_callable = None
 
+    def set_recently_modified_callable(self, modified_callable):
+        self._recently_modified_callable = modified_callable
+        assert self._recently_modified_callable
+
+    def clear_recently_modified_callable(self):
+        self._recently_modified_callable = None
+
 
 #------------------------------------------------------------------------------
 # Copyright (C) 2013-2014 Bloomberg Finance L.P.
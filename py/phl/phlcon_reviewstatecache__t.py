@@ -18,12 +18,21 @@
 # [ D] _ReviewStateCache retrieves statuses for reviews not queried before
 # [ D] _ReviewStateCache does not callable when queried for cached query
 # [ D] _ReviewStateCache returns correct value when retrieving cached
+# [ D] _ReviewStateCache knows the authors of cached reviews
+# [ E] _ReviewStateCache prefetches uncached reviews in chunks
+# [ E] _ReviewStateCache does not callable for prefetched reviews
+# [ F] _ReviewStateCache refreshes fully first with an interval set
+# [ F] _ReviewStateCache only updates modified reviews between full refreshes
+# [ F] _ReviewStateCache refreshes fully every 'full_refresh_interval'
+# [ F] _ReviewStateCache refreshes fully if too many reviews were modified
 #------------------------------------------------------------------------------
 # Tests:
 # [ A] test_A_Breathing
 # [ B] test_B_AssertIfNoQueryableSupplied
 # [ C] test_C_RefreshBeforeGet
 # [ D] test_D_InvalidationRules
+# [ E] test_E_Prefetch
+# [ F] test_F_IncrementalRefresh
 #==============================================================================
 
 from __future__ import absolute_import
@@ -40,7 +49,7 @@ import phlcon_reviewstatecache
 
 FakeResult = collections.namedtuple(
     'phlcon_reviewstatecache__t_FakeResult',
-    ['id', 'status', 'dateModified'])
+    ['id', 'status', 'dateModified', 'authorPHID'])
 
 
 class Test(unittest.TestCase):
@@ -184,7 +193,7 @@ class Test(unittest.TestCase):
             expected_queries[:] = expected_queries[1:]
 
             return [
-                FakeResult(r, str(r) + 'r', str(r) + 'd')
+                FakeResult(r, str(r) + 'r', str(r) + 'd', str(r) + 'a')
                 for r in actual_revision_list
             ]
 
@@ -209,6 +218,108 @@ class Test(unittest.TestCase):
         for revision in revision_list:
             result = cache_impl.get_status(revision)
             self.assertEqual(result, str(revision) + 'r')
+            result = cache_impl.get_author_phid(revision)
+            self.assertEqual(result, str(revision) + 'a')
+
+        # [ D] _ReviewStateCache knows the authors of cached reviews
+        self.assertSetEqual(
+            cache_impl.get_known_author_phids(),
+            set(str(r) + 'a' for r in revision_list))
+
+    def test_E_Prefetch(self):
+        queries = []
+
+        def fake_callable(revision_list):
+            queries.append(list(revision_list))
+            return [
+                FakeResult(r, str(r) + 'r', str(r) + 'd', str(r) + 'a')
+                for r in revision_list
+            ]
+
+        cache_impl = phlcon_reviewstatecache._ReviewStateCache()
+        cache_impl.set_revision_list_status_callable(fake_callable)
+
+        cache_impl.get_status(1)
+        self.assertEqual(queries, [[1]])
+
+        # [ E] _ReviewStateCache prefetches uncached reviews in chunks
+        cache_impl.prefetch([1, 2, 3, 4, 5, 3], 2)
+        self.assertEqual(queries, [[1], [2, 3], [4, 5]])
+
+        # [ E] _ReviewStateCache does not callable for prefetched reviews
+        for revision in [1, 2, 3, 4, 5]:
+            self.assertEqual(
+                cache_impl.get_status(revision), str(revision) + 'r')
+        self.assertEqual(len(queries), 3)
+
+    def test_F_IncrementalRefresh(self):
+        queries = []
+        modified_queries = []
+        server_state = {1: ('a', 10), 2: ('b', 10), 3: ('c', 10)}
+
+        def fake_callable(revision_list):
+            queries.append(sorted(revision_list))
+            return [
+                FakeResult(r, server_state[r][0], server_state[r][1], 'p')
+                for r in revision_list
+            ]
+
+        def fake_modified_callable(limit, offset):
+            modified_queries.append(offset)
+            by_modified = sorted(
+                server_state.iteritems(),
+                key=lambda x: x[1][1],
+                reverse=True)
+            return [
+                FakeResult(r, s[0], s[1], 'p')
+                for r, s in by_modified[offset:offset + limit]
+            ]
+
+        def get_statuses():
+            return [cache_impl.get_status(r) for r in sorted(server_state)]
+
+        cache_impl = phlcon_reviewstatecache._ReviewStateCache(3)
+        cache_impl.set_revision_list_status_callable(fake_callable)
+        cache_impl.set_recently_modified_callable(fake_modified_callable)
+
+        # [ F] _ReviewStateCache refreshes fully first with an interval set
+        self.assertEqual(get_statuses(), ['a', 'b', 'c'])
+        del queries[:]
+        cache_impl.refresh_active_reviews()
+        self.assertEqual(queries, [[1, 2, 3]])
+        self.assertEqual(modified_queries, [])
+
+        # [ F] _ReviewStateCache only updates modified reviews between full
+        #      refreshes
+        server_state[2] = ('B', 20)
+        self.assertEqual(get_statuses(), ['a', 'b', 'c'])
+        cache_impl.refresh_active_reviews()
+        self.assertEqual(get_statuses(), ['a', 'B', 'c'])
+        self.assertEqual(queries, [[1, 2, 3]])
+        self.assertEqual(modified_queries, [0])
+
+        server_state[3] = ('C', 30)
+        cache_impl.refresh_active_reviews()
+        self.assertEqual(get_statuses(), ['a', 'B', 'C'])
+        self.assertEqual(queries, [[1, 2, 3]])
+
+        # [ F] _ReviewStateCache refreshes fully every 'full_refresh_interval'
+        cache_impl.refresh_active_reviews()
+        self.assertEqual(queries, [[1, 2, 3], [1, 2, 3]])
+        self.assertEqual(get_statuses(), ['a', 'B', 'C'])
+
+        # [ F] _ReviewStateCache refreshes fully if too many reviews were
+        #      modified
+        del modified_queries[:]
+        page_size = phlcon_reviewstatecache._MODIFIED_PAGE_SIZE
+        max_pages = phlcon_reviewstatecache._MAX_MODIFIED_PAGES
+        for i in xrange(page_size * max_pages):
+            server_state[100 + i] = ('x', 40)
+        server_state[1] = ('A', 40)
+        cache_impl.refresh_active_reviews()
+        self.assertEqual(len(modified_queries), max_pages)
+        self.assertEqual(queries[-1], [1, 2, 3])
+        self.assertEqual(cache_impl.get_status(1), 'A')
 
 
 #------------------------------------------------------------------------------
@@ -4,16 +4,13 @@
 # -----------------------------------------------------------------------------
 # phlcon_user
 #
-# Public Classes:
-#   UserPhidCache
-#    .add_hint
-#    .add_hint_list
-#    .get_phid
-#
 # Public Functions:
 #   is_no_such_error
 #   query_user_from_email
 #   query_users_from_emails
+#   query_user_responses_from_emails
+#   query_users_matching_emails
+#   query_users_matching_usernames
 #   query_users_from_phids
 #   query_users_from_usernames
 #   query_usernames_from_phids
@@ -40,38 +37,6 @@ QueryResponse = phlsys_namedtuple.make_named_tuple(
     ignored=['currentStatus', 'currentStatusUntil'])
 
 
-class UserPhidCache(object):
-
-    """Efficiently retrieve the PHID for specified usernames."""
-
-    def __init__(self, conduit):
-        """Construct a cache attached to the specified 'conduit'."""
-        super(UserPhidCache, self).__init__()
-        self._user_to_phid = {}
-        self._hinted_users = set()
-        self._conduit = conduit
-
-    def add_hint(self, user):
-        """Register 'user' as a user we'll later query."""
-        if user not in self._user_to_phid:
-            self._hinted_users.add(user)
-
-    def add_hint_list(self, user_list):
-        """Register all 'user_list' as users we'll later query."""
-        for user in user_list:
-            self.add_hint(user)
-
-    def get_phid(self, user):
-        """Return the PHID for the specified 'user'."""
-        self.add_hint(user)
-        if user not in self._user_to_phid:
-            results = make_username_phid_dict(
-                self._conduit, list(self._hinted_users))
-            self._user_to_phid.update(results)
-            self._hinted_users = set()
-        return self._user_to_phid[user]
-
-
 def is_no_such_error(e):
     """Return True if the supplied ConduitException is due to unknown user.
 
@@ -97,14 +62,21 @@ def query_user_from_email(conduit, email):
     :returns: a QueryResponse or None
 
     """
-    d = {"emails": [email], "limit": 1}
     response = None
     try:
-        response = conduit.call("user.query", d)
+        response = conduit.call("user.query", _make_email_query(email))
     except phlsys_conduit.ConduitException as e:
         if not is_no_such_error(e):
             raise
 
+    return _make_user_from_email_response(response)
+
+
+def _make_email_query(email):
+    return {"emails": [email], "limit": 1}
+
+
+def _make_user_from_email_response(response):
     if response:
         if len(response) != 1:
             raise Exception("unexpected number of entries")
@@ -113,27 +85,99 @@ def query_user_from_email(conduit, email):
         return None
 
 
-def query_users_from_emails(conduit, emails):
+def query_users_from_emails(conduit, emails, max_in_flight=1):
     """Return a list of username strings based on the provided emails.
 
     If an email does not correspond to a username then None is inserted in
     its place.
 
+    If 'max_in_flight' is more than 1 then the queries are made concurrently
+    and 'conduit' must also support 'call_many()' like phlsys_conduit.
+
     :conduit: must support 'call()' like phlsys_conduit
     :emails: a list of strings corresponding to user email addresses
+    :max_in_flight: the maximum number of queries to make at the same time
     :returns: a list of strings corresponding to Phabricator usernames
 
     """
-    users = []
-    for e in emails:
-        u = query_user_from_email(conduit, e)
-        if u is not None:
-            users.append(u.userName)
-        else:
-            users.append(None)
+    users = query_user_responses_from_emails(conduit, emails, max_in_flight)
+    return [u.userName if u is not None else None for u in users]
+
+
+def query_user_responses_from_emails(conduit, emails, max_in_flight=1):
+    """Return a list of QueryResponse based on the provided emails.
+
+    If an email does not correspond to a user then None is inserted in its
+    place.
+
+    If 'max_in_flight' is more than 1 then the queries are made concurrently
+    and 'conduit' must also support 'call_many()' like phlsys_conduit.
+
+    :conduit: must support 'call()' like phlsys_conduit
+    :emails: a list of strings corresponding to user email addresses
+    :max_in_flight: the maximum number of queries to make at the same time
+    :returns: a list of QueryResponse or None
+
+    """
+    users = None
+    if max_in_flight > 1 and len(emails) > 1:
+        calls = [("user.query", _make_email_query(e)) for e in emails]
+        try:
+            responses = conduit.call_many(calls, max_in_flight)
+            users = [_make_user_from_email_response(r) for r in responses]
+        except phlsys_conduit.ConduitException as e:
+            # older Phabricators raise on unknown emails, we can't tell which
+            # so fall back to querying them one at a time
+            if not is_no_such_error(e):
+                raise
+    if users is None:
+        users = [query_user_from_email(conduit, email) for email in emails]
+
     return users
 
 
+def query_users_matching_emails(conduit, emails):
+    """Return a list of QueryResponse for users with any of 'emails'.
+
+    Note that the responses don't say which email each user matched, this is
+    useful to find out if none of 'emails' correspond to users in a single
+    query.
+
+    :conduit: must support 'call()' like phlsys_conduit
+    :emails: a list of strings corresponding to user email addresses
+    :returns: a list of QueryResponse, in no particular order
+
+    """
+    return _query_users_matching(
+        conduit, {"emails": emails, "limit": len(emails)})
+
+
+def query_users_matching_usernames(conduit, usernames):
+    """Return a list of QueryResponse for users with any of 'usernames'.
+
+    Unlike 'query_users_from_usernames()', invalid usernames are left out of
+    the result rather than spoiling it.
+
+    :conduit: must support 'call()' like phlsys_conduit
+    :usernames: a list of strings corresponding to usernames
+    :returns: a list of QueryResponse, in no particular order
+
+    """
+    return _query_users_matching(
+        conduit, {"usernames": usernames, "limit": len(usernames)})
+
+
+def _query_users_matching(conduit, d):
+    response = None
+    try:
+        response = conduit.call("user.query", d)
+    except phlsys_conduit.ConduitException as e:
+        if not is_no_such_error(e):
+            raise
+
+    return [QueryResponse(**u) for u in (response or [])]
+
+
 def query_users_from_phids(conduit, phids):
     """Return a list of QueryResponse based on the provided phids.
 
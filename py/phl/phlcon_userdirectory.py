@@ -0,0 +1,340 @@
+"""Remember the Phabricator users for emails and usernames across runs.
+
+Looking up the user for an email or username is a round-trip to Phabricator,
+the answers rarely change so a 'UserDirectory' remembers them for a while.
+Emails which don't correspond to a user are also remembered, for a shorter
+while, so that repeatedly retrying a branch by an unknown author doesn't
+query for them each time.
+
+If a path is supplied then the directory is loaded from it and saved back to
+it whenever anything new is learned, so that it survives restarts.  Saving is
+best-effort, if the path can't be written then the directory is only kept in
+memory.
+
+"""
+# =============================================================================
+# CONTENTS
+# -----------------------------------------------------------------------------
+# phlcon_userdirectory
+#
+# Public Classes:
+#   UserDirectory
+#    .query_user_from_email
+#    .query_users_from_emails
+#    .add_hint
+#    .add_hint_list
+#    .get_phid
+#    .load_dict
+#    .dump_dict
+#
+# Public Functions:
+#   make_default_path
+#
+# Public Assignments:
+#   DEFAULT_POSITIVE_TTL
+#   DEFAULT_NEGATIVE_TTL
+#
+# -----------------------------------------------------------------------------
+# (this contents block is generated, edits will be lost)
+# =============================================================================
+
+from __future__ import absolute_import
+
+import json
+import os
+import threading
+import time
+import urllib
+
+import phlsys_fs
+
+import phlcon_user
+
+# the number of seconds to remember that an email or username is a user for
+DEFAULT_POSITIVE_TTL = 24 * 60 * 60
+
+# the number of seconds to remember that an email is not a user for
+DEFAULT_NEGATIVE_TTL = 10 * 60
+
+_FORMAT_VERSION = 1
+
+
+class UserDirectory(object):
+
+    def __init__(
+            self,
+            conduit,
+            path=None,
+            positive_ttl=DEFAULT_POSITIVE_TTL,
+            negative_ttl=DEFAULT_NEGATIVE_TTL):
+        """Initialise a new UserDirectory, loading from 'path' if it exists.
+
+        Note that the directory is specific to the Phabricator instance that
+        'conduit' is connected to, 'path' shouldn't be shared between
+        instances.
+
+        :conduit: must support 'call()' like phlsys_conduit
+        :path: the string path of the file to persist to, or None
+        :positive_ttl: seconds to remember that an email is a user for
+        :negative_ttl: seconds to remember that an email is not a user for
+        :returns: None
+
+        """
+        super(UserDirectory, self).__init__()
+        self._conduit = conduit
+        self._path = path
+        self._positive_ttl = positive_ttl
+        self._negative_ttl = negative_ttl
+        self._lock = threading.Lock()
+
+        # map of email to (username, phid, expiry), username and phid are
+        # None if the email doesn't correspond to a user
+        self._email_to_user = {}
+
+        # map of username to (phid, expiry)
+        self._username_to_phid = {}
+
+        self._hinted_usernames = set()
+
+        if path is not None and os.path.isfile(path):
+            self._load()
+
+    def query_user_from_email(self, email):
+        """Return a (username, phid) tuple based on the provided email.
+
+        If the email does not correspond to a user then return None.
+
+        :email: an email address as a string
+        :returns: a (username, phid) tuple or None
+
+        """
+        return self.query_users_from_emails([email])[0]
+
+    def query_users_from_emails(self, emails, max_in_flight=1):
+        """Return a list of (username, phid) based on the provided emails.
+
+        If an email does not correspond to a user then None is inserted in its
+        place.
+
+        All the emails that aren't remembered are queried together, if more
+        than one of them correspond to users then they are resolved
+        individually, 'max_in_flight' at a time.
+
+        :emails: a list of strings corresponding to user email addresses
+        :max_in_flight: the maximum number of queries to make at the same time
+        :returns: a list of (username, phid) tuples or None
+
+        """
+        now = time.time()
+        email_to_user = {}
+        with self._lock:
+            for email in emails:
+                entry = self._email_to_user.get(email)
+                if _is_fresh(entry, now):
+                    email_to_user[email] = entry
+        missing = sorted(set(emails).difference(email_to_user))
+
+        if missing:
+            users = self._query_missing_emails(missing, max_in_flight)
+            now = time.time()
+            for email, user in zip(missing, users):
+                if user is None:
+                    expiry = now + self._negative_ttl
+                    email_to_user[email] = (None, None, expiry)
+                else:
+                    expiry = now + self._positive_ttl
+                    email_to_user[email] = (user.userName, user.phid, expiry)
+            with self._lock:
+                for email in missing:
+                    username, phid, expiry = email_to_user[email]
+                    self._email_to_user[email] = email_to_user[email]
+                    if username is not None:
+                        self._username_to_phid[username] = (phid, expiry)
+            self._save()
+
+        results = []
+        for email in emails:
+            username, phid, _ = email_to_user[email]
+            results.append((username, phid) if username else None)
+        return results
+
+    def add_hint(self, username):
+        """Register 'username' as a user we'll later query the PHID of.
+
+        :username: the string username of a Phabricator user
+        :returns: None
+
+        """
+        with self._lock:
+            self._hinted_usernames.add(username)
+
+    def add_hint_list(self, username_list):
+        """Register all 'username_list' as users we'll later query.
+
+        :username_list: a list of string usernames of Phabricator users
+        :returns: None
+
+        """
+        for username in username_list:
+            self.add_hint(username)
+
+    def get_phid(self, username):
+        """Return the string PHID for the specified 'username'.
+
+        Any hinted usernames which aren't remembered are queried at the same
+        time.  Raise ValueError if 'username' is not a Phabricator user.
+
+        :username: the string username of a Phabricator user
+        :returns: the string PHID of the user
+
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._username_to_phid.get(username)
+            if _is_fresh(entry, now):
+                return entry[0]
+            self._hinted_usernames.add(username)
+            missing = sorted(
+                u for u in self._hinted_usernames
+                if not _is_fresh(self._username_to_phid.get(u), now))
+            self._hinted_usernames = set()
+
+        users = phlcon_user.query_users_matching_usernames(
+            self._conduit, missing)
+        username_to_phid = {u.userName: u.phid for u in users}
+
+        if username_to_phid:
+            expiry = time.time() + self._positive_ttl
+            with self._lock:
+                for u, phid in username_to_phid.iteritems():
+                    self._username_to_phid[u] = (phid, expiry)
+            self._save()
+
+        if username not in username_to_phid:
+            raise ValueError("no such user: " + str(username))
+
+        return username_to_phid[username]
+
+    def _query_missing_emails(self, emails, max_in_flight):
+        # user.query doesn't say which email each user matched, one query is
+        # enough to tell if none of them are users though.  That's common
+        # when retrying branches by unknown authors.
+        matching = phlcon_user.query_users_matching_emails(
+            self._conduit, emails)
+        if not matching:
+            return [None] * len(emails)
+        if len(emails) == 1:
+            return matching
+        return phlcon_user.query_user_responses_from_emails(
+            self._conduit, emails, max_in_flight)
+
+    def load_dict(self, data):
+        """Load the remembered users from 'data', adding to existing ones.
+
+        :data: a dict as returned by 'dump_dict'
+        :returns: None
+
+        """
+        if data.get('version') != _FORMAT_VERSION:
+            return
+
+        now = time.time()
+        with self._lock:
+            for email, user in data['emails'].iteritems():
+                if _is_fresh(user, now):
+                    self._email_to_user[email] = tuple(user)
+            for username, phid in data['usernames'].iteritems():
+                if _is_fresh(phid, now):
+                    self._username_to_phid[username] = tuple(phid)
+
+    def dump_dict(self):
+        """Return a dict of the remembered users which can be made into JSON.
+
+        Note that expired entries are forgotten rather than returned.
+
+        :returns: a dict
+
+        """
+        now = time.time()
+        with self._lock:
+            self._email_to_user = {
+                e: u for e, u in self._email_to_user.iteritems()
+                if _is_fresh(u, now)
+            }
+            self._username_to_phid = {
+                u: p for u, p in self._username_to_phid.iteritems()
+                if _is_fresh(p, now)
+            }
+            return {
+                'version': _FORMAT_VERSION,
+                'emails': dict(self._email_to_user),
+                'usernames': dict(self._username_to_phid),
+            }
+
+    def _load(self):
+        with open(self._path) as f:
+            try:
+                data = json.load(f)
+            except ValueError:
+                # the file is corrupt, start afresh
+                return
+        self.load_dict(data)
+
+    def _save(self):
+        if self._path is None:
+            return
+
+        text = json.dumps(self.dump_dict(), sort_keys=True, indent=0)
+
+        try:
+            dirname = os.path.dirname(os.path.abspath(self._path))
+            if not os.path.isdir(dirname):
+                os.makedirs(dirname)
+            with phlsys_fs.write_file_atomic_context(self._path) as f:
+                f.write(text)
+        except (OSError, IOError):
+            # the home directory may be read-only or missing, e.g. in CI,
+            # carry on without saving rather than failing the caller
+            pass
+
+
+def make_default_path(conduit_uri):
+    """Return the default path to persist the directory for 'conduit_uri'.
+
+    :conduit_uri: the string uri of the Phabricator instance
+    :returns: a string path in the user's home directory
+
+    """
+    return os.path.join(
+        os.path.expanduser('~'),
+        '.phabricator-tools',
+        'userdirectory',
+        urllib.quote(conduit_uri, safe='') + '.json')
+
+
+def _is_fresh(entry, now):
+    # entries are tuples with the expiry time last
+    return entry is not None and entry[-1] > now
+
+
+#------------------------------------------------------------------------------
+# Copyright (C) 2013-2014 Bloomberg Finance L.P.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to
+# deal in the Software without restriction, including without limitation the
+# rights to use, copy, modify, merge, publish, distribute, sublicense, and/or
+# sell copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.  IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+# IN THE SOFTWARE.
+#------------------------------- END-OF-FILE ----------------------------------
@@ -0,0 +1,202 @@
+"""Test suite for phlcon_userdirectory."""
+#==============================================================================
+#                                   TEST PLAN
+#------------------------------------------------------------------------------
+# Here we detail the things we are concerned to test and specify which tests
+# cover those concerns.
+#
+# Concerns:
+# [ A] users are looked up by email and remembered
+# [ A] emails which aren't users are remembered as such
+# [ A] lookups of unremembered emails are batched into one query
+# [ B] negative and positive entries expire after their separate ttls
+# [ C] the directory is persisted to and restored from a file
+# [ C] a corrupt file is ignored
+# [ C] failing to save the file is ignored
+# [ D] phids are looked up by username, hinted usernames in the same query
+# [ D] emails looked up before are used to find phids by username
+# [ D] looking up an unknown username raises ValueError
+#------------------------------------------------------------------------------
+# Tests:
+# [ A] test_A_Breathing
+# [ B] test_B_Ttls
+# [ C] test_C_Persistence
+# [ D] test_D_Usernames
+#==============================================================================
+
+from __future__ import absolute_import
+
+import os
+import unittest
+
+import phlsys_fs
+
+import phlcon_userdirectory
+
+
+class _FakeUserConduit(object):
+
+    def __init__(self, email_to_username):
+        super(_FakeUserConduit, self).__init__()
+        self.calls = []
+        self._email_to_username = email_to_username
+
+    def call(self, method, param_dict):
+        assert method == "user.query"
+        self.calls.append(param_dict)
+        if "emails" in param_dict:
+            usernames = [
+                self._email_to_username[e]
+                for e in param_dict["emails"]
+                if e in self._email_to_username
+            ]
+        else:
+            usernames = [
+                u for u in param_dict["usernames"]
+                if u in self._email_to_username.values()
+            ]
+        return [_make_user(u) for u in usernames]
+
+
+def _make_user(username):
+    return {
+        "phid": "PHID-" + username,
+        "userName": username,
+        "realName": username,
+        "image": None,
+        "uri": None,
+        "roles": [],
+    }
+
+
+class Test(unittest.TestCase):
+
+    def setUp(self):
+        self.conduit = _FakeUserConduit({
+            "alice@server.test": "alice",
+            "bob@server.test": "bob",
+        })
+
+    def test_A_Breathing(self):
+        directory = phlcon_userdirectory.UserDirectory(self.conduit)
+
+        # [ A] users are looked up by email and remembered
+        self.assertEqual(
+            directory.query_user_from_email("alice@server.test"),
+            ("alice", "PHID-alice"))
+        self.assertEqual(len(self.conduit.calls), 1)
+        directory.query_user_from_email("alice@server.test")
+        self.assertEqual(len(self.conduit.calls), 1)
+
+        # [ A] emails which aren't users are remembered as such
+        self.assertIsNone(directory.query_user_from_email("x@server.test"))
+        self.assertEqual(len(self.conduit.calls), 2)
+        self.assertIsNone(directory.query_user_from_email("x@server.test"))
+        self.assertEqual(len(self.conduit.calls), 2)
+
+        # [ A] lookups of unremembered emails are batched into one query
+        emails = ["y@server.test", "alice@server.test", "z@server.test"]
+        self.assertEqual(
+            directory.query_users_from_emails(emails),
+            [None, ("alice", "PHID-alice"), None])
+        self.assertEqual(len(self.conduit.calls), 3)
+        self.assertEqual(
+            self.conduit.calls[-1]["emails"],
+            ["y@server.test", "z@server.test"])
+
+    def test_B_Ttls(self):
+        # [ B] negative and positive entries expire after their separate ttls
+        directory = phlcon_userdirectory.UserDirectory(
+            self.conduit, positive_ttl=1000, negative_ttl=0)
+        emails = ["alice@server.test", "x@server.test"]
+        directory.query_users_from_emails(emails)
+        num_calls = len(self.conduit.calls)
+        self.assertEqual(
+            directory.query_users_from_emails(emails),
+            [("alice", "PHID-alice"), None])
+        self.assertEqual(len(self.conduit.calls), num_calls + 1)
+        self.assertEqual(self.conduit.calls[-1]["emails"], ["x@server.test"])
+
+        directory = phlcon_userdirectory.UserDirectory(
+            self.conduit, positive_ttl=0, negative_ttl=1000)
+        directory.query_users_from_emails(emails)
+        directory.query_users_from_emails(emails)
+        self.assertEqual(
+            self.conduit.calls[-1]["emails"], ["alice@server.test"])
+
+    def test_C_Persistence(self):
+        with phlsys_fs.tmpdir_context() as tmp_dir:
+            path = os.path.join(tmp_dir, 'dir', 'users.json')
+
+            # [ C] the directory is persisted to and restored from a file
+            directory = phlcon_userdirectory.UserDirectory(self.conduit, path)
+            directory.query_users_from_emails(
+                ["alice@server.test", "x@server.test"])
+            num_calls = len(self.conduit.calls)
+
+            directory = phlcon_userdirectory.UserDirectory(self.conduit, path)
+            self.assertEqual(
+                directory.query_users_from_emails(
+                    ["alice@server.test", "x@server.test"]),
+                [("alice", "PHID-alice"), None])
+            self.assertEqual(directory.get_phid("alice"), "PHID-alice")
+            self.assertEqual(len(self.conduit.calls), num_calls)
+
+            # [ C] a corrupt file is ignored
+            with open(path, 'w') as f:
+                f.write('{')
+            directory = phlcon_userdirectory.UserDirectory(self.conduit, path)
+            directory.query_user_from_email("alice@server.test")
+            self.assertEqual(len(self.conduit.calls), num_calls + 1)
+
+            # [ C] failing to save the file is ignored
+            not_a_dir = os.path.join(tmp_dir, 'file')
+            with open(not_a_dir, 'w') as f:
+                f.write('')
+            directory = phlcon_userdirectory.UserDirectory(
+                self.conduit, os.path.join(not_a_dir, 'users.json'))
+            self.assertEqual(
+                directory.query_user_from_email("alice@server.test"),
+                ("alice", "PHID-alice"))
+
+    def test_D_Usernames(self):
+        directory = phlcon_userdirectory.UserDirectory(self.conduit)
+
+        # [ D] phids are looked up by username, hinted usernames in the same
+        #      query
+        directory.add_hint_list(["alice", "bob"])
+        self.assertEqual(directory.get_phid("alice"), "PHID-alice")
+        self.assertEqual(directory.get_phid("bob"), "PHID-bob")
+        self.assertEqual(len(self.conduit.calls), 1)
+
+        # [ D] emails looked up before are used to find phids by username
+        directory = phlcon_userdirectory.UserDirectory(self.conduit)
+        directory.query_user_from_email("bob@server.test")
+        self.assertEqual(directory.get_phid("bob"), "PHID-bob")
+        self.assertEqual(len(self.conduit.calls), 2)
+
+        # [ D] looking up an unknown username raises ValueError
+        self.assertRaises(ValueError, directory.get_phid, "nobody")
+
+
+#------------------------------------------------------------------------------
+# Copyright (C) 2013-2014 Bloomberg Finance L.P.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to
+# deal in the Software without restriction, including without limitation the
+# rights to use, copy, modify, merge, publish, distribute, sublicense, and/or
+# sell copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.  IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+# IN THE SOFTWARE.
+#------------------------------- END-OF-FILE ----------------------------------
@@ -7,22 +7,39 @@
 # Public Functions:
 #   raw_diff_range_to_here
 #   raw_diff_range
+#   raw_numstat_range
+#   parse_numstat_z
 #   parse_filenames_from_raw_diff
 #
+# Public Assignments:
+#   FileStat
+#
 # -----------------------------------------------------------------------------
 # (this contents block is generated, edits will be lost)
 # =============================================================================
 
 from __future__ import absolute_import
 
+import collections
 import re
 
+"""NamedTuple to represent the changes to a file in a diff.
+
+:added: the number of lines added, None if binary
+:deleted: the number of lines deleted, None if binary
+:paths: tuple of the paths involved, (old, new) for renames, otherwise (path,)
+
+"""
+FileStat = collections.namedtuple(
+    "phlgit_diff__FileStat", ['added', 'deleted', 'paths'])
+
 
 def raw_diff_range_to_here(clone, start):
     return clone.call("diff", start + "...", "-M")
 
 
-def raw_diff_range(clone, base, new, context_lines=None):
+def raw_diff_range(
+        clone, base, new, context_lines=None, max_bytes=None, pathspecs=None):
     """Return a raw diff from the history on 'new' that is not on 'base'.
 
     Note that commits that are cherry-picked from new to old will still appear
@@ -30,9 +47,16 @@ def raw_diff_range(clone, base, new, context_lines=None):
 
     Raise if git returns a non-zero exit code.
 
+    If 'max_bytes' is supplied then raise
+    'phlsys_subprocess.OutputLimitExceededError' as soon as the diff is found
+    to be larger, without generating the rest of it.
+
     :clone: the clone to operate on
     :base: the base branch
     :new: the branch with new commits
+    :context_lines: (optional) integer amount of surrounding context
+    :max_bytes: (optional) integer maximum size of the diff
+    :pathspecs: (optional) list of string pathspecs to limit the diff to
     :returns: a string of the raw diff
 
     """
@@ -42,13 +66,75 @@ def raw_diff_range(clone, base, new, context_lines=None):
         "-M",  # automatically detect moves/renames
     ]
 
-    if context_lines:
+    if context_lines is not None:
         args.append("--unified=" + str(context_lines))
 
-    result = clone.call(*args)
+    if pathspecs:
+        args.append("--")
+        args.extend(pathspecs)
+
+    if max_bytes is None:
+        result = clone.call(*args)
+    else:
+        result = clone.call(*args, max_stdout_bytes=max_bytes)
     return result
 
 
+def raw_numstat_range(clone, base, new):
+    """Return the raw 'git diff --numstat -z' of the history on 'new'.
+
+    The files are the same as those in 'raw_diff_range', including detected
+    moves and renames.  Use 'parse_numstat_z' to interpret the output.
+
+    Note that '-z' is used so that paths are not quoted and renames are
+    unambiguous.
+
+    :clone: the clone to operate on
+    :base: the base branch
+    :new: the branch with new commits
+    :returns: a string of the raw numstat output
+
+    """
+    return clone.call("diff", base + "..." + new, "-M", "--numstat", "-z")
+
+
+def parse_numstat_z(output):
+    """Return a list of 'FileStat' from 'git diff --numstat -z' output.
+
+    Usage examples:
+
+        >>> parse_numstat_z('1\\t2\\ta\\0-\\t-\\tb\\0')
+        ... # doctest: +NORMALIZE_WHITESPACE
+        [phlgit_diff__FileStat(added=1, deleted=2, paths=('a',)),
+         phlgit_diff__FileStat(added=None, deleted=None, paths=('b',))]
+
+        >>> parse_numstat_z('0\\t0\\t\\0old\\0new\\0')
+        [phlgit_diff__FileStat(added=0, deleted=0, paths=('old', 'new'))]
+
+    :output: the string output from git
+    :returns: a list of 'phlgit_diff__FileStat'
+
+    """
+    def to_int_or_none(count):
+        return None if count == '-' else int(count)
+
+    stats = []
+    fields = output.split('\0')
+    i = 0
+    while i < len(fields) and fields[i]:
+        added, deleted, path = fields[i].split('\t', 2)
+        i += 1
+        if path:
+            paths = (path,)
+        else:
+            # renames have an empty path, followed by the old and new paths
+            paths = (fields[i], fields[i + 1])
+            i += 2
+        stats.append(
+            FileStat(to_int_or_none(added), to_int_or_none(deleted), paths))
+    return stats
+
+
 def parse_filenames_from_raw_diff(diff):
     matches = re.findall(
         "^diff --git a/(.*) b/(.*)$",
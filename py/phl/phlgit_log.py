@@ -15,6 +15,7 @@
 #   make_revision_from_hash
 #   make_revisions_from_hashes
 #   get_author_names_emails_from_hashes
+#   get_author_names_emails_from_revisions
 #   get_range_to_here_raw_body
 #
 # Public Assignments:
@@ -50,6 +51,9 @@ Revision = collections.namedtuple(
         'message'
     ])
 
+# the format expected by 'make_revision_from_full_message'
+_FULL_MESSAGE_FORMAT = "%H%n%h%n%ae%n%an%n%ce%n%cn%n%s%n%b"
+
 
 def get_range_to_here_hashes(clone, start):
     """Return a list of strings corresponding to commits from 'start' to here.
@@ -185,8 +189,8 @@ def make_revision_from_hash(clone, commitHash):
     :returns: a 'phlgit_log__Revision' based on the 'commitHash'
 
     """
-    fmt = "%H%n%h%n%ae%n%an%n%ce%n%cn%n%s%n%b"
-    fullMessage = clone.call("log", commitHash + "^!", "--format=" + fmt)
+    fullMessage = clone.call(
+        "log", commitHash + "^!", "--format=" + _FULL_MESSAGE_FORMAT)
     revision = make_revision_from_full_message(fullMessage)
     return revision
 
@@ -197,11 +201,40 @@ def make_revisions_from_hashes(clone, hashes):
     Raise an exception if the clone does not return a valid FullMessage
     from any of 'hashes'.
 
+    All the revisions are retrieved with a single call to 'git log', the
+    result is the same as calling 'make_revision_from_hash' for each hash.
+
     :clone: something that supports "call()" with git commands
     :returns: a list of 'phlgit_log__Revision'
 
     """
-    revisions = [make_revision_from_hash(clone, h) for h in hashes]
+    if not hashes:
+        return []
+
+    # N.B. prefix each record with a NUL so that we can reliably split them,
+    #      git will never output a NUL as part of a commit message.  Each
+    #      record is then exactly the output of 'git log <hash>^!'.
+    output = clone.call(
+        "log",
+        "--no-walk=unsorted",
+        "--stdin",
+        "--format=%x00" + _FULL_MESSAGE_FORMAT,
+        stdin="\n".join(hashes) + "\n")
+    records = output.split("\0")[1:]
+
+    hash_to_revision = {}
+    for r in records:
+        revision = make_revision_from_full_message(r)
+        hash_to_revision[revision.hash] = revision
+
+    # git won't repeat duplicate hashes and may be given abbreviated hashes,
+    # fall back to looking up any that we can't match
+    revisions = []
+    for h in hashes:
+        revision = hash_to_revision.get(h)
+        if revision is None:
+            revision = make_revision_from_hash(clone, h)
+        revisions.append(revision)
     return revisions
 
 
@@ -222,6 +255,21 @@ def get_author_names_emails_from_hashes(clone, hashes):
 
     """
     revisions = make_revisions_from_hashes(clone, hashes)
+    return get_author_names_emails_from_revisions(revisions)
+
+
+def get_author_names_emails_from_revisions(revisions):
+    """Return list of (name, email) of the authors in 'revisions'.
+
+    Authors will only appear in the list once, at their earliest appearance.
+    The email address is considered as the unique key for each author, so
+    someone appearing multiple times with different names but the same email
+    will only appear once in the list.
+
+    :revisions: a list of 'phlgit_log__Revision'
+    :returns: a list of unique (name, email) in the order of 'revisions'
+
+    """
     observedEmails = set()
     uniqueAuthors = []
     for r in revisions:
@@ -6,10 +6,12 @@
 # cover those concerns.
 #
 # Concerns:
-# TODO
+# [ A] make_revisions_from_hashes returns the same revisions, in the same
+#      order, as calling make_revision_from_hash for each hash
+# [ A] make_revisions_from_hashes raises if a hash is invalid
 #------------------------------------------------------------------------------
 # Tests:
-# TODO
+# [ A] testBatchedRevisionsSameAsSingle
 #==============================================================================
 
 from __future__ import absolute_import
@@ -128,6 +130,32 @@ class Test(unittest.TestCase):
         self.assertEqual(len(committers), 1)
         self.assertEqual(committers[0], (self.authorName, self.authorEmail))
 
+    def testBatchedRevisionsSameAsSingle(self):
+        self._createCommitNewFile("README")
+        self._createCommitNewFile("ONE", "ONE", "BODY\n\nMORE BODY\n\n")
+        self._createCommitNewFile("TWO", "TWO")
+        self._createCommitNewFile("THREE", "THREE", "  indented\n\ttabbed")
+        self.clone.call("commit", "--allow-empty", "-m", "empty")
+
+        hashes = phlgit_log.get_last_n_commit_hashes(self.clone, 5)
+
+        # include a duplicate and an out-of-date-order hash to check ordering
+        hashes = [hashes[3], hashes[0]] + hashes + [hashes[1]]
+        expected = [
+            phlgit_log.make_revision_from_hash(self.clone, h) for h in hashes
+        ]
+        revisions = phlgit_log.make_revisions_from_hashes(self.clone, hashes)
+        self.assertListEqual(expected, revisions)
+
+        self.assertListEqual(
+            [], phlgit_log.make_revisions_from_hashes(self.clone, []))
+
+        self.assertRaises(
+            phlsys_subprocess.CalledProcessError,
+            phlgit_log.make_revisions_from_hashes,
+            self.clone,
+            ['0' * 40])
+
 
 #------------------------------------------------------------------------------
 # Copyright (C) 2013-2014 Bloomberg Finance L.P.
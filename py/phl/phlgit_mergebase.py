@@ -0,0 +1,53 @@
+"""Wrapper around 'git merge-base'."""
+# =============================================================================
+# CONTENTS
+# -----------------------------------------------------------------------------
+# phlgit_mergebase
+#
+# Public Functions:
+#   get_merge_base
+#
+# -----------------------------------------------------------------------------
+# (this contents block is generated, edits will be lost)
+# =============================================================================
+
+from __future__ import absolute_import
+
+
+def get_merge_base(clone, commit1, commit2):
+    """Return string of the best common ancestor of 'commit1' and 'commit2'.
+
+    This is the commit that 'git diff commit1...commit2' will diff against.
+
+    Raise if there is no common ancestor.
+
+    :clone: something that supports "call()" with git commands
+    :commit1: string name of the first commit
+    :commit2: string name of the second commit
+    :returns: string commit SHA1 of the merge base
+
+    """
+    return clone.call('merge-base', commit1, commit2).strip()
+
+
+#------------------------------------------------------------------------------
+# Copyright (C) 2013-2014 Bloomberg Finance L.P.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to
+# deal in the Software without restriction, including without limitation the
+# rights to use, copy, modify, merge, publish, distribute, sublicense, and/or
+# sell copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.  IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+# IN THE SOFTWARE.
+#------------------------------- END-OF-FILE ----------------------------------
@@ -13,6 +13,7 @@
 #    .get_user
 #    .conduit_uri
 #    .call
+#    .call_many
 #    .ping
 #
 # Public Functions:
@@ -21,6 +22,7 @@
 #   make_phab_test_conduit
 #
 # Public Assignments:
+#   DEFAULT_MAX_IN_FLIGHT
 #   SESSION_ERROR
 #
 # -----------------------------------------------------------------------------
@@ -33,14 +35,22 @@ import contextlib
 import hashlib
 import json
 import logging
+import multiprocessing.pool
+import sys
+import threading
 import time
 import urllib
-import urllib2
 import urlparse
 
 import phldef_conduit
+import phlsys_httpconnectionpool
 
 _URLLIB_TIMEOUT = 600
+DEFAULT_MAX_IN_FLIGHT = 4
+
+# connections are shared between all Conduits, so that re-connecting to the
+# same instance doesn't need a new handshake
+_CONNECTION_POOL = phlsys_httpconnectionpool.Pool(_URLLIB_TIMEOUT)
 
 # TODO: handle re-authentication when the token expires
 # TODO: allow connections without specifying user details where possible
@@ -158,6 +168,18 @@ class ConduitException(Exception):
 SESSION_ERROR = "ERR-INVALID-SESSION"
 
 
+def _get_environment_proxy_or_none(url):
+    # respect the same environment variables as 'urllib2.urlopen' does, e.g.
+    # 'https_proxy' and 'no_proxy'
+    split = urlparse.urlsplit(url)
+    # pylint: disable=E1101
+    proxy = urllib.getproxies().get(split.scheme.lower())
+    if proxy and urllib.proxy_bypass(split.hostname):
+        proxy = None
+    # pylint: enable=E1101
+    return proxy
+
+
 class Conduit(object):
 
     # TODO: make this configurable
@@ -170,9 +192,9 @@ class Conduit(object):
             certificate=None,
             actAsUser=None,
             http_proxy=None,
-            https_proxy=None):
+            https_proxy=None,
+            connection_pool=None):
         self._conduit_uri = conduitUri
-        self._act_as_user = actAsUser
         self._timeout = 5
         self._username = user
         self._certificate = certificate
@@ -180,21 +202,31 @@ class Conduit(object):
         self._client_version = 1
         self._http_proxy = http_proxy
         self._https_proxy = https_proxy
+        self._connection_pool = connection_pool
+        if self._connection_pool is None:
+            self._connection_pool = _CONNECTION_POOL
+
+        # serialise re-authentication when calls are made concurrently
+        self._authenticate_lock = threading.Lock()
+
+        # the user to act as is per-thread, so that threads sharing this
+        # conduit may each impersonate a different user at the same time
+        self._default_act_as_user = actAsUser
+        self._thread_local = threading.local()
 
         self._conduit = {}
         if user and certificate:
             self._authenticate()
 
     def set_act_as_user(self,  user):
-        self._act_as_user = user
-        self._conduit["actAsUser"] = self._act_as_user
+        self._thread_local.act_as_user = user
 
     def clear_act_as_user(self):
-        self._act_as_user = None
-        del self._conduit["actAsUser"]
+        self._thread_local.act_as_user = None
 
     def get_act_as_user(self):
-        return self._act_as_user
+        return getattr(
+            self._thread_local, 'act_as_user', self._default_act_as_user)
 
     def get_user(self):
         return self._username
@@ -222,16 +254,13 @@ class Conduit(object):
                 result=result,
                 obj=message_dict,
                 uri=self._conduit_uri,
-                actAsUser=self._act_as_user)
+                actAsUser=self.get_act_as_user())
 
         self._conduit = {
             'sessionKey': result["sessionKey"],
             'connectionID': result["connectionID"],
         }
 
-        if self._act_as_user:
-            self._conduit["actAsUser"] = self._act_as_user
-
     def _authenticate_make_message(self):
         token = str(int(time.time()))
         # pylint: disable=E1101
@@ -258,24 +287,74 @@ class Conduit(object):
         })
 
         if self._https_proxy or self._http_proxy:
-            proxy = {}
-            if self._https_proxy:
-                proxy['https'] = self._https_proxy
-            if self._http_proxy:
-                proxy['http'] = self._http_proxy
-            proxy_handler = urllib2.ProxyHandler(proxy)
-            opener = urllib2.build_opener(proxy_handler)
-            data = opener.open(path, body, _URLLIB_TIMEOUT).read()
+            if urlparse.urlsplit(path).scheme.lower() == 'https':
+                proxy = self._https_proxy
+            else:
+                proxy = self._http_proxy
         else:
-            data = urllib2.urlopen(path, body, _URLLIB_TIMEOUT).read()
+            proxy = _get_environment_proxy_or_none(path)
+
+        data = self._connection_pool.post(path, body, proxy=proxy)
 
         return json.loads(data)
 
     def call(self, method, param_dict_in=None):
+        return self._call_as(method, param_dict_in, self.get_act_as_user())
+
+    def call_many(self, calls, max_in_flight=DEFAULT_MAX_IN_FLIGHT):
+        """Return a list of the results of the supplied 'calls', in order.
+
+        Up to 'max_in_flight' of the calls are made concurrently.  Each call
+        is made as the user that is being impersonated when 'call_many' is
+        invoked, unless the call specifies a user of its own.
+
+        If any of the calls raise then the exception of the first of those is
+        raised, after all of the calls have finished.
+
+        :calls: a list of (method, param_dict) or
+                (method, param_dict, act_as_user) tuples
+        :max_in_flight: the maximum number of calls to make at the same time
+        :returns: a list of the results of the calls
+
+        """
+        act_as_user = self.get_act_as_user()
+
+        def call_as(call):
+            method, param_dict = call[0], call[1]
+            user = call[2] if len(call) > 2 else act_as_user
+            try:
+                return self._call_as(method, param_dict, user), None
+            except Exception:
+                return None, sys.exc_info()
+
+        calls = list(calls)
+        if max_in_flight <= 1 or len(calls) <= 1:
+            outcomes = [call_as(c) for c in calls]
+        else:
+            pool = multiprocessing.pool.ThreadPool(
+                min(max_in_flight, len(calls)))
+            try:
+                outcomes = pool.map(call_as, calls, chunksize=1)
+            finally:
+                pool.close()
+                pool.join()
+
+        results = []
+        for result, exc_info in outcomes:
+            if exc_info is not None:
+                raise exc_info[0], exc_info[1], exc_info[2]
+            results.append(result)
+        return results
+
+    def _call_as(self, method, param_dict_in, act_as_user):
         attempts = 3
         for x in range(attempts):
+            session = dict(self._conduit)
+            if act_as_user:
+                session["actAsUser"] = act_as_user
+
             param_dict = dict(param_dict_in) if param_dict_in else {}
-            param_dict["__conduit__"] = self._conduit
+            param_dict["__conduit__"] = session
             response = self._communicate(method, param_dict)
 
             error = response["error_code"]
@@ -288,7 +367,7 @@ class Conduit(object):
                 if error == SESSION_ERROR:
                     logging.warning(
                         "phlsys_conduit: SESSION-ERROR (try {0})".format(x))
-                    self._authenticate()
+                    self._reauthenticate(session)
                 else:
                     raise ConduitException(
                         method=method,
@@ -297,7 +376,7 @@ class Conduit(object):
                         result=result,
                         obj=param_dict,
                         uri=self._conduit_uri,
-                        actAsUser=self._act_as_user)
+                        actAsUser=act_as_user)
 
         if error:
             raise ConduitException(
@@ -307,10 +386,17 @@ class Conduit(object):
                 result=result,
                 obj=param_dict,
                 uri=self._conduit_uri,
-                actAsUser=self._act_as_user)
+                actAsUser=act_as_user)
 
         return result
 
+    def _reauthenticate(self, stale_session):
+        with self._authenticate_lock:
+            # another call may have already replaced the stale session
+            session_key = self._conduit.get("sessionKey")
+            if session_key == stale_session.get("sessionKey"):
+                self._authenticate()
+
     def ping(self):
         return self.call("conduit.ping")
 
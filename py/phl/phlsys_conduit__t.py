@@ -14,6 +14,7 @@
 
 from __future__ import absolute_import
 
+import threading
 import unittest
 
 import phldef_conduit
@@ -54,6 +55,41 @@ class Test(unittest.TestCase):
         with phlsys_conduit.act_as_user_context(conduit, test_data.ALICE.user):
             conduit.call("differential.query")
 
+    def test_can_call_many(self):
+        test_data = phldef_conduit
+        conduit = phlsys_conduit.Conduit(
+            test_data.TEST_URI,
+            test_data.PHAB.user,
+            test_data.PHAB.certificate)
+        calls = [
+            ("user.whoami", None, test_data.ALICE.user),
+            ("user.whoami", None),
+            ("user.whoami", None, test_data.BOB.user),
+        ]
+        results = conduit.call_many(calls, max_in_flight=3)
+        self.assertListEqual(
+            [r["userName"] for r in results],
+            [test_data.ALICE.user, test_data.PHAB.user, test_data.BOB.user])
+        self.assertIsNone(conduit.get_act_as_user())
+
+    def test_act_as_user_is_per_thread(self):
+        conduit = phlsys_conduit.Conduit(phldef_conduit.TEST_URI)
+        other_thread_users = []
+
+        def other_thread():
+            other_thread_users.append(conduit.get_act_as_user())
+            with phlsys_conduit.act_as_user_context(conduit, 'bob'):
+                other_thread_users.append(conduit.get_act_as_user())
+
+        with phlsys_conduit.act_as_user_context(conduit, 'alice'):
+            thread = threading.Thread(target=other_thread)
+            thread.start()
+            thread.join()
+            self.assertEqual(conduit.get_act_as_user(), 'alice')
+
+        self.assertIsNone(conduit.get_act_as_user())
+        self.assertListEqual(other_thread_users, [None, 'bob'])
+
     def test_raises_on_non_auth(self):
         test_data = phldef_conduit
         self.assertRaises(
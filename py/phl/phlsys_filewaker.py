@@ -0,0 +1,219 @@
+"""Wait for files to be created or removed, without polling where possible.
+
+On Linux the directories containing the files are watched with inotify, so
+waiting costs nothing until something happens.  Elsewhere, or if inotify
+isn't available, the files are polled instead.
+
+Usage example:
+
+    >>> waker = FileWaker(['/tmp/phlsys_filewaker_example'])
+    >>> waker.wait(0)
+    False
+    >>> waker.close()
+
+"""
+# =============================================================================
+# CONTENTS
+# -----------------------------------------------------------------------------
+# phlsys_filewaker
+#
+# Public Classes:
+#   FileWaker
+#    .wait
+#    .close
+#
+# -----------------------------------------------------------------------------
+# (this contents block is generated, edits will be lost)
+# =============================================================================
+
+from __future__ import absolute_import
+
+import ctypes
+import ctypes.util
+import errno
+import os
+import select
+import struct
+import time
+
+_DEFAULT_POLL_INTERVAL = 1
+
+_IN_NONBLOCK = os.O_NONBLOCK
+_IN_CLOEXEC = 0o2000000
+
+_IN_ATTRIB = 0x00000004
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_IN_Q_OVERFLOW = 0x00004000
+
+_WATCH_MASK = (
+    _IN_ATTRIB | _IN_CLOSE_WRITE | _IN_MOVED_FROM | _IN_MOVED_TO |
+    _IN_CREATE | _IN_DELETE)
+
+# struct inotify_event { int wd; uint32_t mask, cookie, len; char name[]; }
+_EVENT_HEADER = struct.Struct('iIII')
+
+_READ_SIZE = 64 * 1024
+
+
+class FileWaker(object):
+
+    def __init__(self, paths, poll_interval=_DEFAULT_POLL_INTERVAL):
+        """Initialise to watch the supplied 'paths', which needn't exist.
+
+        :paths: a list of string paths to files
+        :poll_interval: seconds between checks if inotify isn't available
+        :returns: None
+
+        """
+        super(FileWaker, self).__init__()
+        self._paths = [os.path.abspath(p) for p in paths]
+        self._poll_interval = poll_interval
+        self._wd_to_dir = {}
+        self._fd = _inotify_init_or_none()
+        if self._fd is not None and not self._add_watches():
+            self.close()
+
+    def wait(self, timeout=None):
+        """Return True if any of the files may have changed, within 'timeout'.
+
+        Note that True may be returned when nothing has actually changed,
+        callers should check the files themselves.  It's returned early if a
+        signal interrupts the wait, e.g. SIGTERM.
+
+        :timeout: the maximum number of seconds to wait, None for no limit
+        :returns: False if 'timeout' passed without any changes, else True
+
+        """
+        if self._fd is None:
+            return self._poll(timeout)
+
+        try:
+            readable, _, _ = select.select([self._fd], [], [], timeout)
+        except select.error as e:
+            if e.args[0] != errno.EINTR:
+                raise
+            return True
+
+        if not readable:
+            return False
+        return self._read_events()
+
+    def close(self):
+        """Stop watching the files, subsequent waits will poll.
+
+        :returns: None
+
+        """
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+            self._wd_to_dir = {}
+
+    def _add_watches(self):
+        add_watch = _LIBC.inotify_add_watch
+        for directory in set(os.path.dirname(p) for p in self._paths):
+            wd = add_watch(self._fd, directory, _WATCH_MASK)
+            if wd < 0:
+                # the directory may not exist yet, poll instead
+                return False
+            self._wd_to_dir[wd] = directory
+        return True
+
+    def _read_events(self):
+        try:
+            data = os.read(self._fd, _READ_SIZE)
+        except OSError as e:
+            if e.errno not in (errno.EAGAIN, errno.EINTR):
+                raise
+            return False
+
+        # ignore changes to other files in the same directories, e.g. the
+        # status file, otherwise they would wake us continually
+        offset = 0
+        while offset + _EVENT_HEADER.size <= len(data):
+            wd, mask, _, length = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            name = data[offset:offset + length].rstrip('\0')
+            offset += length
+            if mask & _IN_Q_OVERFLOW:
+                return True
+            directory = self._wd_to_dir.get(wd)
+            if directory is not None:
+                if os.path.join(directory, name) in self._paths:
+                    return True
+        return False
+
+    def _poll(self, timeout):
+        start = time.time()
+        old_state = self._get_state()
+        while True:
+            remaining = None
+            if timeout is not None:
+                remaining = timeout - (time.time() - start)
+                if remaining <= 0:
+                    return False
+            interval = self._poll_interval
+            if remaining is not None:
+                interval = min(interval, remaining)
+            time.sleep(interval)
+            if self._get_state() != old_state:
+                return True
+
+    def _get_state(self):
+        state = []
+        for path in self._paths:
+            try:
+                state.append(os.stat(path).st_mtime)
+            except OSError:
+                state.append(None)
+        return state
+
+
+def _load_libc_or_none():
+    try:
+        libc = ctypes.CDLL(
+            ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+    except OSError:
+        return None
+    if not hasattr(libc, 'inotify_init1'):
+        return None
+    return libc
+
+
+_LIBC = _load_libc_or_none()
+
+
+def _inotify_init_or_none():
+    if _LIBC is None:
+        return None
+    fd = _LIBC.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+    if fd < 0:
+        return None
+    return fd
+
+
+#------------------------------------------------------------------------------
+# Copyright (C) 2013-2014 Bloomberg Finance L.P.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to
+# deal in the Software without restriction, including without limitation the
+# rights to use, copy, modify, merge, publish, distribute, sublicense, and/or
+# sell copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.  IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+# IN THE SOFTWARE.
+#------------------------------- END-OF-FILE ----------------------------------
@@ -0,0 +1,109 @@
+"""Test suite for phlsys_filewaker."""
+#==============================================================================
+#                                   TEST PLAN
+#------------------------------------------------------------------------------
+# Here we detail the things we are concerned to test and specify which tests
+# cover those concerns.
+#
+# Concerns:
+# [ A] waiting returns False if nothing happens before the timeout
+# [ A] creating and removing a watched file ends the wait early
+# [ B] the same is true when polling instead of using inotify
+# [ C] changes to other files in the same directory don't end the wait
+#------------------------------------------------------------------------------
+# Tests:
+# [ A] test_A_Breathing
+# [ B] test_B_Polling
+# [ C] test_C_IgnoreOtherFiles
+#==============================================================================
+
+from __future__ import absolute_import
+
+import contextlib
+import os
+import threading
+import time
+import unittest
+
+import phlsys_fs
+
+import phlsys_filewaker
+
+
+@contextlib.contextmanager
+def _after_delay_context(func):
+    timer = threading.Timer(0.1, func)
+    timer.start()
+    try:
+        yield
+    finally:
+        timer.join()
+
+
+def _touch(path):
+    with open(path, 'w'):
+        pass
+
+
+class Test(unittest.TestCase):
+
+    def _check_create_and_remove(self, waker, path):
+        self.assertFalse(waker.wait(0.05))
+
+        start = time.time()
+        with _after_delay_context(lambda: _touch(path)):
+            self.assertTrue(waker.wait(10))
+        self.assertLess(time.time() - start, 5)
+
+        start = time.time()
+        with _after_delay_context(lambda: os.remove(path)):
+            self.assertTrue(waker.wait(10))
+        self.assertLess(time.time() - start, 5)
+
+    def test_A_Breathing(self):
+        with phlsys_fs.chtmpdir_context():
+            waker = phlsys_filewaker.FileWaker(['wake'])
+            try:
+                self._check_create_and_remove(waker, 'wake')
+            finally:
+                waker.close()
+
+    def test_B_Polling(self):
+        with phlsys_fs.chtmpdir_context():
+            waker = phlsys_filewaker.FileWaker(['wake'], poll_interval=0.05)
+
+            # closing the waker makes it fall back to polling
+            waker.close()
+            self._check_create_and_remove(waker, 'wake')
+
+    def test_C_IgnoreOtherFiles(self):
+        with phlsys_fs.chtmpdir_context():
+            waker = phlsys_filewaker.FileWaker(['wake'])
+            try:
+                _touch('other')
+                self.assertFalse(waker.wait(0.05))
+            finally:
+                waker.close()
+
+
+#------------------------------------------------------------------------------
+# Copyright (C) 2013-2014 Bloomberg Finance L.P.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to
+# deal in the Software without restriction, including without limitation the
+# rights to use, copy, modify, merge, publish, distribute, sublicense, and/or
+# sell copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.  IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+# IN THE SOFTWARE.
+#------------------------------- END-OF-FILE ----------------------------------
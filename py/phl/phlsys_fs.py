@@ -7,6 +7,7 @@
 # Public Functions:
 #   read_file_lock_context
 #   write_file_lock_context
+#   write_file_atomic_context
 #   chdir_context
 #   tmpfile
 #   tmpdir_context
@@ -23,6 +24,7 @@ import contextlib
 import fcntl
 import os
 import shutil
+import stat
 import sys
 import tempfile
 
@@ -86,6 +88,46 @@ def write_file_lock_context(filename):
             fcntl.flock(file_object, fcntl.LOCK_UN)
 
 
+@contextlib.contextmanager
+def write_file_atomic_context(filename):
+    """Open a temporary file for write, rename it to 'filename' when expired.
+
+    Readers of 'filename' will see either the old contents or the new contents
+    in full, never a partially written file.  If an exception is raised then
+    'filename' is left untouched.
+
+    The new file has the same permissions as the file it replaces, or 0644 if
+    there wasn't one.
+
+    Usage example:
+
+        >>> with chtmpdir_context():
+        ...     with write_file_atomic_context('testfile') as f:
+        ...         f.write('hello')
+        ...     with open('testfile') as f:
+        ...         print f.read()
+        hello
+
+    """
+    dirname, basename = os.path.split(os.path.abspath(filename))
+    try:
+        mode = stat.S_IMODE(os.stat(filename).st_mode)
+    except OSError:
+        mode = 0o644
+    file_object = tempfile.NamedTemporaryFile(
+        'w', dir=dirname, prefix='.' + basename + '.', delete=False)
+    try:
+        os.chmod(file_object.name, mode)
+        with file_object:
+            yield file_object
+            file_object.flush()
+            os.fsync(file_object.fileno())
+        os.rename(file_object.name, filename)
+    except BaseException:
+        os.remove(file_object.name)
+        raise
+
+
 @contextlib.contextmanager
 def chdir_context(new_path):
     """Change directory to the supplied 'new_path', change back when expired.
@@ -8,6 +8,9 @@
 #   GitClone
 #    .call
 #    .working_dir
+#   BatchGitClone
+#    .call
+#    .close
 #
 # Public Functions:
 #   tmprepo_context
@@ -20,10 +23,19 @@ from __future__ import absolute_import
 
 import contextlib
 import os
+import string
+import subprocess
+import threading
 
 import phlsys_fs
 import phlsys_subprocess
 
+_CAT_FILE_OPTIONS = ['-p', '-t', '-s', '-e']
+_REV_PARSE_OPTIONS = ['--revs-only', '--verify']
+
+# rev-parse can expand these to more than one revision, cat-file can't help
+_MULTI_REVISION_MARKERS = ['..', '^!', '^@', '^-']
+
 
 @contextlib.contextmanager
 def tmprepo_context():
@@ -52,11 +64,28 @@ class GitClone(object):
 
     # def call(*args, stdin=None): <-- supported in Python 3
     def call(self, *args, **kwargs):
+        """Return the stdout from running git with 'args' in the clone.
+
+        Raise 'phlsys_subprocess.CalledProcessError' if git fails.
+
+        If 'max_stdout_bytes' is supplied then raise
+        'phlsys_subprocess.OutputLimitExceededError' as soon as git outputs
+        more than that, without reading the rest.
+
+        :*args: the string arguments to pass to git
+        :stdin: (optional) string to supply to git on stdin
+        :max_stdout_bytes: (optional) int maximum allowed size of the output
+        :returns: the string stdout from git
+
+        """
         stdin = kwargs.pop("stdin", None)
+        max_stdout_bytes = kwargs.pop("max_stdout_bytes", None)
         assert(not kwargs)
         result = phlsys_subprocess.run(
             'git', *args,
-            stdin=stdin, workingDir=self._workingDir)
+            stdin=stdin,
+            workingDir=self._workingDir,
+            maxStdoutBytes=max_stdout_bytes)
         return result.stdout
 
     @property
@@ -64,6 +93,257 @@ class GitClone(object):
         return self._workingDir
 
 
+class BatchGitClone(GitClone):
+
+    """A GitClone which answers common queries using long-lived git processes.
+
+    Object lookups like 'cat-file -p <object>', simple ref lookups like
+    'rev-parse <ref>' and single commit lookups like 'log <sha1>^! --format=..'
+    are answered by persistent 'git cat-file --batch', 'git cat-file
+    --batch-check' and 'git diff-tree --stdin' processes.  This saves starting
+    a new git process for each of them, which adds up when there are
+    thousands of them.
+
+    All other commands, and any lookups that fail, are passed through to
+    'GitClone.call' so that the output and errors are exactly as before.
+
+    Call 'close' to stop the long-lived processes.
+
+    Usage examples:
+
+        >>> with tmprepo_context() as tmp:
+        ...     blob = tmp.call('hash-object', '-w', '--stdin', stdin='hi\\n')
+        ...     with contextlib.closing(BatchGitClone(tmp.working_dir)) as c:
+        ...         c.call('cat-file', '-p', blob.strip())
+        'hi\\n'
+
+    """
+
+    def __init__(self, workingDir):
+        super(BatchGitClone, self).__init__(workingDir)
+        self._lock = threading.Lock()
+        self._batch_check = None
+        self._batch = None
+        self._format_to_diff_tree = {}
+
+    def call(self, *args, **kwargs):
+        is_plain_call = (
+            kwargs.get("stdin") is None and
+            kwargs.get("max_stdout_bytes") is None)
+        if is_plain_call:
+            with self._lock:
+                result = self._try_call_batch(args)
+            if result is not None:
+                return result
+        return super(BatchGitClone, self).call(*args, **kwargs)
+
+    def close(self):
+        """Stop any long-lived git processes, they'll restart if needed."""
+        with self._lock:
+            self._close_locked()
+
+    def _close_locked(self):
+        processes = [self._batch_check, self._batch]
+        processes.extend(self._format_to_diff_tree.itervalues())
+        self._batch_check = None
+        self._batch = None
+        self._format_to_diff_tree = {}
+        for p in processes:
+            if p is not None:
+                p.close()
+
+    def _try_call_batch(self, args):
+        # return the output of the equivalent git command, or None if the
+        # command must be passed through to a new git process
+        try:
+            return self._call_batch(args)
+        except _BatchProcessError:
+            self._close_locked()
+            return None
+
+    def _call_batch(self, args):
+        if len(args) == 3 and args[0] == 'cat-file':
+            if args[1] in _CAT_FILE_OPTIONS:
+                return self._cat_file(args[1], args[2])
+        elif len(args) == 2 and args[0] == 'rev-parse':
+            return self._rev_parse(args[1])
+        elif len(args) == 3 and args[0] == 'rev-parse':
+            if args[1] in _REV_PARSE_OPTIONS:
+                return self._rev_parse(args[2])
+        elif len(args) == 3 and args[0] == 'log':
+            if args[1].endswith('^!') and args[2].startswith('--format='):
+                return self._log_one(args[1][:-2], args[2][len('--format='):])
+        return None
+
+    def _get_batch_check(self):
+        if self._batch_check is None:
+            self._batch_check = _CatFileProcess(
+                self.working_dir, '--batch-check')
+        return self._batch_check
+
+    def _get_batch(self):
+        if self._batch is None:
+            self._batch = _CatFileProcess(self.working_dir, '--batch')
+        return self._batch
+
+    def _get_diff_tree(self, format_):
+        diff_tree = self._format_to_diff_tree.get(format_)
+        if diff_tree is None:
+            diff_tree = _DiffTreeProcess(self.working_dir, format_)
+            self._format_to_diff_tree[format_] = diff_tree
+        return diff_tree
+
+    def _cat_file(self, option, name):
+        if not _is_single_object_name(name):
+            return None
+        info = self._get_batch_check().query(name)
+        if info is None:
+            return None
+        sha1, type_, size = info
+        if option == '-t':
+            return type_ + '\n'
+        elif option == '-s':
+            return size + '\n'
+        elif option == '-e':
+            return ''
+        elif type_ not in ('blob', 'commit'):
+            # trees and tags may be pretty-printed differently to their raw
+            # content, leave those to 'git cat-file -p'
+            return None
+        return self._get_batch().query_content(sha1)
+
+    def _rev_parse(self, name):
+        if not _is_single_object_name(name):
+            return None
+        info = self._get_batch_check().query(name)
+        if info is None:
+            return None
+        return info[0] + '\n'
+
+    def _log_one(self, sha1, format_):
+        if not _is_sha1(sha1):
+            return None
+        info = self._get_batch_check().query(sha1)
+        if info is None or info[1] != 'commit':
+            return None
+        return self._get_diff_tree(format_).query(sha1) + '\n'
+
+
+class _BatchProcessError(Exception):
+    pass
+
+
+class _BatchProcess(object):
+
+    def __init__(self, working_dir, *args):
+        with open(os.devnull, 'w') as devnull:
+            self._process = subprocess.Popen(
+                ('git',) + args,
+                cwd=working_dir,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=devnull)
+
+    def _write_line(self, line):
+        try:
+            self._process.stdin.write(line + '\n')
+            self._process.stdin.flush()
+        except (IOError, ValueError) as e:
+            raise _BatchProcessError(str(e))
+
+    def _read_line(self):
+        line = self._process.stdout.readline()
+        if not line.endswith('\n'):
+            raise _BatchProcessError('unexpected end of output')
+        return line
+
+    def _read(self, size):
+        data = self._process.stdout.read(size)
+        if len(data) != size:
+            raise _BatchProcessError('unexpected end of output')
+        return data
+
+    def close(self):
+        try:
+            self._process.stdin.close()
+            self._process.stdout.close()
+        finally:
+            self._process.wait()
+
+
+class _CatFileProcess(_BatchProcess):
+
+    def __init__(self, working_dir, batch_option):
+        super(_CatFileProcess, self).__init__(
+            working_dir, 'cat-file', batch_option)
+
+    def query(self, name):
+        """Return (sha1, type, size) for the object 'name' or None if missing.
+
+        Note that this must be a '--batch-check' process.
+
+        """
+        self._write_line(name)
+        return self._read_header()
+
+    def query_content(self, name):
+        """Return the string content of object 'name' or None if missing.
+
+        Note that this must be a '--batch' process.
+
+        """
+        self._write_line(name)
+        header = self._read_header()
+        if header is None:
+            return None
+        size = int(header[2])
+        content = self._read(size)
+        self._read(1)  # the newline that separates objects
+        return content
+
+    def _read_header(self):
+        # the header is like '<sha1> <type> <size>' or '<name> missing'
+        header = self._read_line().split()
+        if len(header) != 3:
+            return None
+        return tuple(header)
+
+
+class _DiffTreeProcess(_BatchProcess):
+
+    def __init__(self, working_dir, format_):
+        # N.B. terminate each record with a NUL so we know where it ends,
+        #      '--always' and '--root' make sure that every commit is printed
+        #      and '--abbrev' makes '%h' the same as 'git log'
+        super(_DiffTreeProcess, self).__init__(
+            working_dir,
+            'diff-tree', '--stdin', '-s', '--always', '--root', '--abbrev',
+            '--format=' + format_ + '%x00')
+
+    def query(self, sha1):
+        """Return the formatted string for the commit 'sha1'."""
+        self._write_line(sha1)
+        lines = []
+        while True:
+            line = self._read_line()
+            lines.append(line)
+            if line.endswith('\x00\n'):
+                break
+        return ''.join(lines)[:-2]
+
+
+def _is_sha1(name):
+    return len(name) == 40 and all(c in string.hexdigits for c in name)
+
+
+def _is_single_object_name(name):
+    if not name or name[0] in '-^' or name != name.strip():
+        return False
+    if any(c.isspace() for c in name):
+        return False
+    return not any(m in name for m in _MULTI_REVISION_MARKERS)
+
+
 #------------------------------------------------------------------------------
 # Copyright (C) 2013-2014 Bloomberg Finance L.P.
 #
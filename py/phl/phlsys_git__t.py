@@ -6,14 +6,24 @@
 # cover those concerns.
 #
 # Concerns:
-# TODO
+# [ B] BatchGitClone gives the same output as GitClone for supported queries
+# [ B] BatchGitClone gives the same output as GitClone for commits with
+#      multi-line messages, root commits and empty commits
+# [ C] BatchGitClone raises the same errors as GitClone for missing objects
+# [ C] BatchGitClone passes through unsupported commands
+# [ D] BatchGitClone recovers after being closed
 #------------------------------------------------------------------------------
 # Tests:
-# TODO
+# [ A] test_can_commit
+# [ B] test_B_BatchSameOutput
+# [ C] test_C_BatchSameErrors
+# [ D] test_D_BatchCanReopen
 #==============================================================================
 
 from __future__ import absolute_import
 
+import contextlib
+import os
 import unittest
 
 import phlsys_git
@@ -41,6 +51,79 @@ class Test(unittest.TestCase):
         clone.call("commit", "-m", "initial commit")
         runCommands("rm -rf " + path)
 
+    def test_B_BatchSameOutput(self):
+        with phlsys_git.tmprepo_context() as repo:
+            self._make_history(repo)
+            with contextlib.closing(
+                    phlsys_git.BatchGitClone(repo.working_dir)) as batch:
+                hashes = repo.call('rev-list', 'HEAD').split()
+                names = hashes + ['HEAD', 'master', 'HEAD~1', 'HEAD:README']
+                for name in names:
+                    queries = [
+                        ('rev-parse', name),
+                        ('rev-parse', '--verify', name),
+                        ('rev-parse', '--revs-only', name),
+                        ('cat-file', '-t', name),
+                        ('cat-file', '-s', name),
+                        ('cat-file', '-p', name),
+                        ('cat-file', '-e', name),
+                    ]
+                    for query in queries:
+                        self.assertEqual(
+                            repo.call(*query), batch.call(*query), query)
+                formats = ['%H%n%s%n%b', '%h %an %ae %ad %ct%n%B', '%P']
+                for sha1 in hashes:
+                    for format_ in formats:
+                        query = ('log', sha1 + '^!', '--format=' + format_)
+                        self.assertEqual(
+                            repo.call(*query), batch.call(*query), query)
+
+    def test_C_BatchSameErrors(self):
+        with phlsys_git.tmprepo_context() as repo:
+            self._make_history(repo)
+            with contextlib.closing(
+                    phlsys_git.BatchGitClone(repo.working_dir)) as batch:
+                queries = [
+                    ('rev-parse', 'no_such_branch'),
+                    ('cat-file', '-p', 'no_such_branch'),
+                    ('cat-file', '-t', '0' * 40),
+                    ('log', '0' * 40 + '^!', '--format=%H'),
+                ]
+                for query in queries:
+                    self.assertRaises(
+                        phlsys_subprocess.CalledProcessError,
+                        repo.call,
+                        *query)
+                    self.assertRaises(
+                        phlsys_subprocess.CalledProcessError,
+                        batch.call,
+                        *query)
+
+                # unsupported commands are passed through
+                query = ('log', 'HEAD~2..HEAD', '--format=%H')
+                self.assertEqual(repo.call(*query), batch.call(*query))
+                query = ('cat-file', '-p', 'HEAD^{tree}')
+                self.assertEqual(repo.call(*query), batch.call(*query))
+
+    def test_D_BatchCanReopen(self):
+        with phlsys_git.tmprepo_context() as repo:
+            self._make_history(repo)
+            batch = phlsys_git.BatchGitClone(repo.working_dir)
+            head = repo.call('rev-parse', 'HEAD')
+            self.assertEqual(head, batch.call('rev-parse', 'HEAD'))
+            batch.close()
+            self.assertEqual(head, batch.call('rev-parse', 'HEAD'))
+            batch.close()
+
+    def _make_history(self, repo):
+        repo.call('commit', '--allow-empty', '-m', 'root')
+        repo.call(
+            'commit', '--allow-empty', '-m', 'empty\n\nwith a longer\nbody')
+        with open(os.path.join(repo.working_dir, 'README'), 'w') as f:
+            f.write('hello\nworld\n')
+        repo.call('add', 'README')
+        repo.call('commit', '-m', 'add README')
+
 
 #------------------------------------------------------------------------------
 # Copyright (C) 2013-2014 Bloomberg Finance L.P.
@@ -0,0 +1,227 @@
+"""A compact histogram of durations which supports percentile queries.
+
+The buckets are log-linear, like HdrHistogram: each power of two is split
+into a fixed number of equal sub-buckets.  This keeps the relative error of
+the percentiles bounded, 12.5% with the default 8 sub-buckets, whatever the
+scale of the values, while needing only a few hundred buckets to cover
+everything from microseconds to days.  Only the buckets which are used are
+stored, so histograms of similar values are small.
+
+Usage example:
+
+    >>> h = Histogram()
+    >>> for i in xrange(100):
+    ...     h.record(0.01)
+    >>> h.record(5)
+    >>> round(h.percentile(50), 3), round(h.percentile(100), 3)
+    (0.01, 5.0)
+
+"""
+# =============================================================================
+# CONTENTS
+# -----------------------------------------------------------------------------
+# phlsys_histogram
+#
+# Public Classes:
+#   Histogram
+#    .count
+#    .bucket_counts
+#    .record
+#    .count_at_most
+#    .merge
+#    .percentile
+#    .to_dict
+#    .from_dict
+#
+# Public Functions:
+#   bucket_upper_bound
+#
+# -----------------------------------------------------------------------------
+# (this contents block is generated, edits will be lost)
+# =============================================================================
+
+from __future__ import absolute_import
+
+import math
+
+# the values are bucketed relative to this, smaller values share bucket 0
+_MIN_VALUE = 1e-6
+
+# the number of linear sub-buckets in each power of two
+_SUB_BUCKETS = 8
+
+# the number of powers of two covered, larger values share the last bucket
+_MAX_EXPONENT = 48
+
+
+class Histogram(object):
+
+    def __init__(self):
+        """Initialise a new empty Histogram."""
+        super(Histogram, self).__init__()
+        self._bucket_to_count = {}
+        self._count = 0
+        self._max = None
+
+    @property
+    def count(self):
+        """The number of values recorded."""
+        return self._count
+
+    def bucket_counts(self):
+        """Return a sorted list of (bucket upper bound, count) tuples.
+
+        Only the buckets with values in them are returned.
+
+        :returns: a list of (float, int) tuples
+
+        """
+        return [
+            (bucket_upper_bound(b), c)
+            for b, c in sorted(self._bucket_to_count.iteritems())
+        ]
+
+    def record(self, value):
+        """Add 'value' to the histogram.
+
+        :value: a non-negative number, e.g. a duration in seconds
+        :returns: None
+
+        """
+        bucket = _bucket_index(value)
+        self._bucket_to_count[bucket] = self._bucket_to_count.get(
+            bucket, 0) + 1
+        self._count += 1
+        if self._max is None or value > self._max:
+            self._max = value
+
+    def count_at_most(self, value):
+        """Return the number of recorded values which are at most 'value'.
+
+        Values are counted if the upper bound of their bucket is at most
+        'value', so the count may be slightly lower than the exact one.
+
+        :value: a number
+        :returns: an integer
+
+        """
+        return sum(
+            c for b, c in self._bucket_to_count.iteritems()
+            if bucket_upper_bound(b) <= value)
+
+    def merge(self, other):
+        """Add all the values recorded in 'other' to this histogram.
+
+        :other: another Histogram
+        :returns: None
+
+        """
+        for bucket, count in other._bucket_to_count.iteritems():
+            self._bucket_to_count[bucket] = self._bucket_to_count.get(
+                bucket, 0) + count
+        self._count += other._count
+        if other._max is not None:
+            if self._max is None or other._max > self._max:
+                self._max = other._max
+
+    def percentile(self, percent):
+        """Return the value which 'percent' of the recorded values are within.
+
+        The value is the upper bound of the bucket it's in, so it may be
+        slightly higher than any recorded value, but never higher than the
+        largest recorded value.
+
+        :percent: a number from 0 to 100
+        :returns: a number, or None if no values have been recorded
+
+        """
+        if not self._count:
+            return None
+        rank = max(1, int(math.ceil(self._count * percent / 100.0)))
+        seen = 0
+        for bucket in sorted(self._bucket_to_count):
+            seen += self._bucket_to_count[bucket]
+            if seen >= rank:
+                return min(bucket_upper_bound(bucket), self._max)
+        return self._max
+
+    def to_dict(self):
+        """Return a dict which can be made into JSON, see 'from_dict'.
+
+        :returns: a dict
+
+        """
+        return {
+            'buckets': sorted(self._bucket_to_count.iteritems()),
+            'max': self._max,
+        }
+
+    @staticmethod
+    def from_dict(d):
+        """Return a new Histogram from the result of 'to_dict'.
+
+        :d: a dict as returned by 'to_dict'
+        :returns: a Histogram
+
+        """
+        histogram = Histogram()
+        histogram._bucket_to_count = dict(
+            (int(b), int(c)) for b, c in d['buckets'])
+        histogram._count = sum(histogram._bucket_to_count.itervalues())
+        histogram._max = d['max']
+        return histogram
+
+
+def bucket_upper_bound(bucket):
+    """Return the exclusive upper bound of the values in 'bucket'.
+
+    Usage example:
+
+        >>> bucket_upper_bound(_bucket_index(1.0)) > 1.0
+        True
+
+    :bucket: the integer index of a bucket
+    :returns: a float
+
+    """
+    if bucket == 0:
+        return _MIN_VALUE
+    exponent, sub_bucket = divmod(bucket - 1, _SUB_BUCKETS)
+    scale = _MIN_VALUE * (2 ** exponent)
+    return scale * (1 + float(sub_bucket + 1) / _SUB_BUCKETS)
+
+
+def _bucket_index(value):
+    if value < _MIN_VALUE:
+        return 0
+    mantissa, exponent = math.frexp(value / _MIN_VALUE)
+
+    # 'mantissa' is in [0.5, 1), so the value is in [2**(e-1), 2**e)
+    exponent -= 1
+    if exponent >= _MAX_EXPONENT:
+        return _MAX_EXPONENT * _SUB_BUCKETS
+    sub_bucket = int((mantissa * 2 - 1) * _SUB_BUCKETS)
+    return 1 + exponent * _SUB_BUCKETS + sub_bucket
+
+
+#------------------------------------------------------------------------------
+# Copyright (C) 2013-2014 Bloomberg Finance L.P.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to
+# deal in the Software without restriction, including without limitation the
+# rights to use, copy, modify, merge, publish, distribute, sublicense, and/or
+# sell copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.  IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+# IN THE SOFTWARE.
+#------------------------------- END-OF-FILE ----------------------------------
@@ -0,0 +1,101 @@
+"""Test suite for phlsys_histogram."""
+#==============================================================================
+#                                   TEST PLAN
+#------------------------------------------------------------------------------
+# Here we detail the things we are concerned to test and specify which tests
+# cover those concerns.
+#
+# Concerns:
+# [ A] percentiles are within the expected relative error over many scales
+# [ A] empty histograms have no percentiles
+# [ B] merging is equivalent to recording all the values in one histogram
+# [ C] histograms survive a round-trip through JSON
+#------------------------------------------------------------------------------
+# Tests:
+# [ A] test_A_Breathing
+# [ B] test_B_Merge
+# [ C] test_C_Json
+#==============================================================================
+
+from __future__ import absolute_import
+
+import json
+import random
+import unittest
+
+import phlsys_histogram
+
+
+def _make_values(count):
+    generator = random.Random(0)
+    return [10 ** generator.uniform(-5, 4) for _ in xrange(count)]
+
+
+class Test(unittest.TestCase):
+
+    def test_A_Breathing(self):
+        histogram = phlsys_histogram.Histogram()
+        self.assertIsNone(histogram.percentile(50))
+
+        values = _make_values(1000)
+        for value in values:
+            histogram.record(value)
+        self.assertEqual(histogram.count, len(values))
+
+        values.sort()
+        for percent in (1, 50, 90, 99, 100):
+            expected = values[int(len(values) * percent / 100.0) - 1]
+            actual = histogram.percentile(percent)
+            self.assertGreaterEqual(actual, expected)
+            self.assertLessEqual(actual, expected * 1.125)
+
+        self.assertEqual(histogram.percentile(100), values[-1])
+
+    def test_B_Merge(self):
+        values = _make_values(100)
+        whole = phlsys_histogram.Histogram()
+        first = phlsys_histogram.Histogram()
+        second = phlsys_histogram.Histogram()
+        for i, value in enumerate(values):
+            whole.record(value)
+            (first if i % 2 else second).record(value)
+
+        first.merge(second)
+        self.assertEqual(first.to_dict(), whole.to_dict())
+        self.assertEqual(first.count, whole.count)
+
+    def test_C_Json(self):
+        histogram = phlsys_histogram.Histogram()
+        for value in _make_values(100):
+            histogram.record(value)
+
+        text = json.dumps(histogram.to_dict())
+        loaded = phlsys_histogram.Histogram.from_dict(json.loads(text))
+        self.assertEqual(loaded.count, histogram.count)
+        self.assertEqual(loaded.bucket_counts(), histogram.bucket_counts())
+        for percent in (50, 90, 99):
+            self.assertEqual(
+                loaded.percentile(percent), histogram.percentile(percent))
+
+
+#------------------------------------------------------------------------------
+# Copyright (C) 2013-2014 Bloomberg Finance L.P.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to
+# deal in the Software without restriction, including without limitation the
+# rights to use, copy, modify, merge, publish, distribute, sublicense, and/or
+# sell copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.  IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+# IN THE SOFTWARE.
+#------------------------------- END-OF-FILE ----------------------------------
@@ -0,0 +1,295 @@
+"""Re-use persistent HTTP connections across requests to the same host.
+
+Opening a new connection for every request means paying for a TCP and maybe
+a TLS handshake each time.  A 'Pool' keeps idle connections around, keyed by
+the scheme, host, port and proxy used, so that later requests can skip that.
+
+Connections that the server has closed while they were idle are detected
+before they are re-used, or if sending the request on them fails, and a new
+connection is made instead.  Requests aren't retried once they have been
+sent, failures while waiting for the response are raised, as the server may
+have acted on the request already.
+
+"""
+# =============================================================================
+# CONTENTS
+# -----------------------------------------------------------------------------
+# phlsys_httpconnectionpool
+#
+# Public Classes:
+#   Error
+#   HttpError
+#   Pool
+#    .connect_count
+#    .post
+#    .request
+#    .close
+#
+# -----------------------------------------------------------------------------
+# (this contents block is generated, edits will be lost)
+# =============================================================================
+from __future__ import absolute_import
+
+import collections
+import httplib
+import select
+import socket
+import threading
+import urlparse
+
+_DEFAULT_TIMEOUT = 600
+_DEFAULT_MAX_IDLE_PER_KEY = 4
+
+# errors from sending a request which indicate that a re-used connection has
+# been closed by the server while it was sitting idle in the pool
+_STALE_CONNECTION_ERRORS = (
+    httplib.CannotSendRequest,
+    socket.error,
+)
+
+
+class Error(Exception):
+    pass
+
+
+class HttpError(Error):
+
+    def __init__(self, url, status, reason, content):
+        """Construct from an unsuccessful response from the server.
+
+        :url: the string url that was requested
+        :status: the integer HTTP status code of the response
+        :reason: the string reason phrase of the response
+        :content: the string body of the response
+
+        """
+        message = "{} {} from {}".format(status, reason, url)
+        super(HttpError, self).__init__(message)
+        self.url = url
+        self.status = status
+        self.reason = reason
+        self.content = content
+
+
+_Key = collections.namedtuple(
+    'phlsys_httpconnectionpool__Key',
+    ['scheme', 'hostname', 'port', 'proxy'])
+
+
+class Pool(object):
+
+    def __init__(
+            self,
+            timeout=_DEFAULT_TIMEOUT,
+            max_idle_per_key=_DEFAULT_MAX_IDLE_PER_KEY):
+        """Initialise a new empty Pool.
+
+        Note that setting 'max_idle_per_key' to 0 disables re-use entirely, a
+        new connection is made for each request.
+
+        :timeout: the number of seconds to wait on a connection before failing
+        :max_idle_per_key: the number of idle connections to keep per host
+        :returns: None
+
+        """
+        super(Pool, self).__init__()
+        self._timeout = timeout
+        self._max_idle_per_key = max_idle_per_key
+        self._idle = collections.defaultdict(list)
+        self._lock = threading.Lock()
+        self._connect_count = 0
+
+    @property
+    def connect_count(self):
+        """The number of new connections that have been made by this Pool."""
+        return self._connect_count
+
+    def post(self, url, body, headers=None, proxy=None):
+        """Return the string content of a POST of 'body' to 'url'.
+
+        Raise 'HttpError' if the server responds with a status other than 200.
+
+        :url: the string url to post to, e.g. 'http://127.0.0.1/api/'
+        :body: the string body to post
+        :headers: a dict of string header names to string values, or None
+        :proxy: the string address of a proxy to go through, or None
+        :returns: the string content of the response
+
+        """
+        return self.request('POST', url, body, headers, proxy)
+
+    def request(self, method, url, body=None, headers=None, proxy=None):
+        """Return the string content of the response to a request to 'url'.
+
+        Raise 'HttpError' if the server responds with a status other than 200.
+
+        :method: the string HTTP method to use, e.g. 'GET'
+        :url: the string url to request, e.g. 'http://127.0.0.1/api/'
+        :body: the string body to send, or None
+        :headers: a dict of string header names to string values, or None
+        :proxy: the string address of a proxy to go through, or None
+        :returns: the string content of the response
+
+        """
+        key, path = _make_key_and_path(url, proxy)
+        all_headers = {'Connection': 'keep-alive'}
+        if body is not None:
+            all_headers['Content-Type'] = 'application/x-www-form-urlencoded'
+        if headers:
+            all_headers.update(headers)
+
+        connection = self._take_idle(key)
+        if connection is not None and _is_dropped(connection):
+            connection.close()
+            connection = None
+
+        if connection is not None:
+            try:
+                connection.request(method, path, body, all_headers)
+            except socket.timeout:
+                connection.close()
+                raise
+            except _STALE_CONNECTION_ERRORS:
+                connection.close()
+                connection = None
+
+        if connection is None:
+            connection = self._connect(key)
+            try:
+                connection.request(method, path, body, all_headers)
+            except Exception:
+                connection.close()
+                raise
+
+        # N.B. don't retry from here on, the request has been sent and may
+        #      have been acted on, e.g. a comment may have been made
+        try:
+            response = connection.getresponse()
+            content = response.read()
+        except Exception:
+            connection.close()
+            raise
+
+        if response.will_close:
+            connection.close()
+        else:
+            self._put_idle(key, connection)
+
+        if response.status != httplib.OK:
+            raise HttpError(url, response.status, response.reason, content)
+
+        return content
+
+    def close(self):
+        """Close all the idle connections in the pool.
+
+        :returns: None
+
+        """
+        with self._lock:
+            idle = self._idle
+            self._idle = collections.defaultdict(list)
+        for connection_list in idle.itervalues():
+            for connection in connection_list:
+                connection.close()
+
+    def _take_idle(self, key):
+        with self._lock:
+            connection_list = self._idle.get(key)
+            if connection_list:
+                return connection_list.pop()
+        return None
+
+    def _put_idle(self, key, connection):
+        with self._lock:
+            connection_list = self._idle[key]
+            if len(connection_list) < self._max_idle_per_key:
+                connection_list.append(connection)
+                connection = None
+        if connection is not None:
+            connection.close()
+
+    def _connect(self, key):
+        with self._lock:
+            self._connect_count += 1
+
+        if key.scheme == 'https':
+            connection_type = httplib.HTTPSConnection
+        else:
+            connection_type = httplib.HTTPConnection
+
+        if key.proxy is None:
+            return connection_type(
+                key.hostname, key.port, timeout=self._timeout)
+
+        proxy = urlparse.urlsplit(key.proxy)
+
+        # pylint: disable=E1101
+        if key.scheme == 'https':
+            connection = connection_type(
+                proxy.hostname, proxy.port, timeout=self._timeout)
+            connection.set_tunnel(key.hostname, key.port)
+        else:
+            connection = httplib.HTTPConnection(
+                proxy.hostname, proxy.port, timeout=self._timeout)
+        # pylint: enable=E1101
+
+        return connection
+
+
+def _make_key_and_path(url, proxy):
+    split = urlparse.urlsplit(url)
+
+    # pylint: disable=E1101
+    scheme = split.scheme.lower()
+    if scheme not in ('http', 'https'):
+        raise Error(str(url) + ' is neither http or https')
+
+    if proxy is not None and '://' not in proxy:
+        proxy = 'http://' + proxy
+
+    if proxy is not None and scheme == 'http':
+        # plain http proxies expect the full url in the request line
+        path = url
+    else:
+        path = split.path or '/'
+        if split.query:
+            path = '?'.join([path, split.query])
+
+    key = _Key(scheme, split.hostname, split.port, proxy)
+    # pylint: enable=E1101
+
+    return key, path
+
+
+def _is_dropped(connection):
+    # an idle connection should have nothing to read, if it's readable then
+    # the server has closed it
+    sock = connection.sock
+    if sock is None:
+        return True
+    readable, _, _ = select.select([sock], [], [], 0)
+    return bool(readable)
+
+
+#------------------------------------------------------------------------------
+# Copyright (C) 2013-2014 Bloomberg Finance L.P.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to
+# deal in the Software without restriction, including without limitation the
+# rights to use, copy, modify, merge, publish, distribute, sublicense, and/or
+# sell copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.  IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+# IN THE SOFTWARE.
+#------------------------------- END-OF-FILE ----------------------------------
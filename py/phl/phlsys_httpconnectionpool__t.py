@@ -0,0 +1,184 @@
+"""Test suite for phlsys_httpconnectionpool."""
+#==============================================================================
+#                                   TEST PLAN
+#------------------------------------------------------------------------------
+# Here we detail the things we are concerned to test and specify which tests
+# cover those concerns.
+#
+# Concerns:
+# [ A] requests return the content of the response
+# [ A] connections are re-used between requests to the same host
+# [ B] connections closed by the server while idle are transparently replaced
+# [ C] re-use can be disabled with 'max_idle_per_key=0'
+# [ D] unsuccessful responses raise 'HttpError'
+# [ E] requests which fail after being sent aren't retried
+#------------------------------------------------------------------------------
+# Tests:
+# [ A] test_A_Breathing
+# [ B] test_B_StaleConnection
+# [ C] test_C_NoReuse
+# [ D] test_D_HttpError
+# [ E] test_E_NoRetryAfterSend
+#==============================================================================
+
+from __future__ import absolute_import
+
+import BaseHTTPServer
+import contextlib
+import SocketServer
+import threading
+import time
+import unittest
+
+import phlsys_httpconnectionpool
+
+
+class _Handler(BaseHTTPServer.BaseHTTPRequestHandler):
+
+    protocol_version = 'HTTP/1.1'
+
+    # buffer the response so that it isn't dribbled out in separate packets
+    wbufsize = -1
+
+    # the number of requests received for each path
+    path_counts = {}
+
+    def do_POST(self):
+        length = int(self.headers.getheader('Content-Length'))
+        body = self.rfile.read(length)
+        counts = _Handler.path_counts
+        counts[self.path] = counts.get(self.path, 0) + 1
+
+        # drop the connection without responding, as if it was reset
+        if self.path == '/noreply':
+            self.close_connection = 1
+            return
+
+        status = 404 if self.path == '/missing' else 200
+        self.send_response(status)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+        # drop the connection without warning the client, as a server would
+        # when it times out an idle keep-alive connection
+        if self.path == '/drop':
+            self.close_connection = 1
+
+    def log_message(self, *args):
+        pass
+
+
+class _Server(SocketServer.ThreadingMixIn, BaseHTTPServer.HTTPServer):
+
+    # don't hang the tests on a handler which never finishes
+    daemon_threads = True
+
+    def __init__(self, *args, **kwargs):
+        BaseHTTPServer.HTTPServer.__init__(self, *args, **kwargs)
+        self.handler_threads = []
+
+    def process_request(self, request, client_address):
+        thread = threading.Thread(
+            target=self.process_request_thread,
+            args=(request, client_address))
+        thread.daemon = self.daemon_threads
+        self.handler_threads.append(thread)
+        thread.start()
+
+
+@contextlib.contextmanager
+def _server_context():
+    server = _Server(('127.0.0.1', 0), _Handler)
+    thread = threading.Thread(target=server.serve_forever)
+    thread.daemon = True
+    thread.start()
+    try:
+        yield 'http://127.0.0.1:{}'.format(server.server_address[1])
+    finally:
+        server.shutdown()
+        server.server_close()
+
+        # N.B. the handlers of keep-alive connections only finish once the
+        #      client closes them, wait for them here so that they don't
+        #      outlive the test and fail during interpreter shutdown
+        for handler_thread in server.handler_threads:
+            handler_thread.join(5)
+
+
+class Test(unittest.TestCase):
+
+    def test_A_Breathing(self):
+        pool = phlsys_httpconnectionpool.Pool()
+        with _server_context() as url:
+            for i in xrange(10):
+                content = pool.post(url + '/api/', 'hello {}'.format(i))
+                self.assertEqual(content, 'hello {}'.format(i))
+            pool.close()
+        self.assertEqual(pool.connect_count, 1)
+
+    def test_B_StaleConnection(self):
+        pool = phlsys_httpconnectionpool.Pool()
+        with _server_context() as url:
+            self.assertEqual(pool.post(url + '/drop', 'one'), 'one')
+
+            # give the server a moment to close the connection
+            time.sleep(0.2)
+
+            self.assertEqual(pool.post(url + '/api/', 'two'), 'two')
+            self.assertEqual(pool.post(url + '/api/', 'three'), 'three')
+            pool.close()
+        self.assertEqual(pool.connect_count, 2)
+
+    def test_C_NoReuse(self):
+        pool = phlsys_httpconnectionpool.Pool(max_idle_per_key=0)
+        with _server_context() as url:
+            for i in xrange(3):
+                self.assertEqual(pool.post(url + '/api/', 'hello'), 'hello')
+            pool.close()
+        self.assertEqual(pool.connect_count, 3)
+
+    def test_D_HttpError(self):
+        pool = phlsys_httpconnectionpool.Pool()
+        with _server_context() as url:
+            with self.assertRaises(phlsys_httpconnectionpool.HttpError) as e:
+                pool.post(url + '/missing', 'hello')
+            self.assertEqual(e.exception.status, 404)
+            self.assertEqual(pool.post(url + '/api/', 'hello'), 'hello')
+            pool.close()
+        self.assertEqual(pool.connect_count, 1)
+
+    def test_E_NoRetryAfterSend(self):
+        pool = phlsys_httpconnectionpool.Pool()
+        _Handler.path_counts = {}
+        with _server_context() as url:
+            self.assertEqual(pool.post(url + '/api/', 'one'), 'one')
+            with self.assertRaises(Exception):
+                pool.post(url + '/noreply', 'two')
+            self.assertEqual(pool.post(url + '/api/', 'three'), 'three')
+            pool.close()
+        self.assertEqual(_Handler.path_counts['/noreply'], 1)
+        self.assertEqual(pool.connect_count, 2)
+
+
+#------------------------------------------------------------------------------
+# Copyright (C) 2013-2014 Bloomberg Finance L.P.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to
+# deal in the Software without restriction, including without limitation the
+# rights to use, copy, modify, merge, publish, distribute, sublicense, and/or
+# sell copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.  IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+# IN THE SOFTWARE.
+#------------------------------- END-OF-FILE ----------------------------------
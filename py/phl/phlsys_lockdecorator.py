@@ -0,0 +1,100 @@
+"""Decorators for serialising access to objects shared between threads."""
+# =============================================================================
+# CONTENTS
+# -----------------------------------------------------------------------------
+# phlsys_lockdecorator
+#
+# Public Functions:
+#   method_locker
+#   decorate_object_methods
+#
+# -----------------------------------------------------------------------------
+# (this contents block is generated, edits will be lost)
+# =============================================================================
+
+from __future__ import absolute_import
+
+import functools
+import inspect
+
+
+def method_locker(lock):
+    """Return a decorator which will hold 'lock' while methods execute.
+
+    e.g.
+
+        >>> import threading
+        >>> lock = threading.Lock()
+        >>> class ExampleClass(object):
+        ...     @method_locker(lock)
+        ...     def example_method(self):
+        ...         return lock.locked()
+        >>> c = ExampleClass()
+        >>> c.example_method()
+        True
+        >>> lock.locked()
+        False
+
+    """
+    def decorator(f):
+        @functools.wraps(f)
+        def wrapper(*args, **kwargs):
+            with lock:
+                return f(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def decorate_object_methods(object_, lock):
+    """Decorate all the public methods of the supplied object with 'lock'.
+
+    Unlike other decorators which work from the class of the object, this
+    wraps whatever is currently bound on the object.  This means that it
+    composes with previous decorations, e.g. the tag timers in
+    abdt_arcydreporter.
+
+    Note that 'lock' should be re-entrant if the methods of 'object_' call
+    each other.
+
+    e.g.
+
+        >>> import threading
+        >>> lock = threading.RLock()
+        >>> class ExampleClass(object):
+        ...     def example_method(self):
+        ...         return 'hello'
+        >>> c = ExampleClass()
+        >>> decorate_object_methods(c, lock)
+        >>> c.example_method()
+        'hello'
+
+    """
+    locker = method_locker(lock)
+    for name, attribute in object_.__class__.__dict__.iteritems():
+        if inspect.isfunction(attribute) and not name.startswith('_'):
+            # N.B. the bound method already has 'self', so there is no need
+            #      to bind the wrapper to 'object_' again
+            object_.__dict__[name] = locker(getattr(object_, name))
+
+
+#------------------------------------------------------------------------------
+# Copyright (C) 2013-2014 Bloomberg Finance L.P.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to
+# deal in the Software without restriction, including without limitation the
+# rights to use, copy, modify, merge, publish, distribute, sublicense, and/or
+# sell copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.  IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+# IN THE SOFTWARE.
+#------------------------------- END-OF-FILE ----------------------------------
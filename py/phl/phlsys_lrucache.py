@@ -0,0 +1,136 @@
+"""A bounded mapping which discards the least recently used items.
+
+Usage example:
+    >>> c = LruCache(2); c['a'] = 1; c['b'] = 2; _ = c['a']; c['c'] = 3
+    >>> sorted(c.keys())
+    ['a', 'c']
+
+"""
+# =============================================================================
+# CONTENTS
+# -----------------------------------------------------------------------------
+# phlsys_lrucache
+#
+# Public Classes:
+#   LruCache
+#    .get
+#    .discard
+#    .keys
+#    .items
+#    .size
+#    .max_size
+#
+# -----------------------------------------------------------------------------
+# (this contents block is generated, edits will be lost)
+# =============================================================================
+
+from __future__ import absolute_import
+
+import collections
+
+
+class LruCache(object):
+
+    def __init__(self, max_size, size_of=None):
+        """Initialise a new cache which will hold at most 'max_size'.
+
+        If 'size_of' is not supplied then each item has a size of 1, so that
+        'max_size' is the maximum number of items.  Items which are bigger
+        than 'max_size' on their own are never stored.
+
+        :max_size: the maximum total size of all the values
+        :size_of: callable which returns the size of a value, or None
+        :returns: None
+
+        """
+        super(LruCache, self).__init__()
+        assert max_size >= 0
+        self._max_size = max_size
+        self._size_of = size_of if size_of is not None else lambda v: 1
+        self._size = 0
+
+        # N.B. the least recently used item is first in the dict
+        self._items = collections.OrderedDict()
+
+    def get(self, key, default=None):
+        """Return the value for 'key' if present, otherwise 'default'.
+
+        The item becomes the most recently used, if present.
+
+        """
+        value = self._items.pop(key, _MISSING)
+        if value is _MISSING:
+            return default
+        self._items[key] = value
+        return value
+
+    def __getitem__(self, key):
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key, value):
+        self.discard(key)
+        size = self._size_of(value)
+        if size > self._max_size:
+            return
+        self._items[key] = value
+        self._size += size
+        while self._size > self._max_size:
+            _, discarded = self._items.popitem(last=False)
+            self._size -= self._size_of(discarded)
+
+    def discard(self, key):
+        """Remove the item for 'key' if present."""
+        value = self._items.pop(key, _MISSING)
+        if value is not _MISSING:
+            self._size -= self._size_of(value)
+
+    def __contains__(self, key):
+        return key in self._items
+
+    def __len__(self):
+        return len(self._items)
+
+    def keys(self):
+        """Return a list of keys, least recently used first."""
+        return self._items.keys()
+
+    def items(self):
+        """Return a list of (key, value), least recently used first."""
+        return self._items.items()
+
+    @property
+    def size(self):
+        return self._size
+
+    @property
+    def max_size(self):
+        return self._max_size
+
+
+_MISSING = object()
+
+
+#------------------------------------------------------------------------------
+# Copyright (C) 2013-2014 Bloomberg Finance L.P.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to
+# deal in the Software without restriction, including without limitation the
+# rights to use, copy, modify, merge, publish, distribute, sublicense, and/or
+# sell copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.  IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+# IN THE SOFTWARE.
+#------------------------------- END-OF-FILE ----------------------------------
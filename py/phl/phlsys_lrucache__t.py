@@ -0,0 +1,110 @@
+"""Test suite for phlsys_lrucache."""
+#==============================================================================
+#                                   TEST PLAN
+#------------------------------------------------------------------------------
+# Here we detail the things we are concerned to test and specify which tests
+# cover those concerns.
+#
+# Concerns:
+# [ A] items can be stored and retrieved
+# [ B] least recently used items are discarded first when over budget
+# [ B] retrieving an item makes it the most recently used
+# [ C] item sizes are accounted for when 'size_of' is supplied
+# [ C] items bigger than the budget are not stored
+# [ C] replacing and discarding items updates the size
+#------------------------------------------------------------------------------
+# Tests:
+# [ A] test_A_Breathing
+# [ B] test_B_DiscardLeastRecentlyUsed
+# [ C] test_C_SizeOf
+#==============================================================================
+
+from __future__ import absolute_import
+
+import unittest
+
+import phlsys_lrucache
+
+
+class Test(unittest.TestCase):
+
+    def test_A_Breathing(self):
+        cache = phlsys_lrucache.LruCache(10)
+        self.assertEqual(len(cache), 0)
+        self.assertNotIn('a', cache)
+        self.assertIsNone(cache.get('a'))
+        self.assertRaises(KeyError, lambda: cache['a'])
+
+        cache['a'] = 1
+        self.assertIn('a', cache)
+        self.assertEqual(cache['a'], 1)
+        self.assertEqual(cache.get('a'), 1)
+        self.assertEqual(len(cache), 1)
+        self.assertEqual(cache.size, 1)
+
+        cache.discard('a')
+        self.assertNotIn('a', cache)
+        self.assertEqual(cache.size, 0)
+        cache.discard('a')
+
+    def test_B_DiscardLeastRecentlyUsed(self):
+        cache = phlsys_lrucache.LruCache(3)
+        for key in 'abc':
+            cache[key] = key
+        self.assertListEqual(cache.keys(), ['a', 'b', 'c'])
+
+        cache.get('a')
+        self.assertListEqual(cache.keys(), ['b', 'c', 'a'])
+
+        cache['d'] = 'd'
+        self.assertListEqual(cache.keys(), ['c', 'a', 'd'])
+        self.assertListEqual(
+            cache.items(), [('c', 'c'), ('a', 'a'), ('d', 'd')])
+
+        cache['c'] = 'C'
+        self.assertListEqual(cache.keys(), ['a', 'd', 'c'])
+        self.assertEqual(len(cache), 3)
+
+    def test_C_SizeOf(self):
+        cache = phlsys_lrucache.LruCache(10, len)
+        cache['a'] = 'x' * 4
+        cache['b'] = 'x' * 4
+        self.assertEqual(cache.size, 8)
+
+        cache['c'] = 'x' * 4
+        self.assertListEqual(cache.keys(), ['b', 'c'])
+        self.assertEqual(cache.size, 8)
+
+        cache['huge'] = 'x' * 11
+        self.assertNotIn('huge', cache)
+        self.assertEqual(cache.size, 8)
+
+        cache['b'] = 'x'
+        self.assertEqual(cache.size, 5)
+
+        cache.discard('c')
+        self.assertEqual(cache.size, 1)
+        self.assertEqual(cache.max_size, 10)
+
+
+#------------------------------------------------------------------------------
+# Copyright (C) 2013-2014 Bloomberg Finance L.P.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to
+# deal in the Software without restriction, including without limitation the
+# rights to use, copy, modify, merge, publish, distribute, sublicense, and/or
+# sell copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.  IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+# IN THE SOFTWARE.
+#------------------------------- END-OF-FILE ----------------------------------
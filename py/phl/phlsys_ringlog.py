@@ -0,0 +1,175 @@
+"""A bounded log which spills older items to rotating JSON-lines files.
+
+Only the most recent items are kept in memory, older items are appended to a
+'spill' file as they are pushed out, one JSON document per line.  When the
+spill file gets too large it's rotated, like logrotate does, keeping a fixed
+number of old files.  The spilled items can be read back a page at a time
+with 'read_spilled'.
+
+Usage example:
+
+    >>> log = RingLog(2)
+    >>> for i in xrange(3):
+    ...     log.append(i)
+    >>> log.items()
+    [1, 2]
+
+"""
+# =============================================================================
+# CONTENTS
+# -----------------------------------------------------------------------------
+# phlsys_ringlog
+#
+# Public Classes:
+#   RingLog
+#    .append
+#    .items
+#
+# Public Functions:
+#   read_spilled
+#
+# -----------------------------------------------------------------------------
+# (this contents block is generated, edits will be lost)
+# =============================================================================
+
+from __future__ import absolute_import
+
+import collections
+import json
+import os
+
+_DEFAULT_MAX_SPILL_BYTES = 1024 * 1024
+_DEFAULT_MAX_SPILL_FILES = 5
+
+
+class RingLog(object):
+
+    def __init__(
+            self,
+            capacity,
+            spill_path=None,
+            max_spill_bytes=_DEFAULT_MAX_SPILL_BYTES,
+            max_spill_files=_DEFAULT_MAX_SPILL_FILES):
+        """Initialise a new empty RingLog.
+
+        Note that RingLog is not thread-safe, callers must serialise access.
+
+        :capacity: the number of items to keep in memory
+        :spill_path: the string path of the file to spill to, None to discard
+        :max_spill_bytes: the size at which to rotate the spill file
+        :max_spill_files: the number of rotated spill files to keep
+        :returns: None
+
+        """
+        super(RingLog, self).__init__()
+        assert capacity > 0
+        self._items = collections.deque(maxlen=capacity)
+        self._spill_path = spill_path
+        self._max_spill_bytes = max_spill_bytes
+        self._max_spill_files = max_spill_files
+
+    def append(self, item):
+        """Add 'item' to the log, spilling the oldest item if full.
+
+        :item: a value which can be represented as JSON
+        :returns: None
+
+        """
+        if len(self._items) == self._items.maxlen:
+            if self._spill_path is not None:
+                self._spill(self._items[0])
+        self._items.append(item)
+
+    def items(self):
+        """Return a list of the items in memory, oldest first.
+
+        :returns: a list of items
+
+        """
+        return list(self._items)
+
+    def _spill(self, item):
+        with open(self._spill_path, 'a') as f:
+            f.write(json.dumps(item) + '\n')
+            size = f.tell()
+        if size >= self._max_spill_bytes:
+            _rotate(self._spill_path, self._max_spill_files)
+
+
+def read_spilled(spill_path, offset, limit):
+    """Return a list of up to 'limit' spilled items, newest first.
+
+    The 'offset' newest items are skipped, so pages of items may be read by
+    increasing 'offset' by 'limit' each time.  Rotated files are read too.
+
+    :spill_path: the string path of the file which items are spilled to
+    :offset: the number of newest items to skip
+    :limit: the maximum number of items to return
+    :returns: a list of items
+
+    """
+    items = []
+    for path in _iter_spill_paths(spill_path):
+        with open(path) as f:
+            lines = f.readlines()
+        for line in reversed(lines):
+            if len(items) >= limit:
+                return items
+            if not line.strip():
+                continue
+            if offset:
+                offset -= 1
+                continue
+            items.append(json.loads(line))
+    return items
+
+
+def _iter_spill_paths(spill_path):
+    # yield the spill file and the rotated files that exist, newest first
+    if os.path.isfile(spill_path):
+        yield spill_path
+    index = 1
+    while os.path.isfile(_make_rotated_path(spill_path, index)):
+        yield _make_rotated_path(spill_path, index)
+        index += 1
+
+
+def _make_rotated_path(spill_path, index):
+    return '{}.{}'.format(spill_path, index)
+
+
+def _rotate(spill_path, max_spill_files):
+    oldest = _make_rotated_path(spill_path, max_spill_files)
+    if os.path.isfile(oldest):
+        os.remove(oldest)
+    for index in xrange(max_spill_files - 1, 0, -1):
+        path = _make_rotated_path(spill_path, index)
+        if os.path.isfile(path):
+            os.rename(path, _make_rotated_path(spill_path, index + 1))
+    if max_spill_files > 0:
+        os.rename(spill_path, _make_rotated_path(spill_path, 1))
+    else:
+        os.remove(spill_path)
+
+
+#------------------------------------------------------------------------------
+# Copyright (C) 2013-2014 Bloomberg Finance L.P.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to
+# deal in the Software without restriction, including without limitation the
+# rights to use, copy, modify, merge, publish, distribute, sublicense, and/or
+# sell copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.  IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+# IN THE SOFTWARE.
+#------------------------------- END-OF-FILE ----------------------------------
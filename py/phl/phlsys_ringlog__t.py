@@ -0,0 +1,80 @@
+"""Test suite for phlsys_ringlog."""
+#==============================================================================
+#                                   TEST PLAN
+#------------------------------------------------------------------------------
+# Here we detail the things we are concerned to test and specify which tests
+# cover those concerns.
+#
+# Concerns:
+# [ A] only the most recent items are kept in memory
+# [ A] older items are spilled and can be read back a page at a time
+# [ B] spill files are rotated and the oldest are discarded
+#------------------------------------------------------------------------------
+# Tests:
+# [ A] test_A_Breathing
+# [ B] test_B_Rotation
+#==============================================================================
+
+from __future__ import absolute_import
+
+import os
+import unittest
+
+import phlsys_fs
+
+import phlsys_ringlog
+
+
+class Test(unittest.TestCase):
+
+    def test_A_Breathing(self):
+        with phlsys_fs.chtmpdir_context():
+            log = phlsys_ringlog.RingLog(3, 'spill')
+            self.assertEqual(phlsys_ringlog.read_spilled('spill', 0, 10), [])
+
+            for i in xrange(10):
+                log.append({'i': i})
+            self.assertEqual(log.items(), [{'i': 7}, {'i': 8}, {'i': 9}])
+
+            read = phlsys_ringlog.read_spilled
+            self.assertEqual(read('spill', 0, 2), [{'i': 6}, {'i': 5}])
+            self.assertEqual(read('spill', 2, 2), [{'i': 4}, {'i': 3}])
+            self.assertEqual(read('spill', 6, 2), [{'i': 0}])
+            self.assertEqual(read('spill', 8, 2), [])
+
+    def test_B_Rotation(self):
+        with phlsys_fs.chtmpdir_context():
+            log = phlsys_ringlog.RingLog(
+                1, 'spill', max_spill_bytes=1, max_spill_files=2)
+            for i in xrange(10):
+                log.append(i)
+
+            # each spilled item is rotated straight away, only the 2 most
+            # recent of them are kept
+            self.assertEqual(
+                sorted(os.listdir('.')), ['spill.1', 'spill.2'])
+            self.assertEqual(
+                phlsys_ringlog.read_spilled('spill', 0, 10), [8, 7])
+
+
+#------------------------------------------------------------------------------
+# Copyright (C) 2013-2014 Bloomberg Finance L.P.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to
+# deal in the Software without restriction, including without limitation the
+# rights to use, copy, modify, merge, publish, distribute, sublicense, and/or
+# sell copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.  IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+# IN THE SOFTWARE.
+#------------------------------- END-OF-FILE ----------------------------------
@@ -5,6 +5,10 @@
 # phlsys_scheduleunreliables
 #
 # Public Classes:
+#   ConcurrentOperations
+#    .do
+#    .getDelay
+#    .active_operations
 #   DelayedRetryNotifyOperation
 #    .do
 #    .getDelay
@@ -13,6 +17,7 @@
 #   process_loop_forever
 #   process_once
 #   make_timed_queue
+#   make_worker_pool
 #
 # -----------------------------------------------------------------------------
 # (this contents block is generated, edits will be lost)
@@ -20,10 +25,20 @@
 
 from __future__ import absolute_import
 
+import multiprocessing.pool
+
 import phlsys_timedqueue
 
+# how often to wake up the main thread while waiting for concurrent operations,
+# this is necessary so that signals like SIGTERM are handled promptly
+_POOL_WAIT_SECS = 1
+
 
 def process_loop_forever(operations):
+    # N.B. the operations are done in the order they were supplied, including
+    #      operations that are resumed after being paused
+    order = _make_order(operations)
+
     # use a copy of the original, as we may modify it
     # we need to do set operations so 'set' is most appropriate
     operations = set(operations)
@@ -31,23 +46,27 @@ def process_loop_forever(operations):
     paused_operations = phlsys_timedqueue.TimedQueue()
 
     while True:
-        _process_operations(operations, paused_operations)
+        _process_operations(operations, paused_operations, order=order)
 
 
 def process_once(operations):
     """Return the set of still active operations after processing each once.
 
+    The operations are done in the order they are supplied.
+
     :operations: an iterable of objects that support 'do' and 'getDelay'
     :returns: a set of the still active operations after processing each once.
 
     """
+    order = _make_order(operations)
+
     # use a copy of the original, as we may modify it
     # we need to do set operations so 'set' is most appropriate
     operations = set(operations)
 
     paused_operations = phlsys_timedqueue.TimedQueue()
 
-    _process_operations(operations, paused_operations)
+    _process_operations(operations, paused_operations, order=order)
 
     return operations
 
@@ -56,14 +75,29 @@ def make_timed_queue():
     return phlsys_timedqueue.TimedQueue()
 
 
-def _process_operations(operations, paused_operations):
+def make_worker_pool(max_workers):
+    """Return a pool of 'max_workers' threads for 'ConcurrentOperations'."""
+    return multiprocessing.pool.ThreadPool(max_workers)
+
+
+def _make_order(operations):
+    # return a dict of operation to its position in 'operations'
+    return dict((op, index) for index, op in enumerate(operations))
+
+
+def _process_operations(operations, paused_operations, pool=None, order=None):
     assert isinstance(operations, set)
     operations |= set(paused_operations.pop_expired())
 
-    new_bad_operations = set()
-    for op in operations:
-        if not op.do():
-            new_bad_operations.add(op)
+    if pool is None:
+        ordered_operations = operations
+        if order is not None:
+            ordered_operations = sorted(operations, key=order.get)
+        results = [(op, op.do()) for op in ordered_operations]
+    else:
+        results = _do_operations_in_pool(operations, pool)
+
+    new_bad_operations = set(op for op, is_ok in results if not is_ok)
 
     if new_bad_operations:
         operations -= new_bad_operations
@@ -73,6 +107,55 @@ def _process_operations(operations, paused_operations):
                 paused_operations.push(op, delay)
 
 
+def _do_operation(operation):
+    return operation.do()
+
+
+def _do_operations_in_pool(operations, pool):
+    operations = list(operations)
+    async_result = pool.map_async(_do_operation, operations)
+
+    # N.B. a plain 'get()' blocks the main thread in a way that prevents signal
+    #      handlers from running, so poll with a timeout instead
+    while not async_result.ready():
+        async_result.wait(_POOL_WAIT_SECS)
+
+    return zip(operations, async_result.get())
+
+
+class ConcurrentOperations(object):
+
+    def __init__(self, operations, pool):
+        """Initialise a group of 'operations' to be done concurrently.
+
+        Each of the 'operations' keeps its own retry schedule, exactly as if it
+        were being processed individually by 'process_loop_forever'.  The group
+        itself never fails.
+
+        Note that the operations are done on worker threads, so they must be
+        safe to do concurrently with each other.
+
+        :operations: an iterable of objects that support 'do' and 'getDelay'
+        :pool: a pool of workers, e.g. from 'make_worker_pool'
+
+        """
+        self._operations = set(operations)
+        self._paused_operations = phlsys_timedqueue.TimedQueue()
+        self._pool = pool
+
+    def do(self):
+        _process_operations(
+            self._operations, self._paused_operations, self._pool)
+        return True
+
+    def getDelay(self):
+        return None
+
+    def active_operations(self):
+        """Return the set of operations which are not paused after failing."""
+        return set(self._operations)
+
+
 class DelayedRetryNotifyOperation(object):
     # TODO: support iterables generally
 
@@ -19,6 +19,10 @@ import phlsys_scheduleunreliables
 # [ C] loopOnce moves bad operations into paused_operations
 # [ D] loopOnce moves expired bad operations into operations
 # [ E] loopOnce drops bad operations which return 'None' from getDelay()
+# [ F] ConcurrentOperations performs all operations
+# [ F] ConcurrentOperations doesn't fail if some of its operations fail
+# [ G] ConcurrentOperations pauses and resumes bad operations independently
+# [ H] process_once does operations in the order they are supplied
 #------------------------------------------------------------------------------
 # Tests:
 # [ A] test_A_Breathing
@@ -26,6 +30,9 @@ import phlsys_scheduleunreliables
 # [ C] test_C_MakeBadOperations
 # [ D] test_D_ExpireBadOperations
 # [ E] test_E_DropBadOperations
+# [ F] test_F_ConcurrentAllOperations
+# [ G] test_G_ConcurrentPauseBadOperations
+# [ H] test_H_Order
 #==============================================================================
 
 
@@ -153,6 +160,85 @@ class Test(unittest.TestCase):
         self.assertEqual(0, len(operations))
         self.assertEqual(0, len(bad_operations.pop_expired()))
 
+    def test_F_ConcurrentAllOperations(self):
+        results = set()
+
+        def do(s):
+            results.add(s)
+            if s % 2:
+                raise Exception("bad_do")
+
+        def reportNothing(_):
+            pass
+
+        def makeOperation(s):
+            delays = []
+            return phlsys_scheduleunreliables.DelayedRetryNotifyOperation(
+                functools.partial(do, s), delays, reportNothing)
+
+        data = set([1, 2, 3, 4, 5, 6, 7, 8, 9])
+        good_data = set([2, 4, 6, 8])
+        repo_operations = [makeOperation(i) for i in data]
+
+        pool = phlsys_scheduleunreliables.make_worker_pool(4)
+        concurrent = phlsys_scheduleunreliables.ConcurrentOperations(
+            repo_operations, pool)
+        operations = set([concurrent])
+
+        phlsys_scheduleunreliables._process_operations(
+            operations, phlsys_scheduleunreliables.make_timed_queue())
+
+        self.assertSetEqual(data, results)
+        self.assertSetEqual(set([concurrent]), operations)
+        self.assertEqual(
+            len(good_data), len(concurrent.active_operations()))
+
+    def test_G_ConcurrentPauseBadOperations(self):
+        results = []
+
+        def bad_do(s):
+            results.append(s)
+            raise Exception("bad_do")
+
+        def reportNothing(_):
+            pass
+
+        def makeOperation(s):
+            # expire immediately the first time, never retry after that
+            delays = [datetime.timedelta()]
+            return phlsys_scheduleunreliables.DelayedRetryNotifyOperation(
+                functools.partial(bad_do, s), delays, reportNothing)
+
+        data = [1, 2, 3]
+        pool = phlsys_scheduleunreliables.make_worker_pool(2)
+        concurrent = phlsys_scheduleunreliables.ConcurrentOperations(
+            [makeOperation(i) for i in data], pool)
+
+        self.assertTrue(concurrent.do())
+        self.assertEqual(0, len(concurrent.active_operations()))
+
+        # the paused operations should be resumed and tried once more
+        self.assertTrue(concurrent.do())
+        self.assertEqual(0, len(concurrent.active_operations()))
+        self.assertItemsEqual(data + data, results)
+
+        # the operations should have been dropped now
+        self.assertTrue(concurrent.do())
+        self.assertItemsEqual(data + data, results)
+
+    def test_H_Order(self):
+        results = []
+
+        def makeOperation(s):
+            return phlsys_scheduleunreliables.DelayedRetryNotifyOperation(
+                functools.partial(results.append, s), [])
+
+        # N.B. use enough operations that a set is unlikely to keep the order
+        data = range(100)
+        operations = [makeOperation(i) for i in data]
+        phlsys_scheduleunreliables.process_once(operations)
+        self.assertEqual(data, results)
+
 
 #------------------------------------------------------------------------------
 # Copyright (C) 2013-2014 Bloomberg Finance L.P.
@@ -0,0 +1,172 @@
+"""Durably store the state of long-running processes in a SQLite database.
+
+The state is organised into namespaces, each of which maps string keys to
+values which can be represented as JSON.  Changes are made in transactions so
+that the stored state is always consistent, even if the process is killed
+part way through writing it.
+
+Usage example:
+
+    >>> store = Store(':memory:')
+    >>> with store.transaction() as t:
+    ...     t.replace_namespace('fruit', {'apple': 1, 'banana': [2, 3]})
+    >>> store.get_namespace('fruit') == {'apple': 1, 'banana': [2, 3]}
+    True
+
+"""
+# =============================================================================
+# CONTENTS
+# -----------------------------------------------------------------------------
+# phlsys_statestore
+#
+# Public Classes:
+#   Store
+#    .get_namespace
+#    .transaction
+#    .close
+#
+# -----------------------------------------------------------------------------
+# (this contents block is generated, edits will be lost)
+# =============================================================================
+
+from __future__ import absolute_import
+
+import contextlib
+import json
+import sqlite3
+import threading
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS state (
+    namespace TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT NOT NULL,
+    PRIMARY KEY (namespace, key)
+)
+"""
+
+
+class Store(object):
+
+    def __init__(self, path):
+        """Open the store at 'path', creating it if it doesn't exist.
+
+        The store may be used from multiple threads, access is serialised.
+
+        :path: the string path of the database file, or ':memory:'
+        :returns: None
+
+        """
+        super(Store, self).__init__()
+        self._lock = threading.RLock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._connection:
+            self._connection.execute(_SCHEMA)
+
+    def get_namespace(self, namespace):
+        """Return a dict of all the keys and values in 'namespace'.
+
+        :namespace: the string name of the namespace
+        :returns: a dict of string keys to values, empty if there are none
+
+        """
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT key, value FROM state WHERE namespace = ?",
+                (namespace,)).fetchall()
+        return {key: json.loads(value) for key, value in rows}
+
+    @contextlib.contextmanager
+    def transaction(self):
+        """Return a context manager for a '_Transaction' on this store.
+
+        The changes made in the transaction are committed together when the
+        context is exited, or discarded if there is an exception.
+
+        :returns: a context manager yielding a '_Transaction'
+
+        """
+        with self._lock, self._connection:
+            yield _Transaction(self._connection)
+
+    def close(self):
+        """Close the store, it must not be used afterwards.
+
+        :returns: None
+
+        """
+        with self._lock:
+            self._connection.close()
+
+
+class _Transaction(object):
+
+    def __init__(self, connection):
+        super(_Transaction, self).__init__()
+        self._connection = connection
+
+    def set(self, namespace, key, value):
+        """Set 'key' in 'namespace' to 'value'.
+
+        :namespace: the string name of the namespace
+        :key: the string key
+        :value: a value which can be represented as JSON
+        :returns: None
+
+        """
+        self._connection.execute(
+            "INSERT OR REPLACE INTO state (namespace, key, value) "
+            "VALUES (?, ?, ?)",
+            (namespace, key, json.dumps(value)))
+
+    def discard(self, namespace, key):
+        """Remove 'key' from 'namespace' if it's there.
+
+        :namespace: the string name of the namespace
+        :key: the string key
+        :returns: None
+
+        """
+        self._connection.execute(
+            "DELETE FROM state WHERE namespace = ? AND key = ?",
+            (namespace, key))
+
+    def replace_namespace(self, namespace, key_to_value):
+        """Replace all the contents of 'namespace' with 'key_to_value'.
+
+        :namespace: the string name of the namespace
+        :key_to_value: a dict of string keys to values which can be
+                       represented as JSON
+        :returns: None
+
+        """
+        self._connection.execute(
+            "DELETE FROM state WHERE namespace = ?", (namespace,))
+        self._connection.executemany(
+            "INSERT INTO state (namespace, key, value) VALUES (?, ?, ?)",
+            ((namespace, key, json.dumps(value))
+             for key, value in key_to_value.iteritems()))
+
+
+#------------------------------------------------------------------------------
+# Copyright (C) 2013-2014 Bloomberg Finance L.P.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to
+# deal in the Software without restriction, including without limitation the
+# rights to use, copy, modify, merge, publish, distribute, sublicense, and/or
+# sell copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.  IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+# IN THE SOFTWARE.
+#------------------------------- END-OF-FILE ----------------------------------
@@ -0,0 +1,107 @@
+"""Test suite for phlsys_statestore."""
+#==============================================================================
+#                                   TEST PLAN
+#------------------------------------------------------------------------------
+# Here we detail the things we are concerned to test and specify which tests
+# cover those concerns.
+#
+# Concerns:
+# [ A] values can be set, replaced and discarded by namespace and key
+# [ A] namespaces are independent of each other
+# [ B] changes are discarded if the transaction raises
+# [ C] the state persists when the store is re-opened
+#------------------------------------------------------------------------------
+# Tests:
+# [ A] test_A_Breathing
+# [ B] test_B_Rollback
+# [ C] test_C_Persistence
+#==============================================================================
+
+from __future__ import absolute_import
+
+import os
+import unittest
+
+import phlsys_fs
+import phlsys_statestore
+
+
+class Test(unittest.TestCase):
+
+    def test_A_Breathing(self):
+        store = phlsys_statestore.Store(':memory:')
+        self.assertEqual(store.get_namespace('fruit'), {})
+
+        # [ A] values can be set, replaced and discarded by namespace and key
+        with store.transaction() as t:
+            t.set('fruit', 'apple', 1)
+            t.set('fruit', 'banana', {'bunch': [1, 2]})
+        self.assertEqual(
+            store.get_namespace('fruit'),
+            {'apple': 1, 'banana': {'bunch': [1, 2]}})
+
+        with store.transaction() as t:
+            t.set('fruit', 'apple', 2)
+            t.discard('fruit', 'banana')
+            t.discard('fruit', 'cherry')
+        self.assertEqual(store.get_namespace('fruit'), {'apple': 2})
+
+        # [ A] namespaces are independent of each other
+        with store.transaction() as t:
+            t.set('veg', 'carrot', 3)
+            t.replace_namespace('fruit', {'damson': 4})
+        self.assertEqual(store.get_namespace('fruit'), {'damson': 4})
+        self.assertEqual(store.get_namespace('veg'), {'carrot': 3})
+
+        store.close()
+
+    def test_B_Rollback(self):
+        store = phlsys_statestore.Store(':memory:')
+        with store.transaction() as t:
+            t.set('fruit', 'apple', 1)
+
+        # [ B] changes are discarded if the transaction raises
+        def replace_and_raise():
+            with store.transaction() as t:
+                t.replace_namespace('fruit', {'banana': 2})
+                raise RuntimeError()
+
+        self.assertRaises(RuntimeError, replace_and_raise)
+        self.assertEqual(store.get_namespace('fruit'), {'apple': 1})
+
+    def test_C_Persistence(self):
+        with phlsys_fs.tmpdir_context() as tmp_dir:
+            path = os.path.join(tmp_dir, 'state.sqlite')
+
+            # [ C] the state persists when the store is re-opened
+            store = phlsys_statestore.Store(path)
+            with store.transaction() as t:
+                t.set('fruit', 'apple', 1)
+            store.close()
+
+            store = phlsys_statestore.Store(path)
+            self.assertEqual(store.get_namespace('fruit'), {'apple': 1})
+            store.close()
+
+
+#------------------------------------------------------------------------------
+# Copyright (C) 2013-2014 Bloomberg Finance L.P.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to
+# deal in the Software without restriction, including without limitation the
+# rights to use, copy, modify, merge, publish, distribute, sublicense, and/or
+# sell copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.  IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+# IN THE SOFTWARE.
+#------------------------------- END-OF-FILE ----------------------------------
@@ -7,6 +7,7 @@
 # Public Classes:
 #   Error
 #   CalledProcessError
+#   OutputLimitExceededError
 #
 # Public Functions:
 #   run
@@ -24,6 +25,11 @@ from __future__ import absolute_import
 import collections
 import subprocess
 import sys
+import tempfile
+
+# the amount to read from a limited stdout at a time, this is also roughly how
+# much more than the output will be held in memory
+_READ_CHUNK_BYTES = 64 * 1024
 
 RunResult = collections.namedtuple(
     'phlsys_subprocess__RunResult',
@@ -65,6 +71,33 @@ class CalledProcessError(Error):
         super(CalledProcessError, self).__init__(self.msg)
 
 
+class OutputLimitExceededError(Error):
+
+    """Exception for called processes which output more than the limit.
+
+    The process is killed as soon as the limit is exceeded, so the full size of
+    the output is not known.
+
+    Attributes:
+        cmd        -- array, the command used to launch the subprocess
+        limit      -- int, the maximum allowed size of stdout in bytes
+        size_read  -- int, the number of bytes read before killing the process
+        workingdir -- string, the working directory of the command
+
+    """
+
+    def __init__(self, cmd, limit, size_read, workingdir):
+        self.cmd = cmd
+        self.limit = limit
+        self.size_read = size_read
+        self.workingdir = workingdir
+        self.msg = "cmd: {0}\n".format(" ".join(cmd))
+        if workingdir:
+            self.msg += "workingdir: {0}\n".format(workingdir)
+        self.msg += "stdout exceeded limit of {0} bytes\n".format(limit)
+        super(OutputLimitExceededError, self).__init__(self.msg)
+
+
 # def run(*args, workingDir=None): <-- supported in Python 3, use kwargs
 # for now
 def run(*args, **kwargs):
@@ -76,6 +109,11 @@ def run(*args, **kwargs):
     Raise a 'CalledProcessError' if the return code is not equal to
     zero; also echo extra information to stderr.
 
+    If 'maxStdoutBytes' is supplied then stdout is read incrementally and the
+    process is killed as soon as it outputs more than that.  In that case raise
+    an 'OutputLimitExceededError', having held little more than the limit in
+    memory.  Note that 'stdin' may not be supplied with 'maxStdoutBytes'.
+
     Usage examples:
         Echoing 'hello stdout' to stdout:
         >>> run('echo', 'hello stdout')
@@ -85,6 +123,16 @@ def run(*args, **kwargs):
         >>> run('sort', '-r', stdin='1\\n2\\n3')
         phlsys_subprocess__RunResult(stdout='3\\n2\\n1\\n', stderr='')
 
+        Limiting the size of stdout:
+        >>> run('echo', 'hello stdout', maxStdoutBytes=13)
+        phlsys_subprocess__RunResult(stdout='hello stdout\\n', stderr='')
+        >>> run('echo', 'hello stdout', maxStdoutBytes=12)
+        Traceback (most recent call last):
+            ...
+        OutputLimitExceededError: cmd: echo hello stdout
+        stdout exceeded limit of 12 bytes
+        <BLANKLINE>
+
     :*args: a tuple of strings corresponding to command-line arguments
     :**kwargs: keyword arguments corresponding to the special
     :returns: a RunResult corresponding to the output of the command
@@ -96,8 +144,14 @@ def run(*args, **kwargs):
     #       return the return value via the RunResult
     workingDir = kwargs.pop("workingDir", None)
     stdin = kwargs.pop("stdin", None)
+    maxStdoutBytes = kwargs.pop("maxStdoutBytes", None)
     assert not kwargs
     cmd = args
+
+    if maxStdoutBytes is not None:
+        assert stdin is None
+        return _run_limited(cmd, workingDir, maxStdoutBytes)
+
     try:
         p = subprocess.Popen(
             cmd,
@@ -128,6 +182,66 @@ def run(*args, **kwargs):
     return RunResult(stdout=out, stderr=err)
 
 
+def _run_limited(cmd, workingDir, maxStdoutBytes):
+    # N.B. send stderr to a file so that the process can't block on writing
+    #      it while we're only reading stdout.  Collect stdout in a file too,
+    #      reading it back in one go means that there's only ever one copy of
+    #      it in memory, whereas joining chunks or converting a buffer to a
+    #      string would briefly need two.
+    stdout_file = tempfile.TemporaryFile()
+    stderr_file = tempfile.TemporaryFile()
+    with stdout_file, stderr_file:
+        try:
+            p = subprocess.Popen(
+                cmd,
+                cwd=workingDir,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=stderr_file)
+        except OSError:
+            sys.stderr.write(
+                "OSError: unable to locate command: {0}\n".format(
+                    " ".join(cmd)))
+            raise
+
+        p.stdin.close()
+
+        size = 0
+        while True:
+            chunk = p.stdout.read(_READ_CHUNK_BYTES)
+            if not chunk:
+                break
+            stdout_file.write(chunk)
+            size += len(chunk)
+            if size > maxStdoutBytes:
+                p.stdout.close()
+                p.kill()
+                p.wait()
+                raise OutputLimitExceededError(
+                    cmd=cmd,
+                    limit=maxStdoutBytes,
+                    size_read=size,
+                    workingdir=workingDir)
+
+        p.stdout.close()
+        returncode = p.wait()
+        stderr_file.seek(0)
+        err = stderr_file.read()
+
+        stdout_file.seek(0)
+        out = stdout_file.read()
+
+    if (returncode != 0):
+        raise CalledProcessError(
+            cmd=cmd,
+            stdin=None,
+            stdout=out,
+            stderr=err,
+            exitcode=returncode,
+            workingdir=workingDir)
+    return RunResult(stdout=out, stderr=err)
+
+
 # XXX: doesn't handle quotes or backticks
 def run_commands(*commands):
     """Execute the command-line strings descripted by '*commands'.
@@ -74,6 +74,27 @@ class PhlsysSubprocessTests(unittest.TestCase):
             cmd)
         # self.assertTrue(cmd in stderr.out)
 
+    def test_run_limited(self):
+        "Limiting stdout - returns output within limit, raises over limit"
+        result = phlsys_subprocess.run(
+            "echo", "hello stdout", maxStdoutBytes=13)
+        expect = phlsys_subprocess.RunResult(
+            stdout="hello stdout\n", stderr='')
+        self.assertEqual(result, expect)
+
+        # 'yes' never stops, so this also checks that it's killed
+        self.assertRaises(
+            phlsys_subprocess.OutputLimitExceededError,
+            phlsys_subprocess.run,
+            "yes",
+            maxStdoutBytes=1024 * 1024)
+
+        self.assertRaises(
+            phlsys_subprocess.CalledProcessError,
+            phlsys_subprocess.run,
+            "false",
+            maxStdoutBytes=1)
+
 
 #------------------------------------------------------------------------------
 # Copyright (C) 2013-2014 Bloomberg Finance L.P.
@@ -0,0 +1,336 @@
+"""Record nested spans of work and write them as Chrome trace-event files.
+
+A 'Tracer' records when each span begins and ends on each thread, e.g. a repo
+being processed and the git and conduit calls made while doing so.  The spans
+are collected per cycle of work and each cycle is written to a JSON file in
+the Chrome trace-event format, which can be loaded in 'chrome://tracing' or
+other trace viewers to see the sequence and nesting of operations.
+
+To make it cheap enough to leave on, only a sample of cycles are recorded and
+the number of spans recorded per cycle and the number of files kept are
+limited.  When a cycle isn't sampled, beginning and ending spans does nothing.
+
+Usage example:
+
+    >>> tracer = Tracer(sample_rate=1)
+    >>> tracer.start_cycle()
+    >>> with tracer.span_context('repo', 'arcyd'):
+    ...     with tracer.span_context('fetch', 'git', {'remote': 'origin'}):
+    ...         pass
+    >>> trace = tracer.finish_cycle()
+    >>> [e['name'] for e in trace['traceEvents'] if e['ph'] == 'X']
+    ['fetch', 'repo']
+
+"""
+# =============================================================================
+# CONTENTS
+# -----------------------------------------------------------------------------
+# phlsys_tracer
+#
+# Public Classes:
+#   Tracer
+#    .is_sampling
+#    .start_cycle
+#    .finish_cycle
+#    .begin
+#    .end
+#    .span_context
+#
+# Public Functions:
+#   summarise
+#
+# Public Assignments:
+#   DEFAULT_MAX_EVENTS
+#   DEFAULT_MAX_FILES
+#
+# -----------------------------------------------------------------------------
+# (this contents block is generated, edits will be lost)
+# =============================================================================
+
+from __future__ import absolute_import
+
+import contextlib
+import datetime
+import json
+import os
+import random
+import threading
+import time
+
+import phlsys_fs
+
+# the maximum number of spans to record per cycle, spans begun after that are
+# dropped so that the outer spans of a capped trace are still recorded
+DEFAULT_MAX_EVENTS = 20000
+
+# the maximum number of trace files to keep, the oldest are removed
+DEFAULT_MAX_FILES = 10
+
+_FILE_PREFIX = 'trace.'
+_FILE_SUFFIX = '.json'
+
+_DEFAULT_MAX_SUMMARY_LENGTH = 80
+
+
+class Tracer(object):
+
+    def __init__(
+            self,
+            sample_rate,
+            output_dir=None,
+            max_events=DEFAULT_MAX_EVENTS,
+            max_files=DEFAULT_MAX_FILES):
+        """Initialise a new Tracer, not recording until 'start_cycle'.
+
+        :sample_rate: the fraction of cycles to record, from 0 to 1
+        :output_dir: the string path of the dir to write traces to, or None
+        :max_events: the maximum number of spans to record per cycle
+        :max_files: the maximum number of trace files to keep in 'output_dir'
+        :returns: None
+
+        """
+        super(Tracer, self).__init__()
+        assert 0 <= sample_rate <= 1
+        assert max_events > 0
+        assert max_files > 0
+        self._sample_rate = sample_rate
+        self._output_dir = output_dir
+        self._max_events = max_events
+        self._max_files = max_files
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._pid = os.getpid()
+
+        # a new object for each sampled cycle, so that spans begun in an
+        # earlier cycle can be recognised and ignored, None if not sampling
+        self._cycle = None
+        self._events = []
+        self._thread_names = {}
+        self._begun_count = 0
+        self._dropped_count = 0
+
+    @property
+    def is_sampling(self):
+        """True if the current cycle is being recorded."""
+        return self._cycle is not None
+
+    def start_cycle(self):
+        """Start a new cycle, discarding any unfinished one.
+
+        :returns: None
+
+        """
+        is_sampled = random.random() < self._sample_rate
+        with self._lock:
+            self._cycle = object() if is_sampled else None
+            self._events = []
+            self._thread_names = {}
+            self._begun_count = 0
+            self._dropped_count = 0
+
+    def finish_cycle(self):
+        """Finish the current cycle and return its trace, or None.
+
+        If the cycle was sampled and an 'output_dir' was supplied then the
+        trace is also written to a new file there.
+
+        :returns: a dict in the Chrome trace-event format, or None
+
+        """
+        with self._lock:
+            if self._cycle is None:
+                return None
+            self._cycle = None
+            events = self._events
+            thread_names = self._thread_names
+            dropped_count = self._dropped_count
+            self._events = []
+            self._thread_names = {}
+
+        metadata = [
+            {
+                'name': 'thread_name',
+                'ph': 'M',
+                'pid': self._pid,
+                'tid': tid,
+                'args': {'name': name},
+            }
+            for tid, name in thread_names.iteritems()
+        ]
+
+        trace = {
+            'traceEvents': metadata + events,
+            'displayTimeUnit': 'ms',
+            'otherData': {'droppedEvents': dropped_count},
+        }
+
+        if self._output_dir is not None:
+            self._write(trace)
+
+        return trace
+
+    def begin(self, name, category, args=None):
+        """Begin a span on the current thread and return it, or None.
+
+        Spans must be ended on the same thread that began them.  Once the
+        maximum number of spans have been begun in a cycle, no more are begun
+        and None is returned.  Spans which have begun are always recorded, so
+        a capped trace keeps the spans which enclose the recorded ones.
+
+        :name: the string name of the span, e.g. 'fetch'
+        :category: the string category of the span, e.g. 'git'
+        :args: a dict of string names to values to show with the span, or None
+        :returns: an opaque span to pass to 'end', or None if not recording
+
+        """
+        cycle = self._cycle
+        if cycle is None:
+            return None
+        with self._lock:
+            if cycle is not self._cycle:
+                return None
+            if self._begun_count >= self._max_events:
+                self._dropped_count += 1
+                return None
+            self._begun_count += 1
+        span = _Span(cycle, name, category, args, _now_microseconds())
+        self._get_stack().append(span)
+        return span
+
+    def end(self, span):
+        """End 'span' and any spans begun after it on the current thread.
+
+        :span: a span returned by 'begin', or None
+        :returns: None
+
+        """
+        if span is None:
+            return
+        stack = self._get_stack()
+        if span not in stack:
+            return
+        now = _now_microseconds()
+        thread = threading.current_thread()
+        while stack:
+            s = stack.pop()
+            self._record(s, now, thread)
+            if s is span:
+                break
+
+    @contextlib.contextmanager
+    def span_context(self, name, category, args=None):
+        """Return a context manager which records a span around its block.
+
+        :name: the string name of the span, e.g. 'fetch'
+        :category: the string category of the span, e.g. 'git'
+        :args: a dict of string names to values to show with the span, or None
+        :returns: a context manager
+
+        """
+        span = self.begin(name, category, args)
+        try:
+            yield
+        finally:
+            self.end(span)
+
+    def _get_stack(self):
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = []
+            self._local.stack = stack
+        return stack
+
+    def _record(self, span, end_time, thread):
+        event = {
+            'name': span.name,
+            'cat': span.category,
+            'ph': 'X',
+            'ts': span.start_time,
+            'dur': end_time - span.start_time,
+            'pid': self._pid,
+            'tid': thread.ident,
+        }
+        if span.args:
+            event['args'] = span.args
+        with self._lock:
+            if span.cycle is not self._cycle:
+                return
+            self._events.append(event)
+            self._thread_names[thread.ident] = thread.name
+
+    def _write(self, trace):
+        if not os.path.isdir(self._output_dir):
+            os.makedirs(self._output_dir)
+
+        timestamp = datetime.datetime.utcnow().strftime('%Y%m%d-%H%M%S-%f')
+        path = os.path.join(
+            self._output_dir, _FILE_PREFIX + timestamp + _FILE_SUFFIX)
+        with phlsys_fs.write_file_atomic_context(path) as f:
+            json.dump(trace, f)
+
+        # N.B. the timestamps sort in the order they were written
+        filenames = sorted(
+            f for f in os.listdir(self._output_dir)
+            if f.startswith(_FILE_PREFIX) and f.endswith(_FILE_SUFFIX))
+        for filename in filenames[:-self._max_files]:
+            os.remove(os.path.join(self._output_dir, filename))
+
+
+class _Span(object):
+
+    def __init__(self, cycle, name, category, args, start_time):
+        super(_Span, self).__init__()
+        self.cycle = cycle
+        self.name = name
+        self.category = category
+        self.args = args
+        self.start_time = start_time
+
+
+def summarise(value, max_length=_DEFAULT_MAX_SUMMARY_LENGTH):
+    """Return a short string describing 'value', for the args of a span.
+
+        >>> summarise('origin')
+        "'origin'"
+        >>> summarise(range(100), max_length=10)
+        '[0, 1, ...'
+
+    :value: any value
+    :max_length: the maximum length of the string to return
+    :returns: a string
+
+    """
+    try:
+        text = repr(value)
+    except Exception:
+        text = '<' + type(value).__name__ + '>'
+    if len(text) > max_length:
+        text = text[:max_length - 3] + '...'
+    return text
+
+
+def _now_microseconds():
+    return int(time.time() * 1000000)
+
+
+#------------------------------------------------------------------------------
+# Copyright (C) 2013-2014 Bloomberg Finance L.P.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to
+# deal in the Software without restriction, including without limitation the
+# rights to use, copy, modify, merge, publish, distribute, sublicense, and/or
+# sell copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.  IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+# IN THE SOFTWARE.
+#------------------------------- END-OF-FILE ----------------------------------
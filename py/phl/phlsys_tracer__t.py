@@ -0,0 +1,129 @@
+"""Test suite for phlsys_tracer."""
+#==============================================================================
+#                                   TEST PLAN
+#------------------------------------------------------------------------------
+# Here we detail the things we are concerned to test and specify which tests
+# cover those concerns.
+#
+# Concerns:
+# [ A] spans are recorded with their nesting and arguments
+# [ A] spans left open are ended with their parent
+# [ B] nothing is recorded for cycles which aren't sampled
+# [ C] spans beyond the maximum are dropped and counted
+# [ C] the outer spans of a capped trace are still recorded
+# [ D] traces are written as files and only the newest are kept
+#------------------------------------------------------------------------------
+# Tests:
+# [ A] test_A_Breathing
+# [ B] test_B_Sampling
+# [ C] test_C_MaxEvents
+# [ D] test_D_Files
+#==============================================================================
+
+from __future__ import absolute_import
+
+import json
+import os
+import unittest
+
+import phlsys_fs
+
+import phlsys_tracer
+
+
+def _spans(trace):
+    return [e for e in trace['traceEvents'] if e['ph'] == 'X']
+
+
+class Test(unittest.TestCase):
+
+    def test_A_Breathing(self):
+        tracer = phlsys_tracer.Tracer(sample_rate=1)
+        tracer.start_cycle()
+        self.assertTrue(tracer.is_sampling)
+
+        repo = tracer.begin('repo', 'arcyd')
+        with tracer.span_context('fetch', 'git', {'remote': 'origin'}):
+            pass
+        tracer.begin('branch', 'arcyd')
+        tracer.end(repo)
+
+        trace = tracer.finish_cycle()
+        self.assertFalse(tracer.is_sampling)
+
+        spans = _spans(trace)
+        self.assertEqual(
+            [s['name'] for s in spans], ['fetch', 'branch', 'repo'])
+        fetch, branch, repo = spans
+        self.assertEqual(fetch['args'], {'remote': 'origin'})
+        self.assertEqual(fetch['cat'], 'git')
+        self.assertLessEqual(repo['ts'], fetch['ts'])
+        self.assertGreaterEqual(
+            repo['ts'] + repo['dur'], branch['ts'] + branch['dur'])
+
+    def test_B_Sampling(self):
+        tracer = phlsys_tracer.Tracer(sample_rate=0)
+        tracer.start_cycle()
+        self.assertFalse(tracer.is_sampling)
+        span = tracer.begin('repo', 'arcyd')
+        self.assertIsNone(span)
+        tracer.end(span)
+        self.assertIsNone(tracer.finish_cycle())
+
+    def test_C_MaxEvents(self):
+        tracer = phlsys_tracer.Tracer(sample_rate=1, max_events=2)
+        tracer.start_cycle()
+        for _ in xrange(5):
+            with tracer.span_context('fetch', 'git'):
+                pass
+        trace = tracer.finish_cycle()
+        self.assertEqual(len(_spans(trace)), 2)
+        self.assertEqual(trace['otherData']['droppedEvents'], 3)
+
+        tracer.start_cycle()
+        with tracer.span_context('repo', 'arcyd'):
+            for _ in xrange(5):
+                with tracer.span_context('fetch', 'git'):
+                    pass
+        trace = tracer.finish_cycle()
+        self.assertListEqual(
+            [s['name'] for s in _spans(trace)], ['fetch', 'repo'])
+        self.assertEqual(trace['otherData']['droppedEvents'], 4)
+
+    def test_D_Files(self):
+        with phlsys_fs.chtmpdir_context():
+            tracer = phlsys_tracer.Tracer(
+                sample_rate=1, output_dir='traces', max_files=2)
+            for _ in xrange(3):
+                tracer.start_cycle()
+                with tracer.span_context('fetch', 'git'):
+                    pass
+                trace = tracer.finish_cycle()
+
+            filenames = sorted(os.listdir('traces'))
+            self.assertEqual(len(filenames), 2)
+            with open(os.path.join('traces', filenames[-1])) as f:
+                self.assertEqual(json.load(f), trace)
+
+
+#------------------------------------------------------------------------------
+# Copyright (C) 2013-2014 Bloomberg Finance L.P.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to
+# deal in the Software without restriction, including without limitation the
+# rights to use, copy, modify, merge, publish, distribute, sublicense, and/or
+# sell copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.  IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+# IN THE SOFTWARE.
+#------------------------------- END-OF-FILE ----------------------------------
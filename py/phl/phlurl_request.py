@@ -12,11 +12,13 @@
 #   split_url
 #   group_urls
 #   get_many
+#   hash_many_if_modified
 #   get
 #
 # Public Assignments:
 #   SplitUrlResult
 #   GroupUrlResult
+#   HashResult
 #
 # -----------------------------------------------------------------------------
 # (this contents block is generated, edits will be lost)
@@ -24,12 +26,22 @@
 from __future__ import absolute_import
 
 import collections
+import hashlib
 import httplib
+import multiprocessing.pool
+import sys
 import traceback
 import urlparse
 
 _HTTPLIB_TIMEOUT = 600
 
+# the number of hosts to make requests to at the same time in
+# 'hash_many_if_modified', each host has a single connection
+_DEFAULT_MAX_HOSTS_IN_FLIGHT = 8
+
+# the number of bytes to read at a time when hashing a response
+_HASH_CHUNK_SIZE = 64 * 1024
+
 
 def join_url(base_url, leaf):
     """Return the result of joining two parts of a url together.
@@ -58,6 +70,10 @@ GroupUrlResult = collections.namedtuple(
     'phlurl_request__GroupUrlResult',
     ['http', 'https'])
 
+HashResult = collections.namedtuple(
+    'phlurl_request__HashResult',
+    ['hash_hexdigest', 'etag', 'last_modified'])
+
 
 class Error(Exception):
     pass
@@ -148,22 +164,66 @@ def group_urls(url_list):
     return GroupUrlResult(http=http_requests, https=https_requests)
 
 
+def _make_error(verb, url, exception):
+    tb = traceback.format_exc()
+    message = """Was trying to {verb} the url {url}.
+
+This exception was triggered from this original exception:
+    {exception}
+
+Here is the original traceback:
+{traceback}
+    """.format(verb=verb, url=url, exception=repr(exception), traceback=tb)
+    return Error(message.strip())
+
+
 def _request(connection, verb, path, url):
     try:
         connection.request(verb, path)
         content = connection.getresponse().read()
         return content
     except Exception as e:
-        tb = traceback.format_exc()
-        message = """Was trying to {verb} the url {url}.
+        raise _make_error(verb, url, e)
 
-This exception was triggered from this original exception:
-    {exception}
 
-Here is the original traceback:
-{traceback}
-        """.format(verb=verb, url=url, exception=repr(e), traceback=tb).strip()
-        raise Error(message)
+def _hash_if_modified(connection, path, url, validators):
+    # return a HashResult for 'url', or None if it wasn't modified
+    headers = {}
+    if validators is not None:
+        etag, last_modified = validators
+        if etag is not None:
+            headers['If-None-Match'] = etag
+        if last_modified is not None:
+            headers['If-Modified-Since'] = last_modified
+
+    try:
+        connection.request('GET', path, headers=headers)
+        response = connection.getresponse()
+
+        # N.B. the response must be read completely before the connection
+        #      can be used again, even if we aren't interested in the body
+        sha1 = hashlib.sha1()
+        chunk = response.read(_HASH_CHUNK_SIZE)
+        while chunk:
+            sha1.update(chunk)
+            chunk = response.read(_HASH_CHUNK_SIZE)
+    except Exception as e:
+        raise _make_error('GET', url, e)
+
+    if response.status == httplib.NOT_MODIFIED:
+        return None
+
+    # N.B. hash the body of unsuccessful responses too, like 'get' does, so
+    #      that a url which starts failing counts as changed rather than
+    #      stopping the others from being checked.  Only remember validators
+    #      from successful responses though, they may not apply to others.
+    if response.status != httplib.OK:
+        return HashResult(sha1.hexdigest(), None, None)
+
+    return HashResult(
+        sha1.hexdigest(),
+        response.getheader('ETag'),
+        response.getheader('Last-Modified'))
 
 
 def get_many(url_list):
@@ -196,6 +256,74 @@ def get_many(url_list):
     return results
 
 
+def hash_many_if_modified(
+        url_to_validators, max_hosts_in_flight=_DEFAULT_MAX_HOSTS_IN_FLIGHT):
+    """Return a dict of {url: HashResult} for the urls that were modified.
+
+    The 'validators' of each url are an (etag, last_modified) tuple from a
+    previous HashResult for it, or None.  Urls which the server says haven't
+    been modified since then are left out of the returned dict.  The bodies
+    of other unsuccessful responses are hashed like successful ones, as
+    'get' returns them.
+
+    The response bodies are hashed as they are read, so they needn't fit in
+    memory.  A single connection is re-used for all the urls of each host,
+    up to 'max_hosts_in_flight' hosts are requested at the same time.
+
+    If any of the requests can't be made, e.g. the host can't be reached,
+    then the exception of the first of those is raised, after all of the
+    hosts have finished.
+
+    :url_to_validators: a dict of string url to (etag, last_modified) or None
+    :max_hosts_in_flight: the maximum number of hosts to request at once
+    :returns: a dict of string url to HashResult
+
+    """
+    urls = group_urls(url_to_validators.keys())
+    host_requests = []
+    for host_port, request_list in urls.http.iteritems():
+        host_requests.append(
+            (httplib.HTTPConnection, host_port, request_list))
+    for host_port, request_list in urls.https.iteritems():
+        host_requests.append(
+            (httplib.HTTPSConnection, host_port, request_list))
+
+    def hash_host(host_request):
+        connection_type, host_port, request_list = host_request
+        connection = connection_type(
+            host_port[0], host_port[1], timeout=_HTTPLIB_TIMEOUT)
+        try:
+            return [
+                (url, _hash_if_modified(
+                    connection, path, url, url_to_validators[url]))
+                for path, url in request_list
+            ], None
+        except Exception:
+            return None, sys.exc_info()
+        finally:
+            connection.close()
+
+    if max_hosts_in_flight <= 1 or len(host_requests) <= 1:
+        outcomes = [hash_host(r) for r in host_requests]
+    else:
+        pool = multiprocessing.pool.ThreadPool(
+            min(max_hosts_in_flight, len(host_requests)))
+        try:
+            outcomes = pool.map(hash_host, host_requests, chunksize=1)
+        finally:
+            pool.close()
+            pool.join()
+
+    results = {}
+    for url_results, exc_info in outcomes:
+        if exc_info is not None:
+            raise exc_info[0], exc_info[1], exc_info[2]
+        for url, result in url_results:
+            if result is not None:
+                results[url] = result
+    return results
+
+
 def get(url):
     """Return the content of the supplied url.
 
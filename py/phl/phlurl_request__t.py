@@ -0,0 +1,183 @@
+"""Test suite for phlurl_request."""
+#==============================================================================
+#                                   TEST PLAN
+#------------------------------------------------------------------------------
+# Here we detail the things we are concerned to test and specify which tests
+# cover those concerns.
+#
+# Concerns:
+# [ A] hash_many_if_modified returns the hash and validators of each url
+# [ A] hash_many_if_modified works with urls on several hosts
+# [ B] urls which haven't changed since their etag are left out
+# [ B] urls which haven't changed since their last-modified are left out
+# [ B] urls without validators are always returned
+# [ C] unsuccessful responses are hashed, without validators
+# [ C] requests which can't be made raise 'Error'
+#------------------------------------------------------------------------------
+# Tests:
+# [ A] test_A_Breathing
+# [ B] test_B_NotModified
+# [ C] test_C_Error
+#==============================================================================
+
+from __future__ import absolute_import
+
+import BaseHTTPServer
+import contextlib
+import hashlib
+import SocketServer
+import threading
+import unittest
+
+import phlurl_request
+
+_LAST_MODIFIED = 'Wed, 01 Jan 2014 00:00:00 GMT'
+
+
+class _Handler(BaseHTTPServer.BaseHTTPRequestHandler):
+
+    protocol_version = 'HTTP/1.1'
+
+    # buffer the response so that it isn't dribbled out in separate packets
+    wbufsize = -1
+
+    def do_GET(self):
+        if self.path == '/missing':
+            self._send(404, 'missing', {'ETag': '"missing"'})
+            return
+
+        # the content is large enough to be read in several chunks
+        content = self.path * 100000
+        etag = '"{}"'.format(hashlib.sha1(content).hexdigest())
+        headers = {}
+        if self.path.startswith('/etag'):
+            headers['ETag'] = etag
+            if self.headers.getheader('If-None-Match') == etag:
+                self._send(304, '', headers)
+                return
+        elif self.path.startswith('/lastmod'):
+            headers['Last-Modified'] = _LAST_MODIFIED
+            if self.headers.getheader('If-Modified-Since') == _LAST_MODIFIED:
+                self._send(304, '', headers)
+                return
+
+        self._send(200, content, headers)
+
+    def _send(self, status, content, headers):
+        self.send_response(status)
+        for name, value in headers.iteritems():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, *args):
+        pass
+
+
+class _Server(SocketServer.ThreadingMixIn, BaseHTTPServer.HTTPServer):
+
+    # don't wait for idle keep-alive connections when shutting down
+    daemon_threads = True
+
+
+@contextlib.contextmanager
+def _server_context():
+    server = _Server(('127.0.0.1', 0), _Handler)
+    thread = threading.Thread(target=server.serve_forever)
+    thread.daemon = True
+    thread.start()
+    try:
+        yield 'http://127.0.0.1:{}'.format(server.server_address[1])
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def _sha1(path):
+    return hashlib.sha1(path * 100000).hexdigest()
+
+
+class Test(unittest.TestCase):
+
+    def test_A_Breathing(self):
+        with _server_context() as url1, _server_context() as url2:
+            urls = [
+                url1 + '/etag', url1 + '/lastmod', url1 + '/plain',
+                url2 + '/etag', url2 + '/plain',
+            ]
+            results = phlurl_request.hash_many_if_modified(
+                {url: None for url in urls})
+
+            self.assertEqual(set(results), set(urls))
+            for url in urls:
+                path = phlurl_request.split_url(url).path
+                self.assertEqual(results[url].hash_hexdigest, _sha1(path))
+
+            self.assertEqual(
+                results[url1 + '/etag'].etag, '"{}"'.format(_sha1('/etag')))
+            self.assertIsNone(results[url1 + '/etag'].last_modified)
+            self.assertEqual(
+                results[url1 + '/lastmod'].last_modified, _LAST_MODIFIED)
+            self.assertIsNone(results[url1 + '/plain'].etag)
+
+            # the results are the same when requesting one host at a time
+            self.assertEqual(
+                results,
+                phlurl_request.hash_many_if_modified(
+                    {url: None for url in urls}, max_hosts_in_flight=1))
+
+    def test_B_NotModified(self):
+        with _server_context() as url:
+            urls = [url + '/etag', url + '/lastmod', url + '/plain']
+            results = phlurl_request.hash_many_if_modified(
+                {u: None for u in urls})
+
+            url_to_validators = {
+                u: (r.etag, r.last_modified) for u, r in results.iteritems()
+            }
+            results = phlurl_request.hash_many_if_modified(url_to_validators)
+            self.assertEqual(set(results), set([url + '/plain']))
+
+            # validators which are out of date don't prevent the response
+            url_to_validators[url + '/etag'] = ('"out of date"', None)
+            results = phlurl_request.hash_many_if_modified(url_to_validators)
+            self.assertEqual(
+                set(results), set([url + '/etag', url + '/plain']))
+
+    def test_C_Error(self):
+        with _server_context() as url:
+            missing = url + '/missing'
+            results = phlurl_request.hash_many_if_modified(
+                {url + '/plain': None, missing: ('"missing"', None)})
+            self.assertEqual(
+                results[missing],
+                phlurl_request.HashResult(
+                    hashlib.sha1('missing').hexdigest(), None, None))
+
+        # the server has gone away now
+        with self.assertRaises(phlurl_request.Error):
+            phlurl_request.hash_many_if_modified({url + '/plain': None})
+
+
+#------------------------------------------------------------------------------
+# Copyright (C) 2013-2014 Bloomberg Finance L.P.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to
+# deal in the Software without restriction, including without limitation the
+# rights to use, copy, modify, merge, publish, distribute, sublicense, and/or
+# sell copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.  IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+# IN THE SOFTWARE.
+#------------------------------- END-OF-FILE ----------------------------------
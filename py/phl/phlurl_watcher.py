@@ -6,10 +6,13 @@
 #
 # Public Classes:
 #   Watcher
+#    .is_dirty
 #    .has_url_recently_changed
 #    .refresh
 #    .load
 #    .dump
+#    .load_dict
+#    .dump_dict
 #
 # -----------------------------------------------------------------------------
 # (this contents block is generated, edits will be lost)
@@ -24,9 +27,12 @@ import json
 import phlurl_request
 
 
-_HashHexdigestHasChanged = collections.namedtuple(
-    'phlurl_watcher__HashValueHasChanged',
-    ['hash_hexdigest', 'has_changed'])
+# N.B. 'etag' and 'last_modified' are the validators from the last response,
+#      they're None if the server didn't supply them.  Results saved by
+#      older versions only have 'hash_hexdigest' and 'has_changed'.
+_Result = collections.namedtuple(
+    'phlurl_watcher__Result',
+    ['hash_hexdigest', 'has_changed', 'etag', 'last_modified'])
 
 
 class Watcher(object):
@@ -34,47 +40,59 @@ class Watcher(object):
     def __init__(self, request_func=None):
         super(Watcher, self).__init__()
         self._results = {}
+        self._is_dirty = False
         self._request_func = request_func
         if self._request_func is None:
             self._request_func = phlurl_request.get
 
+    @property
+    def is_dirty(self):
+        """True if the data has changed since it was last loaded or dumped."""
+        return self._is_dirty
+
     def has_url_recently_changed(self, url):
         if url in self._results:
             old_result = self._results[url].has_changed
             if old_result:
-                hash_hexdigest = self._results[url].hash_hexdigest
-                self._results[url] = _HashHexdigestHasChanged(
-                    hash_hexdigest, False)
+                self._results[url] = self._results[url]._replace(
+                    has_changed=False)
+                self._is_dirty = True
             return old_result
         content = self._request_func(url)
         # pylint: disable=E1101
-        self._results[url] = _HashHexdigestHasChanged(
-            hashlib.sha1(content).hexdigest(), False)
+        self._results[url] = _Result(
+            hashlib.sha1(content).hexdigest(), False, None, None)
         # pylint: enable=E1101
+        self._is_dirty = True
         return True
 
     def refresh(self):
         # XXX: it's safe to refresh multiple times - the 'has changed' flag
         #      is only consumed on 'has_url_recently_changed'
-        url_contents = phlurl_request.get_many(self._results.keys())
-        for url, contents in url_contents.iteritems():
+        #
+        # N.B. urls which the servers say haven't been modified since the
+        #      last refresh aren't returned, so they're left as they are
+        url_to_validators = dict(
+            (url, (result.etag, result.last_modified))
+            for url, result in self._results.iteritems())
+        url_hashes = phlurl_request.hash_many_if_modified(url_to_validators)
+        for url, hash_result in url_hashes.iteritems():
             old_result = self._results[url]
 
-            # Note that hash objects can't be compared directly so we much
-            # first convert them to a representation that can be compared, in
-            # this case we've chosen the hexdigest.
-            #
-            # Note that if you do try to compare hash objects then it seems to
-            # do the 'is' comparison rather than 'is equal to'
-            #
-            # pylint: disable=E1101
-            new_hash = hashlib.sha1(contents).hexdigest()
-            # pylint: enable=E1101
+            # Note that hash objects can't be compared directly so we compare
+            # the hexdigests instead, as returned by the request.
+            new_hash = hash_result.hash_hexdigest
             old_hash = old_result.hash_hexdigest
             has_changed = old_result.has_changed or (new_hash != old_hash)
 
-            self._results[url] = _HashHexdigestHasChanged(
-                new_hash, has_changed)
+            new_result = _Result(
+                new_hash,
+                has_changed,
+                hash_result.etag,
+                hash_result.last_modified)
+            if new_result != old_result:
+                self._results[url] = new_result
+                self._is_dirty = True
 
     def load(self, f):
         """Load data from the supplied file pointer, overwriting existing data.
@@ -85,7 +103,8 @@ class Watcher(object):
         """
         results = json.load(f)
         self._results = dict(
-            (k, _HashHexdigestHasChanged(*v)) for k, v in results.iteritems())
+            (k, _result_from_list(v)) for k, v in results.iteritems())
+        self._is_dirty = False
 
     def dump(self, f):
         """Dump data to the supplied file pointer.
@@ -95,6 +114,35 @@ class Watcher(object):
 
         """
         json.dump(self._results, f)
+        self._is_dirty = False
+
+    def load_dict(self, url_to_result):
+        """Load data from the supplied dict, overwriting existing data.
+
+        :url_to_result: a dict as returned by 'dump_dict'
+        :returns: None
+
+        """
+        self._results = dict(
+            (k, _result_from_list(v)) for k, v in url_to_result.iteritems())
+        self._is_dirty = False
+
+    def dump_dict(self):
+        """Return a dict of the data which can be made into JSON.
+
+        The data is then considered saved, 'is_dirty' will be False.
+
+        :returns: a dict of string url to result
+
+        """
+        self._is_dirty = False
+        return dict((k, list(v)) for k, v in self._results.iteritems())
+
+
+def _result_from_list(result_list):
+    # pad results saved by older versions, which lack the validators
+    padding = [None] * (len(_Result._fields) - len(result_list))
+    return _Result(*(list(result_list) + padding))
 
 
 #------------------------------------------------------------------------------
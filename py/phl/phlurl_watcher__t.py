@@ -8,9 +8,12 @@
 # Concerns:
 # [ A] can dump and load again from empty watcher
 # [ A] can dump and load again from watcher with one element
+# [ B] watcher is dirty after a new url is seen or a change is consumed
+# [ B] watcher is not dirty after dumping or loading
 #------------------------------------------------------------------------------
 # Tests:
 # [ A] test_A_Breathing
+# [ B] test_B_DirtyFlag
 #==============================================================================
 
 from __future__ import absolute_import
@@ -54,6 +57,31 @@ class Test(unittest.TestCase):
 
             self.assertFalse(watcher.has_url_recently_changed('http://z.com'))
 
+    def test_B_DirtyFlag(self):
+
+        watcher = phlurl_watcher.Watcher(lambda url: url)
+        self.assertFalse(watcher.is_dirty)
+
+        self.assertTrue(watcher.has_url_recently_changed('http://z.com'))
+        self.assertTrue(watcher.is_dirty)
+
+        url_to_result = watcher.dump_dict()
+        self.assertFalse(watcher.is_dirty)
+
+        # asking about a url which hasn't changed doesn't change anything
+        self.assertFalse(watcher.has_url_recently_changed('http://z.com'))
+        self.assertFalse(watcher.is_dirty)
+
+        # consuming a change does
+        url_to_result['http://z.com'][1] = True
+        watcher.load_dict(url_to_result)
+        self.assertFalse(watcher.is_dirty)
+        self.assertTrue(watcher.has_url_recently_changed('http://z.com'))
+        self.assertTrue(watcher.is_dirty)
+
+        watcher.dump_dict()
+        self.assertFalse(watcher.is_dirty)
+
 
 #------------------------------------------------------------------------------
 # Copyright (C) 2013-2014 Bloomberg Finance L.P.
@@ -0,0 +1,124 @@
+"""Compare conduit calls per second with and without connection pooling.
+
+A local HTTP server stands in for Phabricator, so the numbers only reflect
+the connection overhead on loopback, over a real network and with TLS the
+difference is much larger.
+
+usage: python conduitpool.py [NUM_CALLS]
+
+"""
+import BaseHTTPServer
+import contextlib
+import json
+import os
+import SocketServer
+import sys
+import threading
+import timeit
+
+# append our module dirs to sys.path, which is the list of paths to search
+# for modules this is so we can import our libraries directly
+# N.B. this magic is only really passable up-front in the entrypoint module
+PARENT_DIR = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+BASE_DIR = os.path.dirname(PARENT_DIR)
+sys.path.append(os.path.join(BASE_DIR, "py", "phl"))
+
+import phlsys_conduit  # NOQA
+import phlsys_httpconnectionpool  # NOQA
+
+_RESPONSE = json.dumps({
+    'result': 'pong',
+    'error_code': None,
+    'error_info': None,
+})
+
+
+class _Handler(BaseHTTPServer.BaseHTTPRequestHandler):
+
+    protocol_version = 'HTTP/1.1'
+
+    # buffer the response so that it isn't dribbled out in separate packets
+    wbufsize = -1
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.getheader('Content-Length')))
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(_RESPONSE)))
+        self.end_headers()
+        self.wfile.write(_RESPONSE)
+
+    def log_message(self, *args):
+        pass
+
+
+class _Server(SocketServer.ThreadingMixIn, BaseHTTPServer.HTTPServer):
+    daemon_threads = True
+
+
+@contextlib.contextmanager
+def server_context():
+    server = _Server(('127.0.0.1', 0), _Handler)
+    thread = threading.Thread(target=server.serve_forever)
+    thread.daemon = True
+    thread.start()
+    try:
+        yield 'http://127.0.0.1:{}/api/'.format(server.server_address[1])
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def calls_per_sec(uri, pool, num_calls):
+    conduit = phlsys_conduit.Conduit(uri, connection_pool=pool)
+    timer = timeit.default_timer
+    start = timer()
+    for _ in xrange(num_calls):
+        assert conduit.ping() == 'pong'
+    elapsed = timer() - start
+    pool.close()
+    return num_calls / elapsed, pool.connect_count
+
+
+def main():
+    num_calls = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    with server_context() as uri:
+        unpooled, unpooled_connects = calls_per_sec(
+            uri,
+            phlsys_httpconnectionpool.Pool(max_idle_per_key=0),
+            num_calls)
+        pooled, pooled_connects = calls_per_sec(
+            uri, phlsys_httpconnectionpool.Pool(), num_calls)
+
+    print "unpooled: {:8.1f} calls/sec ({} connections)".format(
+        unpooled, unpooled_connects)
+    print "pooled:   {:8.1f} calls/sec ({} connections)".format(
+        pooled, pooled_connects)
+    print "speedup:  {:8.1f}x".format(pooled / unpooled)
+
+
+if __name__ == "__main__":
+    main()
+
+
+#------------------------------------------------------------------------------
+# Copyright (C) 2013-2014 Bloomberg Finance L.P.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to
+# deal in the Software without restriction, including without limitation the
+# rights to use, copy, modify, merge, publish, distribute, sublicense, and/or
+# sell copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.  IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+# IN THE SOFTWARE.
+#------------------------------- END-OF-FILE ----------------------------------
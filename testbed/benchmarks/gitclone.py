@@ -0,0 +1,83 @@
+"""Compare lookups per second of phlsys_git.GitClone and BatchGitClone.
+
+usage: python gitclone.py [NUM_COMMITS]
+
+"""
+import contextlib
+import os
+import sys
+import timeit
+
+# append our module dirs to sys.path, which is the list of paths to search
+# for modules this is so we can import our libraries directly
+# N.B. this magic is only really passable up-front in the entrypoint module
+PARENT_DIR = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+BASE_DIR = os.path.dirname(PARENT_DIR)
+sys.path.append(os.path.join(BASE_DIR, "py", "phl"))
+
+import phlsys_git  # NOQA
+
+
+def make_history(repo, num_commits):
+    for i in xrange(num_commits):
+        repo.call(
+            'commit', '--allow-empty', '-m', 'commit {}\n\nbody'.format(i))
+    return repo.call('rev-list', 'HEAD').split()
+
+
+def lookups(clone, hashes):
+    for sha1 in hashes:
+        clone.call('rev-parse', sha1)
+        clone.call('cat-file', '-t', sha1)
+        clone.call('log', sha1 + '^!', '--format=%H%n%an%n%ae%n%s%n%b')
+    return len(hashes) * 3
+
+
+def measure(clone, hashes):
+    timer = timeit.default_timer
+    start = timer()
+    num_calls = lookups(clone, hashes)
+    return num_calls / (timer() - start)
+
+
+def main():
+    num_commits = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    with phlsys_git.tmprepo_context() as repo:
+        hashes = make_history(repo, num_commits)
+
+        before = measure(phlsys_git.GitClone(repo.working_dir), hashes)
+
+        batch = phlsys_git.BatchGitClone(repo.working_dir)
+        with contextlib.closing(batch):
+            after = measure(batch, hashes)
+
+    print "GitClone:      {:10.1f} calls/sec".format(before)
+    print "BatchGitClone: {:10.1f} calls/sec".format(after)
+    print "speedup:       {:10.1f}x".format(after / before)
+
+
+if __name__ == "__main__":
+    main()
+
+
+#------------------------------------------------------------------------------
+# Copyright (C) 2013-2014 Bloomberg Finance L.P.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to
+# deal in the Software without restriction, including without limitation the
+# rights to use, copy, modify, merge, publish, distribute, sublicense, and/or
+# sell copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.  IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+# IN THE SOFTWARE.
+#------------------------------- END-OF-FILE ----------------------------------
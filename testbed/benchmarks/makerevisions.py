@@ -0,0 +1,78 @@
+"""Compare per-hash and batched phlgit_log.make_revisions_from_hashes.
+
+usage: python makerevisions.py [NUM_COMMITS]
+
+"""
+import os
+import sys
+import timeit
+
+# append our module dirs to sys.path, which is the list of paths to search
+# for modules this is so we can import our libraries directly
+# N.B. this magic is only really passable up-front in the entrypoint module
+PARENT_DIR = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+BASE_DIR = os.path.dirname(PARENT_DIR)
+sys.path.append(os.path.join(BASE_DIR, "py", "phl"))
+
+import phlgit_log  # NOQA
+import phlsys_git  # NOQA
+
+
+def make_branch(repo, num_commits):
+    for i in xrange(num_commits):
+        repo.call(
+            'commit', '--allow-empty',
+            '-m', 'commit {}\n\nmulti-line\nbody {}'.format(i, i))
+    return phlgit_log.get_last_n_commit_hashes(repo, num_commits)
+
+
+def time_it(f):
+    timer = timeit.default_timer
+    start = timer()
+    result = f()
+    return timer() - start, result
+
+
+def main():
+    num_commits = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    with phlsys_git.tmprepo_context() as repo:
+        hashes = make_branch(repo, num_commits)
+
+        before, expected = time_it(
+            lambda: [phlgit_log.make_revision_from_hash(repo, h)
+                     for h in hashes])
+        after, revisions = time_it(
+            lambda: phlgit_log.make_revisions_from_hashes(repo, hashes))
+
+    assert revisions == expected
+
+    print "per-hash: {:8.3f} secs".format(before)
+    print "batched:  {:8.3f} secs".format(after)
+    print "speedup:  {:8.1f}x".format(before / after)
+
+
+if __name__ == "__main__":
+    main()
+
+
+#------------------------------------------------------------------------------
+# Copyright (C) 2013-2014 Bloomberg Finance L.P.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to
+# deal in the Software without restriction, including without limitation the
+# rights to use, copy, modify, merge, publish, distribute, sublicense, and/or
+# sell copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.  IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+# IN THE SOFTWARE.
+#------------------------------- END-OF-FILE ----------------------------------